@@ -2,30 +2,70 @@
 Базовий клас для парсерів цін
 """
 import asyncio
+import json
 import logging
+import os
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from bs4 import BeautifulSoup
+from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
 
 from models import Product, Category, ParsingResult
 from config import ParserConfig
+from logging_setup import setup_logging
+from http_client import FetchClient
+from category_tree import CategoryTreeDiscoverer, get_leaf_categories
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from near_duplicates import NearDuplicateIndex
+    from price_stats import PriceStatsCollector
+    from page_archive import PageArchive
+    from page_memo import PageMemo
+    from crawl_budget import CrawlBudget, ListingPage
+    from image_downloader import ImageDownloader
 
 class BasePriceParser(ABC):
     """Базовий клас для парсерів цін"""
     
-    def __init__(self, config: ParserConfig):
+    # Парсер сам оновлює статистику цін посторінково під час обходу
+    # (інакше вона рахується по всіх товарах категорії після обходу)
+    STREAMS_PRICE_STATS = False
+    
+    # Найбільша кількість запитів на першу сторінку видачі в обході за бюджетом
+    FIRST_LISTING_PAGE_REQUESTS = 1
+    
+    def __init__(self, config: ParserConfig, fetch_client: Optional[FetchClient] = None):
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        # Налаштування логування
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('parser.log', encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        # Спільний клієнт передається ззовні (кілька сайтів в одному циклі подій),
+        # інакше парсер створює власний і закриває його при виході з контексту
+        self.fetch_client = fetch_client
+        self._owns_fetch_client = fetch_client is None
+        
+        # Індекс майже-дублікатів (створюється при першому використанні)
+        self.duplicate_index: Optional["NearDuplicateIndex"] = None
+        self.near_duplicates_found = 0
+        
+        # Потокова статистика цін по категоріях (створюється при першому використанні)
+        self._price_stats: Optional["PriceStatsCollector"] = None
+        
+        # Архів сирих сторінок (створюється при першій сторінці)
+        self.page_archive: Optional["PageArchive"] = None
+        # Категорії видач за URL без параметрів (для записів архіву)
+        self.listing_categories: Dict[str, str] = {}
+        
+        # Кеш результатів витягування за хешем сторінки (відкривається при першій сторінці)
+        self.page_memo: Optional["PageMemo"] = None
+        
+        # Фонове завантаження зображень (створюється при першій сторінці)
+        self.image_downloader: Optional["ImageDownloader"] = None
+        
+        # Спільні одночасні запити сторінок та короткочасний кеш розібраних сторінок
+        from single_flight import SingleFlight
+        self.page_flight = SingleFlight(ttl=config.page_cache_ttl, max_entries=config.page_cache_max_entries)
+        
+        # Налаштування логування (один раз на процес, без блокування циклу подій)
+        setup_logging(config)
     
     async def __aenter__(self):
         """Асинхронний контекстний менеджер - вхід"""
@@ -33,7 +73,28 @@ class BasePriceParser(ABC):
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Асинхронний контекстний менеджер - вихід"""
-        pass
+        if self.image_downloader is not None:
+            await self.image_downloader.drain()
+        self.save_near_duplicates()
+        if self._owns_fetch_client and self.fetch_client is not None:
+            await self.fetch_client.close()
+        if self.page_memo is not None:
+            self.page_memo.close()
+            self.page_memo = None
+    
+    @property
+    def price_stats(self) -> "PriceStatsCollector":
+        """Статистика цін по категоріях (NumPy завантажується лише тут)"""
+        if self._price_stats is None:
+            from price_stats import PriceStatsCollector
+            self._price_stats = PriceStatsCollector()
+        return self._price_stats
+    
+    def get_fetch_client(self) -> FetchClient:
+        """Клієнт HTTP запитів парсера"""
+        if self.fetch_client is None:
+            self.fetch_client = FetchClient.from_config(self.config)
+        return self.fetch_client
     
     @abstractmethod
     async def get_categories(self) -> List[Category]:
@@ -41,25 +102,169 @@ class BasePriceParser(ABC):
         pass
     
     @abstractmethod
-    async def get_products_from_category(self, category: Category) -> List[Product]:
-        """Отримання товарів з конкретної категорії - абстрактний метод"""
+    async def get_products_from_category(self, category: Category, max_pages: Optional[int] = None) -> List[Product]:
+        """Отримання товарів з конкретної категорії - абстрактний метод
+        
+        max_pages обмежує глибину пагінації (None - до ліміту з конфігурації).
+        """
         pass
     
-    async def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Отримання сторінки з URL"""
+    async def get_subcategories(self, category: Category) -> Optional[List[Category]]:
+        """Отримання прямих підкатегорій (за замовчуванням - немає)
+        
+        None - сторінку категорії не вдалося отримати (це не листова категорія).
+        """
+        return []
+    
+    async def get_category_tree(self, force_refresh: bool = False) -> List[Category]:
+        """Повне дерево категорій (з кешем на диску)"""
+        discoverer = CategoryTreeDiscoverer.from_parser(self)
+        return await discoverer.discover(force_refresh=force_refresh)
+    
+    async def get_crawl_categories(self) -> List[Category]:
+        """Категорії для парсингу каталогу: верхній рівень або листя дерева"""
+        if self.config.crawl_leaf_categories:
+            return get_leaf_categories(await self.get_category_tree())
+        return await self.get_categories()
+    
+    async def fetch_html(self, url: str) -> Optional[str]:
+        """Отримання HTML сторінки з URL"""
+        response = await self.get_fetch_client().fetch(url)
+        if response is None:
+            return None
+        if response.status != 200:
+            self.logger.warning("HTTP %s для %s", response.status, url)
+            return None
+        if self.config.archive_pages:
+            self.archive_page(url, response.text)
+        return response.text
+    
+    @staticmethod
+    def _listing_key(url: str) -> str:
+        # Сторінки пагінації та цінові діапазони відрізняються лише параметрами
+        return url.split('#', 1)[0].split('?', 1)[0]
+    
+    def remember_listing_category(self, url: str, category_name: str):
+        """Запам'ятовує категорію видачі, щоб записи архіву її зберігали"""
+        self.listing_categories[self._listing_key(url)] = category_name
+    
+    def archive_page(self, url: str, html: str):
+        """Дописує сторінку в архів сирих сторінок"""
+        if self.page_archive is None:
+            from page_archive import PageArchive
+            self.page_archive = PageArchive(
+                os.path.join(self.config.output_directory, self.config.archive_directory),
+                segment_max_bytes=self.config.archive_segment_mb * 1024 * 1024
+            )
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        return BeautifulSoup(html, 'html.parser')
-                    else:
-                        self.logger.warning(f"HTTP {response.status} для {url}")
-                        return None
-        except Exception as e:
-            self.logger.error(f"Помилка при отриманні {url}: {e}")
+            self.page_archive.append(url, html, category=self.listing_categories.get(self._listing_key(url), ""))
+        except OSError as e:
+            self.logger.error("Не вдалося зберегти сторінку %s в архів: %s", url, e)
+    
+    async def fetch_page(self, url: str) -> Optional["BeautifulSoup"]:
+        """Отримання сторінки з URL
+        
+        Одночасні запити того самого URL виконуються один раз і отримують
+        спільний розібраний результат (його не слід змінювати).
+        """
+        return await self.page_flight.run(url, lambda: self._fetch_page_once(url))
+    
+    async def _fetch_page_once(self, url: str) -> Optional["BeautifulSoup"]:
+        html = await self.fetch_html(url)
+        if html is None:
+            return None
+        
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, 'html.parser')
+    
+    @abstractmethod
+    def extract_listing_products(self, soup: "BeautifulSoup", page_url: str) -> List[Product]:
+        """Товари з однієї сторінки видачі - абстрактний метод
+        
+        Використовується стеженням, конвеєром обходу та відтворенням архіву.
+        """
+        pass
+    
+    def extract_listing_page(self, soup: "BeautifulSoup", page_url: str) -> Tuple[List[Product], Optional[str]]:
+        """Товари сторінки видачі та посилання на наступну сторінку (None - остання)"""
+        return self.extract_listing_products(soup, page_url), None
+    
+    async def fetch_listing_first_page(self, category: Category) -> Optional["ListingPage"]:
+        """Перша сторінка видачі категорії для обходу в межах бюджету
+        
+        За замовчуванням вся категорія вважається однією сторінкою.
+        """
+        from crawl_budget import ListingPage
+        return ListingPage(products=await self.get_products_from_category(category), listing_url=category.url)
+    
+    async def fetch_listing_page(self, listing_url: str, page: int) -> Optional["ListingPage"]:
+        """Сторінка пагінації видачі (None - не вдалося отримати)"""
+        return None
+    
+    def get_page_memo(self) -> Optional["PageMemo"]:
+        """Кеш результатів витягування (None, якщо мемоізацію вимкнено)"""
+        if self.page_memo is None and self.config.memoize_pages:
+            from page_memo import PageMemo
+            self.page_memo = PageMemo(
+                os.path.join(self.config.output_directory, self.config.page_memo_file),
+                max_entries=self.config.page_memo_max_entries
+            )
+        return self.page_memo
+    
+    def listing_memo_key(self, html: str) -> Optional[str]:
+        """Ключ кешу для сторінки видачі (None - мемоізація вимкнена або це не видача)"""
+        if self.get_page_memo() is None:
             return None
+        
+        from page_memo import listing_hash
+        return listing_hash(html, self.listing_memo_context())
+    
+    def listing_memo_context(self) -> str:
+        """Налаштування, від яких залежать витягнуті товари (частина ключа кешу)"""
+        rates = sorted((currency.upper(), float(rate)) for currency, rate in (self.config.currency_rates or {}).items())
+        return json.dumps([self.config.base_url, self.config.base_currency, rates])
+    
+    def parse_listing_html(self, html: str, page_url: str) -> Tuple[List[Product], Optional[str]]:
+        """Товари та наступна сторінка з HTML видачі; однакові сторінки не розбираються повторно"""
+        key = self.listing_memo_key(html)
+        if key is not None:
+            cached = self.page_memo.get(key)
+            if cached is not None:
+                return cached
+        
+        from bs4 import BeautifulSoup
+        products, next_page = self.extract_listing_page(BeautifulSoup(html, 'html.parser'), page_url)
+        if key is not None and products:
+            self.page_memo.put(key, products, next_page)
+        return products, next_page
+    
+    def get_image_downloader(self) -> Optional["ImageDownloader"]:
+        """Завантажувач зображень (None, якщо завантаження вимкнено)"""
+        if self.image_downloader is None and self.config.download_images:
+            from image_downloader import ImageDownloader, ImageStore
+            
+            # Зображення витрачають не більше своєї частки бюджету запитів
+            max_requests = int(self.config.crawl_max_requests * self.config.image_budget_share)
+            self.image_downloader = ImageDownloader(
+                self.get_fetch_client(),
+                ImageStore(os.path.join(self.config.output_directory, self.config.image_directory)),
+                concurrency=self.config.image_concurrency,
+                max_requests=max_requests if self.config.crawl_max_requests else 0
+            )
+        return self.image_downloader
+    
+    def queue_images(self, products: List[Product]):
+        """Ставить зображення товарів сторінки в чергу завантаження"""
+        downloader = self.get_image_downloader()
+        if downloader is not None:
+            downloader.submit(products)
+    
+    async def finish_images(self, products: List[Product]):
+        """Чекає завантаження зображень і записує імена файлів у товари"""
+        if self.image_downloader is None:
+            return
+        await self.image_downloader.drain()
+        self.image_downloader.attach(products)
     
     def make_absolute_url(self, href: str, base_url: str) -> str:
         """Перетворює відносний URL в абсолютний"""
@@ -71,16 +276,73 @@ class BasePriceParser(ABC):
                 # Видаляємо /uk з href щоб уникнути дублювання
                 original_href = href
                 href = href[3:]  # Видаляємо перші 3 символи '/uk'
-                self.logger.debug(f"Виправлено дублювання /uk: {original_href} -> {href}")
+                self.logger.debug("Виправлено дублювання /uk: %s -> %s", original_href, href)
             
             result_url = base_url.rstrip('/') + href
-            self.logger.debug(f"make_absolute_url: {href} + {base_url} = {result_url}")
+            self.logger.debug("make_absolute_url: %s + %s = %s", href, base_url, result_url)
             return result_url
         else:
             result_url = base_url.rstrip('/') + '/' + href
-            self.logger.debug(f"make_absolute_url: {href} + {base_url} = {result_url}")
+            self.logger.debug("make_absolute_url: %s + %s = %s", href, base_url, result_url)
             return result_url
     
+    def get_metrics(self, categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Метрики роботи парсера для ParsingResult
+        
+        categories - категорії результату для метрик, що ведуться по категоріях
+        (None - всі). Результат не ділить змінних об'єктів з парсером.
+        """
+        metrics: Dict[str, Any] = {}
+        if self.fetch_client is not None:
+            metrics["fetch"] = dict(self.fetch_client.metrics)
+            metrics["proxies"] = self.fetch_client.identity_pool.metrics()
+        if self.duplicate_index is not None:
+            metrics["near_duplicates"] = self.near_duplicates_found
+        if self.page_archive is not None:
+            metrics["archived_pages"] = self.page_archive.stored
+        if self.page_memo is not None:
+            metrics["page_memo"] = self.page_memo.summary()
+        if self.image_downloader is not None:
+            metrics["images"] = self.image_downloader.summary()
+        if self.page_flight.metrics["calls"]:
+            metrics["single_flight"] = self.page_flight.summary()
+        return metrics
+    
+    def mark_near_duplicates(self, products: List[Product]) -> int:
+        """Позначає перевипущені оголошення кластером майже-дублікатів"""
+        if not self.config.detect_near_duplicates:
+            return 0
+        
+        if self.duplicate_index is None:
+            from near_duplicates import NearDuplicateIndex
+            self.duplicate_index = NearDuplicateIndex(threshold=self.config.near_duplicate_threshold)
+            self.duplicate_index.load(self._near_duplicate_history_path())
+        
+        duplicates = self.duplicate_index.assign_clusters(products)
+        self.near_duplicates_found += duplicates
+        self.logger.info("Знайдено %s майже-дублікатів", duplicates)
+        return duplicates
+    
+    def _near_duplicate_history_path(self) -> str:
+        return os.path.join(self.config.output_directory, self.config.near_duplicate_history_file)
+    
+    def save_near_duplicates(self):
+        """Зберігає історію майже-дублікатів (один раз наприкінці обходу, лише якщо є нові записи)"""
+        if self.duplicate_index is None or not self.duplicate_index.dirty:
+            return
+        try:
+            self.duplicate_index.save(self._near_duplicate_history_path())
+        except OSError as e:
+            self.logger.error("Не вдалося зберегти історію майже-дублікатів: %s", e)
+    
+    def record_price_stats(self, category_name: str, products: List[Product]):
+        """Додає ціни сторінки (або всієї категорії) до статистики"""
+        self.price_stats.consume(category_name, products)
+    
+    def _collect_price_stats(self, category: Category, products: List[Product]):
+        if not self.STREAMS_PRICE_STATS:
+            self.record_price_stats(category.name, products)
+    
     def clean_text(self, text: str) -> str:
         """Очищає текст від зайвих символів"""
         if not text:
@@ -92,10 +354,18 @@ class BasePriceParser(ABC):
         start_time = asyncio.get_event_loop().time()
         
         try:
-            self.logger.info(f"Початок парсингу категорії: {category.name}")
+            self.logger.info("Початок парсингу категорії: %s", category.name)
+            
+            from crawl_budget import CrawlBudget
+            if CrawlBudget.from_config(self.config).enabled:
+                results, _ = await self.parse_categories_within_budget([category])
+                return results[0]
             
             # Отримуємо товари з категорії
             products = await self.get_products_from_category(category)
+            self.mark_near_duplicates(products)
+            self._collect_price_stats(category, products)
+            await self.finish_images(products)
             
             # Розраховуємо час парсингу
             parsing_time = asyncio.get_event_loop().time() - start_time
@@ -105,10 +375,12 @@ class BasePriceParser(ABC):
                 success=True,
                 products=products,
                 total_products=len(products),
-                parsing_time=parsing_time
+                parsing_time=parsing_time,
+                metrics=self.get_metrics(categories=[category.name]),
+                price_stats=self.price_stats.to_dict(categories=[category.name])
             )
             
-            self.logger.info(f"Парсинг категорії {category.name} завершено. Знайдено {len(products)} товарів")
+            self.logger.info("Парсинг категорії %s завершено. Знайдено %s товарів", category.name, len(products))
             return result
             
         except Exception as e:
@@ -130,8 +402,12 @@ class BasePriceParser(ABC):
         try:
             self.logger.info("Початок парсингу всього каталогу")
             
+            from crawl_budget import CrawlBudget
+            if CrawlBudget.from_config(self.config).enabled:
+                return await self.parse_catalog_within_budget()
+            
             # Отримуємо категорії
-            categories = await self.get_categories()
+            categories = await self.get_crawl_categories()
             
             all_products = []
             all_errors = []
@@ -140,12 +416,15 @@ class BasePriceParser(ABC):
             for category in categories:
                 try:
                     products = await self.get_products_from_category(category)
+                    self.mark_near_duplicates(products)
+                    self._collect_price_stats(category, products)
                     all_products.extend(products)
-                    self.logger.info(f"Категорія {category.name}: знайдено {len(products)} товарів")
+                    self.logger.info("Категорія %s: знайдено %s товарів", category.name, len(products))
                 except Exception as e:
                     error_msg = f"Помилка при парсингу категорії {category.name}: {e}"
                     all_errors.append(error_msg)
                     self.logger.error(error_msg)
+            await self.finish_images(all_products)
             
             # Розраховуємо час парсингу
             parsing_time = asyncio.get_event_loop().time() - start_time
@@ -158,10 +437,12 @@ class BasePriceParser(ABC):
                 errors=all_errors,
                 total_products=len(all_products),
                 total_categories=len(categories),
-                parsing_time=parsing_time
+                parsing_time=parsing_time,
+                metrics=self.get_metrics(categories=[category.name for category in categories]),
+                price_stats=self.price_stats.to_dict(categories=[category.name for category in categories])
             )
             
-            self.logger.info(f"Парсинг каталогу завершено. Знайдено {len(all_products)} товарів в {len(categories)} категоріях")
+            self.logger.info("Парсинг каталогу завершено. Знайдено %s товарів в %s категоріях", len(all_products), len(categories))
             return result
             
         except Exception as e:
@@ -175,3 +456,67 @@ class BasePriceParser(ABC):
                 parsing_time=parsing_time
             )
             return result
+    
+    async def parse_categories_within_budget(self, categories: List[Category],
+                                             budget: Optional["CrawlBudget"] = None
+                                             ) -> Tuple[List[ParsingResult], Dict[str, Any]]:
+        """Парсинг категорій в межах бюджету: спершу перші сторінки всіх категорій
+        
+        Повертає результат кожної категорії (можливо, частковий) та звіт про покриття.
+        """
+        from crawl_budget import BudgetedCrawler, CrawlBudget, coverage_result
+        
+        start_time = asyncio.get_event_loop().time()
+        if budget is None:
+            budget = CrawlBudget.from_config(self.config)
+            budget.start(self.get_fetch_client().metrics)
+        
+        downloader = self.get_image_downloader()
+        if downloader is not None:
+            downloader.budget = budget
+        
+        crawler = BudgetedCrawler(self, budget)
+        states = await crawler.run(categories)
+        await self.finish_images([product for state in states for product in state.products])
+        parsing_time = asyncio.get_event_loop().time() - start_time
+        
+        results = []
+        for state in states:
+            self.mark_near_duplicates(state.products)
+            self._collect_price_stats(state.category, state.products)
+            results.append(coverage_result(self, state, parsing_time))
+        
+        report = crawler.coverage_report(states)
+        self.logger.info(
+            "Обхід в межах бюджету: %s з ~%s сторінок, зупинка: %s",
+            report["pages_crawled"], report["pages_estimated"], report["stop_reason"] or "немає"
+        )
+        return results, report
+    
+    async def parse_catalog_within_budget(self) -> ParsingResult:
+        """Парсинг каталогу в межах бюджету (часткові дані замість перевищення вікна)"""
+        from crawl_budget import CrawlBudget
+        
+        start_time = asyncio.get_event_loop().time()
+        
+        # Визначення категорій теж витрачає бюджет
+        budget = CrawlBudget.from_config(self.config)
+        budget.start(self.get_fetch_client().metrics)
+        categories = await self.get_crawl_categories()
+        results, report = await self.parse_categories_within_budget(categories, budget)
+        
+        all_products = [product for result in results for product in result.products]
+        all_errors = [error for result in results for error in result.errors]
+        metrics = self.get_metrics(categories=[category.name for category in categories])
+        metrics["coverage"] = report
+        return ParsingResult(
+            success=len(all_errors) == 0,
+            products=all_products,
+            categories=categories,
+            errors=all_errors,
+            total_products=len(all_products),
+            total_categories=len(categories),
+            parsing_time=asyncio.get_event_loop().time() - start_time,
+            metrics=metrics,
+            price_stats=self.price_stats.to_dict(categories=[category.name for category in categories])
+        )
@@ -0,0 +1,156 @@
+"""
+Генерація корпусу сторінок видачі OLX.ua для бенчмарку витягування
+
+Сторінки відтворюють розмітку видачі OLX.ua (картки l-card, ціни ad-price,
+пагінація) з детермінованими даними: назви, ціни у різних валютах, договірні,
+безкоштовні оголошення та обмін. Після зміни генератора потрібно перезаписати
+еталони: python benchmarks/extraction_benchmark.py --update-golden
+"""
+import os
+import random
+from typing import List
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+TITLES = [
+    "iPhone 13 128GB Midnight", "Samsung Galaxy S21 FE 5G", "Xiaomi Redmi Note 12 Pro",
+    "Google Pixel 7 ідеальний стан", "Apple iPhone 11 64GB б/у", "Motorola G54 Power",
+    "Диван кутовий розкладний", "Велосипед гірський 29 дюймів", "Ноутбук Lenovo ThinkPad T14",
+    "Дитяча коляска 2 в 1", "Шини зимові R16 Michelin", "Пральна машина Bosch 7 кг",
+    "Оренда 1-кімнатної квартири, Оболонь", "Куртка зимова жіноча, розмір M",
+    "PlayStation 5 + 2 геймпади", "Кавомашина DeLonghi Magnifica S",
+]
+
+CITIES = ["Київ, Оболонський", "Львів, Франківський", "Одеса, Приморський", "Харків, Шевченківський", "Дніпро"]
+
+def price_html(rng: random.Random) -> str:
+    """Вміст блоку ціни в одному з форматів, що трапляються на OLX"""
+    kind = rng.random()
+    amount = rng.choice([350, 1200, 4999, 12500, 25000, 149000, 2750000])
+    formatted = f"{amount:,}".replace(',', ' ')
+    if kind < 0.55:
+        return f"{formatted} грн."
+    if kind < 0.70:
+        return f'{formatted} грн.<span class="css-e2218f">Договірна</span>'
+    if kind < 0.80:
+        return f"{rng.choice([150, 380, 920])} $"
+    if kind < 0.85:
+        return f"{rng.choice([90, 450])} €"
+    if kind < 0.93:
+        return "Безкоштовно"
+    return "Обмін"
+
+def card_html(rng: random.Random, index: int, testid_only: bool = False) -> str:
+    """Картка оголошення у розмітці видачі"""
+    title = rng.choice(TITLES)
+    slug = f"ad-{index:05d}-ID{rng.randrange(16 ** 6):06X}"
+    href = f"/d/uk/obyavlenie/{slug}.html"
+    card_attrs = 'data-testid="l-card"' if testid_only else 'data-cy="l-card" data-testid="l-card"'
+    promoted = '<div data-testid="adCard-featured" class="css-1jh69qu">ТОП</div>' if index % 7 == 0 else ''
+    return f'''
+<div {card_attrs} id="{800000000 + index}" class="css-1sw7q4x">
+  <div class="css-1apmciz">
+    <div type="list" class="css-1r93q13">
+      <a class="css-z3gu2d" href="{href}">
+        <div class="css-gl6djm"><img src="https://ireland.apollo.olxcdn.com/v1/files/{slug}/image;s=216x152" alt="{title}" class="css-8wsg1m"></div>
+      </a>
+      {promoted}
+    </div>
+    <div class="css-u2ayx9">
+      <a class="css-z3gu2d" href="{href}"><h6 class="css-16v5mdi er34gjf0">{title}</h6></a>
+      <p data-testid="ad-price" class="css-10b0gli er34gjf0">{price_html(rng)}</p>
+    </div>
+    <div class="css-odp1qd">
+      <p data-testid="location-date" class="css-1a4brun er34gjf0">{rng.choice(CITIES)} - Сьогодні о {rng.randrange(24):02d}:{rng.randrange(60):02d}</p>
+    </div>
+  </div>
+</div>'''
+
+def pagination_html(category_path: str, page: int, last_page: int) -> str:
+    """Блок пагінації (без кнопки "вперед" на останній сторінці)"""
+    items = []
+    for number in range(max(1, page - 2), min(last_page, page + 2) + 1):
+        href = f"{category_path}?page={number}" if number > 1 else category_path
+        items.append(f'<li data-testid="pagination-list-item" class="css-1mi714g"><a class="css-1mi714g" href="{href}">{number}</a></li>')
+    forward = ""
+    if page < last_page:
+        forward = f'<a data-testid="pagination-forward" data-cy="pagination-forward" href="{category_path}?page={page + 1}" class="css-pyu9k9"></a>'
+    backward = ""
+    if page > 1:
+        backward = f'<a data-testid="pagination-back" data-cy="pagination-back" href="{category_path}?page={page - 1}" class="css-pyu9k9"></a>'
+    return f'''
+<div data-testid="pagination-wrapper" class="css-4mw0p4">
+  {backward}
+  <ul data-testid="pagination-list" class="pagination-list css-1vdlgt7">{''.join(items)}</ul>
+  {forward}
+</div>'''
+
+def page_html(title: str, category_path: str, cards: List[str], page: int, last_page: int,
+              total_count: int, grid: bool = True) -> str:
+    """Повна сторінка видачі з заголовком, фільтрами, сіткою та пагінацією"""
+    filters = ''.join(
+        f'<div class="css-1ex4x4o"><label>Фільтр {number}</label><input type="text" name="search[filter_{number}]"></div>'
+        for number in range(12)
+    )
+    body = ''.join(cards)
+    count_text = f"{total_count:,}".replace(',', ' ')
+    if grid:
+        body = f'<div data-testid="listing-grid" class="css-oukcj3">{body}</div>'
+    return f'''<!DOCTYPE html>
+<html lang="uk">
+<head>
+<meta charset="utf-8">
+<title>{title} - OLX.ua</title>
+<link rel="stylesheet" href="https://static.olx.ua/app.css">
+<script>window.__PRERENDERED_STATE__ = "{{}}";</script>
+</head>
+<body>
+<header class="css-1ncqeqk"><a href="/uk/" class="css-1jqcdyi">OLX</a><nav><a href="/uk/myaccount/">Ваш профіль</a></nav></header>
+<main>
+<h1 class="css-1t8vmxv">{title}</h1>
+<form class="css-11jpc4g">{filters}</form>
+<div data-testid="listing-count-msg"><span data-testid="total-count">Ми знайшли {count_text} оголошень</span></div>
+{body}
+{pagination_html(category_path, page, last_page)}
+</main>
+<footer class="css-1e7uhku"><a href="/uk/help/">Допомога</a><a href="/uk/sitemap/">Карта сайту</a></footer>
+</body>
+</html>
+'''
+
+def build_corpus(directory: str = CORPUS_DIR):
+    """Записує сторінки корпусу"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(20240501)
+
+    pages = {
+        # Перша сторінка великої категорії: 52 картки, є наступна сторінка
+        "telefony_page1.html": page_html(
+            "Мобільні телефони", "/uk/elektronika/telefony-i-aksesuary/mobilnye-telefony-smartfony/",
+            [card_html(rng, index) for index in range(52)], page=1, last_page=25, total_count=184233
+        ),
+        # Середня сторінка: посилання назад і вперед
+        "dom_i_sad_page7.html": page_html(
+            "Дім і сад", "/uk/dom-i-sad/",
+            [card_html(rng, 100 + index) for index in range(48)], page=7, last_page=25, total_count=96120
+        ),
+        # Остання сторінка пагінації без кнопки "вперед"
+        "nedvizhimost_page25.html": page_html(
+            "Нерухомість", "/uk/nedvizhimost/",
+            [card_html(rng, 200 + index) for index in range(40)], page=25, last_page=25, total_count=1240
+        ),
+        # Картки лише з data-testid, без обгортки listing-grid
+        "zapchasti_testid.html": page_html(
+            "Запчастини для транспорту", "/uk/zapchasti-dlya-transporta/",
+            [card_html(rng, 300 + index, testid_only=True) for index in range(44)],
+            page=2, last_page=3, total_count=131, grid=False
+        ),
+    }
+    for name, html in pages.items():
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+    return sorted(pages)
+
+if __name__ == "__main__":
+    for name in build_corpus():
+        print(os.path.join(CORPUS_DIR, name))
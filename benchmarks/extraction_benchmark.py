@@ -0,0 +1,256 @@
+"""
+Мікробенчмарк витягування даних зі сторінок видачі OLX.ua
+
+Для кожної сторінки корпусу (benchmarks/corpus) вимірюється пропускна здатність
+extract_product_data_from_element, extract_price, make_absolute_url (на картку)
+та find_next_page_link (на сторінку), а результат витягування порівнюється з
+еталоном (benchmarks/golden).
+
+Пропускна здатність нормалізується на час калібрувального навантаження, щоб
+базову лінію (benchmarks/baseline.json) можна було порівнювати між машинами.
+
+    python benchmarks/extraction_benchmark.py                    # звіт
+    python benchmarks/extraction_benchmark.py --update-golden    # перезаписати еталони
+    python benchmarks/extraction_benchmark.py --update-baseline  # перезаписати базову лінію
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bs4 import BeautifulSoup
+
+from config import DEFAULT_CONFIG
+from olx_parser import OlxPriceParser
+from price_normalizer import PriceNormalizer
+
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+BENCH_BASE_URL = "https://www.olx.ua"
+BENCH_LISTING_URL = "https://www.olx.ua/uk/benchmark/"
+
+# У скільки разів може впасти нормалізована пропускна здатність відносно базової лінії
+DEFAULT_MAX_SLOWDOWN = 2.5
+MAX_SLOWDOWN_ENV = "OLX_BENCH_MAX_SLOWDOWN"
+
+BENCHMARKED_FUNCTIONS = (
+    "extract_product_data_from_element", "extract_price", "make_absolute_url", "find_next_page_link"
+)
+
+_HREF_RE = re.compile(r'href="([^"]+)"')
+
+def corpus_pages() -> List[str]:
+    """Імена сторінок корпусу"""
+    return sorted(name for name in os.listdir(CORPUS_DIR) if name.endswith('.html'))
+
+def load_page(name: str) -> str:
+    with open(os.path.join(CORPUS_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def make_parser() -> OlxPriceParser:
+    """Парсер з конфігурацією за замовчуванням (без мережі)"""
+    config = replace(DEFAULT_CONFIG, base_url=BENCH_BASE_URL, log_level="WARNING", log_file="")
+    return OlxPriceParser(config)
+
+def extract_page(parser: OlxPriceParser, html: str) -> Dict[str, Any]:
+    """Результат витягування зі сторінки у формі еталона"""
+    soup = BeautifulSoup(html, 'html.parser')
+    elements = parser.layout_detector.select_cards(soup, BENCH_LISTING_URL)
+
+    products = []
+    for element in elements:
+        product = parser.extract_product_data_from_element(element, BENCH_BASE_URL)
+        if product is None:
+            products.append(None)
+            continue
+        products.append({
+            "name": product.name,
+            "price": str(product.price),
+            "currency": product.currency,
+            "product_url": product.product_url,
+            "sku": product.sku,
+            "attributes": product.attributes
+        })
+
+    next_link = parser.find_next_page_link(soup)
+    return {
+        "cards": len(elements),
+        "products": products,
+        "prices": [str(parser.extract_price(parser._extract_price_text(element))) for element in elements],
+        "next_page": next_link.get('href') if next_link is not None else None
+    }
+
+def golden_path(name: str) -> str:
+    return os.path.join(GOLDEN_DIR, name.replace('.html', '.json'))
+
+def load_golden(name: str) -> Dict[str, Any]:
+    with open(golden_path(name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def update_golden(parser: OlxPriceParser):
+    """Перезаписує еталони поточним результатом витягування"""
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name in corpus_pages():
+        with open(golden_path(name), 'w', encoding='utf-8') as f:
+            json.dump(extract_page(parser, load_page(name)), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+def calibrate(rounds: int = 5) -> float:
+    """Час фіксованого навантаження на чистому Python (регулярні вирази, рядки, словники)"""
+    text = load_page(corpus_pages()[0])
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        counts: Dict[str, int] = {}
+        for word in re.findall(r'\w+', text):
+            counts[word.lower()] = counts.get(word.lower(), 0) + 1
+        ' '.join(sorted(counts)).split()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _best_time(func: Callable[[], None], rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark_page(parser: OlxPriceParser, html: str, rounds: int = 5) -> Dict[str, Dict[str, float]]:
+    """Найкращий час кожної функції на сторінці та пропускна здатність (одиниць/сек)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    elements = parser.layout_detector.select_cards(soup, BENCH_LISTING_URL)
+    price_texts = [parser._extract_price_text(element) for element in elements]
+    hrefs = [match for match in _HREF_RE.findall(html) if '/obyavlenie/' in match]
+
+    def fresh_normalizer():
+        # Кеш нормалізатора скидається, щоб вимірювати саме розбір, а не звернення до кешу
+        parser.price_normalizer = PriceNormalizer.from_config(parser.config)
+
+    def run_extract():
+        fresh_normalizer()
+        for element in elements:
+            parser.extract_product_data_from_element(element, BENCH_BASE_URL)
+
+    def run_prices():
+        fresh_normalizer()
+        for price_text in price_texts:
+            parser.extract_price(price_text)
+
+    def run_urls():
+        for href in hrefs:
+            parser.make_absolute_url(href, BENCH_BASE_URL)
+
+    def run_next_page():
+        parser.find_next_page_link(soup)
+
+    runs = {
+        "extract_product_data_from_element": (run_extract, len(elements)),
+        "extract_price": (run_prices, len(price_texts)),
+        "make_absolute_url": (run_urls, len(hrefs)),
+        "find_next_page_link": (run_next_page, 1),
+    }
+    results = {}
+    for name, (func, units) in runs.items():
+        seconds = _best_time(func, rounds)
+        results[name] = {
+            "seconds": seconds,
+            "units": units,
+            "per_second": units / seconds if seconds else float('inf')
+        }
+    return results
+
+def run_benchmark(rounds: int = 5) -> Dict[str, Any]:
+    """Бенчмарк усього корпусу з нормалізацією на калібрувальне навантаження"""
+    parser = make_parser()
+    calibration = calibrate()
+    pages = {}
+    for name in corpus_pages():
+        page = benchmark_page(parser, load_page(name), rounds)
+        for item in page.values():
+            # Одиниць за час калібрувального навантаження - не залежить від швидкості машини
+            item["normalized"] = item["per_second"] * calibration
+        pages[name] = page
+    return {"calibration_seconds": calibration, "pages": pages}
+
+def load_baseline() -> Optional[Dict[str, Any]]:
+    if not os.path.exists(BASELINE_FILE):
+        return None
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(report: Dict[str, Any]):
+    """Зберігає нормалізовану пропускну здатність як базову лінію"""
+    baseline = {
+        "pages": {
+            name: {function: round(item["normalized"], 4) for function, item in page.items()}
+            for name, page in report["pages"].items()
+        }
+    }
+    with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any],
+                     max_slowdown: Optional[float] = None) -> List[str]:
+    """Функції, чия пропускна здатність впала більше ніж у max_slowdown разів"""
+    if max_slowdown is None:
+        max_slowdown = float(os.environ.get(MAX_SLOWDOWN_ENV, DEFAULT_MAX_SLOWDOWN))
+
+    regressions = []
+    for name, page in report["pages"].items():
+        for function, item in page.items():
+            expected = baseline.get("pages", {}).get(name, {}).get(function)
+            if expected and item["normalized"] * max_slowdown < expected:
+                regressions.append(
+                    f"{name}: {function} повільніше у {expected / item['normalized']:.1f} раз "
+                    f"(допустимо {max_slowdown:.1f})"
+                )
+    return regressions
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    print(f"Калібрування: {report['calibration_seconds'] * 1000:.2f} мс")
+    print("Сторінка\tФункція\tмс/сторінку\tмкс/одиницю\tОдиниць/сек\tВід базової")
+    for name, page in report["pages"].items():
+        for function, item in page.items():
+            expected = (baseline or {}).get("pages", {}).get(name, {}).get(function)
+            ratio = f"{item['normalized'] / expected:.2f}x" if expected else "-"
+            per_unit = item["seconds"] / item["units"] * 1_000_000 if item["units"] else 0.0
+            print(f"{name}\t{function}\t{item['seconds'] * 1000:.3f}\t{per_unit:.1f}\t{item['per_second']:.0f}\t{ratio}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк витягування даних зі сторінок OLX.ua")
+    arg_parser.add_argument("--rounds", type=int, default=7, help="Кількість повторів (береться найкращий час)")
+    arg_parser.add_argument("--update-golden", action="store_true", help="Перезаписати еталони")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="Перезаписати базову лінію")
+    args = arg_parser.parse_args(argv)
+
+    if args.update_golden:
+        update_golden(make_parser())
+        print(f"Еталони оновлено в {GOLDEN_DIR}")
+
+    report = run_benchmark(args.rounds)
+    baseline = load_baseline()
+    print_report(report, baseline)
+
+    if args.update_baseline:
+        save_baseline(report)
+        print(f"Базову лінію збережено в {BASELINE_FILE}")
+        return 0
+
+    regressions = find_regressions(report, baseline) if baseline else []
+    for regression in regressions:
+        print(f"❌ {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Виявлення повного дерева категорій паралельним обходом в ширину
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from models import Category
+
+def get_leaf_categories(categories: List[Category]) -> List[Category]:
+    """Повертає категорії без підкатегорій"""
+    return [category for category in categories if not category.subcategories]
+
+class CategoryTreeDiscoverer:
+    """Обходить дерево категорій рівень за рівнем з обмеженою паралельністю
+
+    Дерево зберігається плоским списком: зв'язки задаються через
+    Category.parent_category та Category.subcategories (URL категорій).
+    """
+
+    def __init__(self, parser, cache_path: Optional[str] = None, ttl: int = 86400,
+                 max_concurrency: int = 5, max_depth: int = 4):
+        self.parser = parser
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+        self.max_depth = max_depth
+        self.failed_expansions = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @classmethod
+    def from_parser(cls, parser) -> "CategoryTreeDiscoverer":
+        """Створює обхідник з налаштувань парсера"""
+        config = parser.config
+        return cls(
+            parser,
+            cache_path=os.path.join(config.output_directory, config.category_tree_cache_file),
+            ttl=config.category_tree_ttl,
+            max_concurrency=config.max_concurrent_requests,
+            max_depth=config.category_tree_max_depth
+        )
+
+    async def discover(self, force_refresh: bool = False) -> List[Category]:
+        """Повертає всі категорії дерева (з кешу, якщо він не застарів)"""
+        if not force_refresh:
+            cached = self.load_cache()
+            if cached is not None:
+                return cached
+
+        roots = await self.parser.get_categories()
+        if not roots:
+            # Порожній список - найчастіше помилка мережі, а не порожній сайт
+            self.logger.warning("Категорії верхнього рівня не отримано - дерево не кешується")
+            return []
+
+        categories = await self._bfs(roots)
+        if self.failed_expansions:
+            self.logger.warning(
+                "Дерево категорій неповне (%s помилок) - не кешується", self.failed_expansions
+            )
+        else:
+            self.save_cache(categories)
+        return categories
+
+    async def _bfs(self, roots: List[Category]) -> List[Category]:
+        """Обхід в ширину: всі категорії одного рівня запитуються паралельно"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        by_url: Dict[str, Category] = {category.url: category for category in roots}
+        frontier = list(by_url.values())
+        self.failed_expansions = 0
+
+        async def expand(category: Category) -> List[Category]:
+            async with semaphore:
+                try:
+                    children = await self.parser.get_subcategories(category)
+                except Exception as e:
+                    self.logger.error("Помилка при отриманні підкатегорій %s: %s", category.name, e)
+                    children = None
+                if children is None:
+                    # Сторінку не отримано - категорія не обов'язково листова
+                    self.failed_expansions += 1
+                    return []
+                return children
+
+        depth = 0
+        while frontier and depth < self.max_depth:
+            children_lists = await asyncio.gather(*(expand(category) for category in frontier))
+
+            next_frontier = []
+            for parent, children in zip(frontier, children_lists):
+                for child in children:
+                    if child.url in by_url:
+                        continue
+                    child.parent_category = parent.url
+                    parent.subcategories.append(child.url)
+                    by_url[child.url] = child
+                    next_frontier.append(child)
+
+            depth += 1
+            self.logger.info("Рівень %s дерева категорій: %s нових категорій", depth, len(next_frontier))
+            frontier = next_frontier
+
+        return list(by_url.values())
+
+    def load_cache(self) -> Optional[List[Category]]:
+        """Завантажує дерево з диска, якщо кеш існує та не застарів"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            age = time.time() - data.get("created_at", 0)
+            if age > self.ttl:
+                self.logger.info("Кеш дерева категорій застарів (%.0f сек)", age)
+                return None
+
+            categories = [Category.from_dict(item) for item in data.get("categories", [])]
+            if not categories:
+                self.logger.info("Кеш дерева категорій порожній - дерево обходиться заново")
+                return None
+            self.logger.info("Завантажено %s категорій з кешу %s", len(categories), self.cache_path)
+            return categories
+
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Не вдалося прочитати кеш дерева категорій: %s", e)
+            return None
+
+    def save_cache(self, categories: List[Category]):
+        """Зберігає дерево на диск (порожнє дерево не зберігається)"""
+        if not self.cache_path or not categories:
+            return
+
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "created_at": time.time(),
+            "categories": [category.to_dict() for category in categories]
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
@@ -0,0 +1,206 @@
+"""
+Зміни між запусками: нові, зняті оголошення, зміни ціни та назви
+
+Кожен запуск зводиться до масивів NumPy з 64-бітними хешами: ключ
+оголошення (артикул, інакше посилання), вміст (назва, ціна, валюта) та
+окремо назва. Хеші живуть лише в межах процесу, тому це вбудований
+hash(). Попередній запуск читається з колонкового знімка через mmap,
+тож жодна зі сторін не перетворюється на список Product. Порівняння -
+перетин відсортованих ключів; рядки для звіту відновлюються лише для
+змінених оголошень.
+"""
+import json
+import os
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from models import Product
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_PRICE = "price"
+CHANGE_TITLE = "title"
+
+def listing_key(sku: str, product_url: str, name: str) -> str:
+    """Ключ оголошення між запусками: артикул, інакше посилання"""
+    return sku or product_url or name
+
+@dataclass
+class ChangeRecord:
+    """Одна зміна оголошення"""
+    change: str                       # added, removed, price, title
+    key: str
+    name: str
+    product_url: str
+    currency: str = "UAH"
+    old_price: Optional[Decimal] = None
+    new_price: Optional[Decimal] = None
+    old_name: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "change": self.change,
+            "key": self.key,
+            "name": self.name,
+            "product_url": self.product_url,
+            "currency": self.currency,
+            "old_price": str(self.old_price) if self.old_price is not None else None,
+            "new_price": str(self.new_price) if self.new_price is not None else None,
+            "old_name": self.old_name
+        }
+
+class HashedRun:
+    """Запуск як масиви хешів; деталі рядка - за запитом"""
+
+    def __init__(self, keys: List[str], names: List[str], price_cents: np.ndarray,
+                 currencies: List[str], row: Callable[[int], Dict[str, Any]]):
+        count = len(keys)
+        self.price_cents = price_cents
+        self.row = row
+        self.key_hashes = np.fromiter(map(hash, keys), dtype=np.int64, count=count)
+        self.name_hashes = np.fromiter(map(hash, names), dtype=np.int64, count=count)
+        self.currency_hashes = np.fromiter(map(hash, currencies), dtype=np.int64, count=count)
+        # Хеш полів, зміна яких потрапляє в дельту (наявність окремого типу зміни не має)
+        self.content_hashes = np.fromiter(
+            map(hash, zip(names, price_cents.tolist(), currencies)), dtype=np.int64, count=count
+        )
+
+    def __len__(self) -> int:
+        return len(self.key_hashes)
+
+    @classmethod
+    def from_products(cls, products: Sequence[Product]) -> "HashedRun":
+        def row(position: int) -> Dict[str, Any]:
+            product = products[position]
+            return {"key": listing_key(product.sku, product.product_url, product.name), "name": product.name,
+                    "product_url": product.product_url, "price": product.price, "currency": product.currency}
+
+        return cls(
+            keys=[listing_key(product.sku, product.product_url, product.name) for product in products],
+            names=[product.name for product in products],
+            price_cents=np.fromiter(
+                (int((product.price * 100).to_integral_value()) for product in products),
+                dtype=np.int64, count=len(products)
+            ),
+            currencies=[product.currency for product in products],
+            row=row
+        )
+
+    @classmethod
+    def from_snapshot(cls, reader) -> "HashedRun":
+        """Колонки знімка (reader має лишатися відкритим, поки читаються рядки)"""
+        def row(position: int) -> Dict[str, Any]:
+            name = reader.string("name", position)
+            product_url = reader.string("product_url", position)
+            return {"key": listing_key(reader.string("sku", position), product_url, name), "name": name,
+                    "product_url": product_url, "price": Decimal(int(reader.price_cents[position])).scaleb(-2),
+                    "currency": reader.string("currency", position)}
+
+        names = reader.strings("name")
+        return cls(
+            keys=[listing_key(sku, url, name) for sku, url, name in
+                  zip(reader.strings("sku"), reader.strings("product_url"), names)],
+            names=names,
+            price_cents=np.array(reader.price_cents, dtype=np.int64),
+            currencies=reader.strings("currency"),
+            row=row
+        )
+
+    @classmethod
+    def empty(cls) -> "HashedRun":
+        return cls([], [], np.zeros(0, dtype=np.int64), [], lambda position: {})
+
+class ChangeSet:
+    """Результат порівняння двох запусків (номери рядків кожної сторони)"""
+
+    def __init__(self, previous: HashedRun, current: HashedRun):
+        self.previous = previous
+        self.current = current
+
+        # Повтор ключа в межах запуску - береться перше входження
+        previous_keys, previous_rows = np.unique(previous.key_hashes, return_index=True)
+        current_keys, current_rows = np.unique(current.key_hashes, return_index=True)
+        _, previous_positions, current_positions = np.intersect1d(
+            previous_keys, current_keys, assume_unique=True, return_indices=True
+        )
+
+        added_mask = np.ones(len(current_keys), dtype=bool)
+        added_mask[current_positions] = False
+        self.added = np.sort(current_rows[added_mask])
+        removed_mask = np.ones(len(previous_keys), dtype=bool)
+        removed_mask[previous_positions] = False
+        self.removed = np.sort(previous_rows[removed_mask])
+
+        # Спільні оголошення у порядку поточного запуску
+        common_previous = previous_rows[previous_positions]
+        common_current = current_rows[current_positions]
+        order = np.argsort(common_current, kind='stable')
+        common_previous, common_current = common_previous[order], common_current[order]
+
+        changed = previous.content_hashes[common_previous] != current.content_hashes[common_current]
+        price_changed = changed & (
+            (previous.price_cents[common_previous] != current.price_cents[common_current])
+            | (previous.currency_hashes[common_previous] != current.currency_hashes[common_current])
+        )
+        title_changed = changed & (previous.name_hashes[common_previous] != current.name_hashes[common_current])
+        self.price_changed = (common_previous[price_changed], common_current[price_changed])
+        self.title_changed = (common_previous[title_changed], common_current[title_changed])
+        self.unchanged = int(len(common_current) - changed.sum())
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            CHANGE_ADDED: len(self.added),
+            CHANGE_REMOVED: len(self.removed),
+            CHANGE_PRICE: len(self.price_changed[1]),
+            CHANGE_TITLE: len(self.title_changed[1]),
+            "unchanged": self.unchanged
+        }
+
+    def __len__(self) -> int:
+        summary = self.summary()
+        return summary[CHANGE_ADDED] + summary[CHANGE_REMOVED] + summary[CHANGE_PRICE] + summary[CHANGE_TITLE]
+
+    def records(self) -> Iterable[ChangeRecord]:
+        """Зміни по одній (рядки відновлюються лише для змінених оголошень)"""
+        for position in self.added:
+            row = self.current.row(int(position))
+            yield ChangeRecord(CHANGE_ADDED, row["key"], row["name"], row["product_url"], row["currency"],
+                               new_price=row["price"])
+        for position in self.removed:
+            row = self.previous.row(int(position))
+            yield ChangeRecord(CHANGE_REMOVED, row["key"], row["name"], row["product_url"], row["currency"],
+                               old_price=row["price"])
+        for change, (previous_rows, current_rows) in ((CHANGE_PRICE, self.price_changed),
+                                                      (CHANGE_TITLE, self.title_changed)):
+            for previous_position, current_position in zip(previous_rows, current_rows):
+                old = self.previous.row(int(previous_position))
+                new = self.current.row(int(current_position))
+                yield ChangeRecord(change, new["key"], new["name"], new["product_url"], new["currency"],
+                                   old_price=old["price"], new_price=new["price"], old_name=old["name"])
+
+def detect_changes(products: Sequence[Product], previous_snapshot: Optional[str]) -> List[ChangeRecord]:
+    """Зміни поточних товарів відносно знімка попереднього запуску
+
+    Без попереднього знімка всі оголошення - нові.
+    """
+    from snapshot import SnapshotReader
+
+    current = HashedRun.from_products(products)
+    if not previous_snapshot or not os.path.exists(previous_snapshot):
+        return list(ChangeSet(HashedRun.empty(), current).records())
+    with SnapshotReader(previous_snapshot) as reader:
+        # Записи формуються до закриття знімка
+        return list(ChangeSet(HashedRun.from_snapshot(reader), current).records())
+
+def write_changes_jsonl(changes: Iterable[ChangeRecord], path: str) -> str:
+    """Записує зміни в JSONL (один рядок - одна зміна)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for change in changes:
+            f.write(json.dumps(change.to_dict(), ensure_ascii=False) + "\n")
+    return path
@@ -0,0 +1,420 @@
+"""
+Неінтерактивний інтерфейс командного рядка для запуску з cron та скриптів
+
+Приклади:
+    python cli.py categories
+    python cli.py crawl --category 3
+    python cli.py crawl --url https://www.olx.ua/uk/elektronika/telefony/
+    python cli.py crawl --all --deadline 1800 --max-requests 2000
+    python cli.py schedule --leaves
+    python cli.py watch --url "https://www.olx.ua/uk/list/q-iphone/?search%5Border%5D=created_at:desc"
+    python cli.py replay --since 2024-05-01T00:00 --output parsed_data/replay.olxsnap
+    python cli.py export parsed_data/olx_телефони_full.json --category Телефони
+    python cli.py bench saved_page.html --repeat 20
+    python cli.py query --text iphone --max-price 15000 --sort newest
+
+Конфігурація береться з JSON файлу (--config або OLX_PARSER_CONFIG) та змінних
+середовища OLX_PARSER_<ПОЛЕ>. Важкі модулі завантажуються лише підкомандами,
+яким вони потрібні.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from config import ParserConfig, load_config
+
+DEFAULT_BASE_URL = "https://www.olx.ua/uk/"
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Створює парсер аргументів з підкомандами"""
+    arg_parser = argparse.ArgumentParser(prog="olx-parser", description="Парсер цін з OLX.ua")
+    arg_parser.add_argument("--config", help="JSON файл конфігурації")
+    arg_parser.add_argument("--base-url", help="Посилання на сайт (за замовчуванням з конфігурації)")
+    arg_parser.add_argument("--log-level", help="Рівень логування (DEBUG, INFO, WARNING, ERROR)")
+
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+
+    categories = subparsers.add_parser("categories", help="Показати категорії")
+    categories.add_argument("--tree", action="store_true", help="Повне дерево категорій")
+    categories.add_argument("--leaves", action="store_true", help="Тільки листові категорії дерева")
+    categories.add_argument("--refresh", action="store_true", help="Ігнорувати кеш дерева категорій")
+    categories.add_argument("--json", action="store_true", help="Вивести у форматі JSON")
+
+    crawl = subparsers.add_parser("crawl", help="Парсинг категорій")
+    target = crawl.add_mutually_exclusive_group(required=True)
+    target.add_argument("--category", type=int, action="append", help="Номер категорії (можна кілька)")
+    target.add_argument("--url", action="append", help="URL категорії або пошуку (можна кілька)")
+    target.add_argument("--all", action="store_true", help="Всі категорії верхнього рівня")
+    target.add_argument("--leaves", action="store_true", help="Всі листові категорії дерева")
+    target.add_argument("--site", action="append", metavar="NAME=URL",
+                        help="Весь каталог сайту NAME (olx, example, ...) - кілька сайтів паралельно")
+    crawl.add_argument("--deadline", type=float, help="Бюджет часу на обхід (сек)")
+    crawl.add_argument("--max-requests", type=int, help="Бюджет HTTP запитів")
+    crawl.add_argument("--max-mb", type=float, help="Бюджет завантажених даних (МБ)")
+
+    schedule = subparsers.add_parser("schedule", help="Демон адаптивних повторних обходів категорій")
+    schedule.add_argument("--leaves", action="store_true", help="Листові категорії дерева замість верхнього рівня")
+    schedule.add_argument("--tick", type=float, default=60.0, help="Період планування (сек)")
+    schedule.add_argument("--output", help="JSONL файл для нових оголошень")
+
+    watch = subparsers.add_parser("watch", help="Стеження за новими оголошеннями на першій сторінці")
+    watch.add_argument("--url", action="append", help="URL категорії або пошуку (можна кілька; інакше watch_urls)")
+    watch.add_argument("--interval", type=float, help="Період опитування кожного URL (сек)")
+    watch.add_argument("--sink", action="append", help="Приймач: jsonl:шлях, unix:шлях або http://... (можна кілька)")
+    watch.add_argument("--emit-initial", action="store_true", help="Відправити оголошення з першого опитування")
+
+    replay = subparsers.add_parser("replay", help="Повторне витягування з архіву сторінок без мережі")
+    replay.add_argument("archive", nargs="?", help="Директорія архіву (за замовчуванням з конфігурації)")
+    replay.add_argument("--site", default="olx", help="Парсер сайту (olx, example, ...)")
+    replay.add_argument("--url-prefix", default="", help="Тільки сторінки з URL, що починається з префікса")
+    replay.add_argument("--since", type=datetime.fromisoformat, help="Отримані не раніше (ISO час)")
+    replay.add_argument("--until", type=datetime.fromisoformat, help="Отримані не пізніше (ISO час)")
+    replay.add_argument("--all-versions", action="store_true", help="Всі версії сторінки, а не лише остання")
+    replay.add_argument("--processes", type=int, help="Кількість процесів (за замовчуванням - всі ядра)")
+    replay.add_argument("--output", help="Файл результату (.json або .olxsnap)")
+
+    export = subparsers.add_parser("export", help="Експорт збереженого результату в Excel")
+    export.add_argument("input", help="JSON файл з повними даними або знімок .olxsnap")
+    export.add_argument("--category", help="Назва категорії для файлу Excel")
+
+    bench = subparsers.add_parser("bench", help="Заміри швидкості витягування зі збережених сторінок")
+    bench.add_argument("html", nargs="+", help="Збережені HTML сторінки видачі")
+    bench.add_argument("--repeat", type=int, default=10, help="Кількість повторів")
+
+    query = subparsers.add_parser("query", help="Пошук по збережених запусках (ціна, слова, категорія)")
+    query.add_argument("inputs", nargs="*", help="JSON файли з повними даними або знімки .olxsnap "
+                                                "(за замовчуванням - всі в output_directory)")
+    query.add_argument("--text", default="", help="Слова, які мають бути в назві")
+    query.add_argument("--category", default="", help="Слова, які мають бути в назві категорії")
+    query.add_argument("--min-price", type=float, help="Мінімальна ціна")
+    query.add_argument("--max-price", type=float, help="Максимальна ціна")
+    query.add_argument("--currency", default="", help="Валюта ціни (UAH, USD, ...)")
+    query.add_argument("--available", action="store_true", help="Тільки товари в наявності")
+    query.add_argument("--sort", default="price", choices=["price", "-price", "newest", "oldest"],
+                       help="Порядок результатів")
+    query.add_argument("--limit", type=int, default=20, help="Кількість результатів")
+    query.add_argument("--json", action="store_true", help="Вивести у форматі JSON")
+
+    return arg_parser
+
+def make_config(args: argparse.Namespace) -> ParserConfig:
+    """Формує конфігурацію з файлу, змінних середовища та аргументів"""
+    config = load_config(args.config)
+    if args.base_url:
+        config.base_url = args.base_url
+    if not config.base_url:
+        config.base_url = DEFAULT_BASE_URL
+    if args.log_level:
+        config.log_level = args.log_level
+    return config
+
+async def cmd_categories(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда categories"""
+    from olx_parser import OlxPriceParser
+    from category_tree import get_leaf_categories
+
+    async with OlxPriceParser(config) as parser:
+        if args.tree or args.leaves:
+            categories = await parser.get_category_tree(force_refresh=args.refresh)
+            if args.leaves:
+                categories = get_leaf_categories(categories)
+        else:
+            categories = await parser.get_categories()
+
+    if not categories:
+        print("❌ Не знайдено категорій", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps([category.to_dict() for category in categories], ensure_ascii=False, indent=2))
+    else:
+        for i, category in enumerate(categories, 1):
+            print(f"{i}\t{category.name}\t{category.url}")
+    return 0
+
+async def cmd_crawl(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда crawl"""
+    from main import (PriceParserManager, make_export_writer, print_coverage_report, print_export_errors,
+                      process_parsing_result)
+    from category_tree import get_leaf_categories
+    from crawl_budget import CrawlBudget
+    from models import Category
+
+    if args.deadline is not None:
+        config.crawl_deadline_seconds = args.deadline
+    if args.max_requests is not None:
+        config.crawl_max_requests = args.max_requests
+    if args.max_mb is not None:
+        config.crawl_max_mb = args.max_mb
+
+    manager = PriceParserManager(config)
+    
+    if args.site:
+        return await crawl_sites(manager, args.site)
+    
+    manager.setup_parser(config.base_url)
+
+    failed = 0
+    budget = CrawlBudget.from_config(config)
+    # Запис результатів у фоні перекривається з парсингом наступної категорії
+    writer = make_export_writer(manager)
+    try:
+        async with manager.parser as parser:
+            # Визначення категорій теж витрачає бюджет
+            budget.start(parser.get_fetch_client().metrics)
+            if args.url:
+                categories = [Category(name=url.rstrip('/').rsplit('/', 1)[-1] or url, url=url) for url in args.url]
+            elif args.leaves:
+                categories = get_leaf_categories(await parser.get_category_tree())
+            else:
+                top_level = await parser.get_categories()
+                if args.all:
+                    categories = top_level
+                else:
+                    invalid = [index for index in args.category if not 1 <= index <= len(top_level)]
+                    if invalid:
+                        print(f"❌ Невірний номер категорії: {invalid} (всього {len(top_level)})", file=sys.stderr)
+                        return 2
+                    categories = [top_level[index - 1] for index in args.category]
+
+            if budget.enabled:
+                # Спершу перші сторінки всіх категорій, часткові результати при вичерпанні бюджету
+                results, report = await parser.parse_categories_within_budget(categories, budget)
+                for category, result in zip(categories, results):
+                    await process_parsing_result(manager, result, category, writer)
+                    if not result.success:
+                        failed += 1
+                print_coverage_report(report)
+            else:
+                for category in categories:
+                    result = await parser.parse_specific_category(category)
+                    await process_parsing_result(manager, result, category, writer)
+                    if not result.success:
+                        failed += 1
+    finally:
+        export_errors = await writer.close()
+        print_export_errors(export_errors)
+
+    return 1 if failed or export_errors else 0
+
+async def crawl_sites(manager, site_args: List[str]) -> int:
+    """Парсинг каталогів кількох сайтів в одному циклі подій"""
+    from dataclasses import replace
+    
+    sites = {}
+    for site_arg in site_args:
+        name, _, url = site_arg.partition('=')
+        if not url:
+            print(f"❌ Очікується NAME=URL: {site_arg}", file=sys.stderr)
+            return 2
+        sites[name] = replace(manager.config, base_url=url)
+    
+    result = await manager.run_multi_site(sites)
+    manager.save_results(result, f"sites_{'_'.join(sites)}_full.json")
+    for error in result.errors:
+        print(f"   - {error}", file=sys.stderr)
+    return 0 if result.success else 1
+
+async def cmd_schedule(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда schedule: довготривалий демон повторних обходів"""
+    import os
+    from olx_parser import OlxPriceParser
+    from category_tree import get_leaf_categories
+    from revisit_scheduler import RevisitScheduler
+    
+    output_path = args.output or os.path.join(config.output_directory, "new_ads.jsonl")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    
+    async def write_new_products(category, products):
+        with open(output_path, 'a', encoding='utf-8') as f:
+            for product in products:
+                f.write(json.dumps(product.to_dict(), ensure_ascii=False) + "\n")
+    
+    async with OlxPriceParser(config) as parser:
+        if args.leaves:
+            categories = get_leaf_categories(await parser.get_category_tree())
+        else:
+            categories = await parser.get_categories()
+        
+        scheduler = RevisitScheduler(
+            parser,
+            categories,
+            state_path=os.path.join(config.output_directory, config.revisit_state_file),
+            requests_per_hour=config.revisit_requests_per_hour,
+            max_pages=config.max_pages,
+            min_interval=config.revisit_min_interval,
+            max_interval=config.revisit_max_interval,
+            on_new_products=write_new_products
+        )
+        await scheduler.run_forever(tick_seconds=args.tick)
+    return 0
+
+async def cmd_watch(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда watch: демон стеження за першими сторінками видачі"""
+    import os
+    from olx_parser import OlxPriceParser
+    from watch import ListingWatcher, make_sink
+
+    urls = args.url or config.watch_urls
+    if not urls:
+        print("❌ Не задано URL для стеження (--url або watch_urls)", file=sys.stderr)
+        return 2
+
+    sink_specs = args.sink or config.watch_sinks or ["jsonl:new_listings.jsonl"]
+    sinks = [make_sink(spec, config.output_directory) for spec in sink_specs]
+
+    async with OlxPriceParser(config) as parser:
+        watcher = ListingWatcher(
+            parser,
+            urls,
+            sinks,
+            interval=args.interval or config.watch_interval,
+            seen_limit=config.watch_seen_limit,
+            emit_initial=args.emit_initial,
+            state_path=os.path.join(config.output_directory, config.watch_state_file)
+        )
+        await watcher.run_forever()
+    return 0
+
+def cmd_replay(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда replay: витягування товарів з архіву сирих сторінок"""
+    import os
+    from page_archive import replay_archive
+
+    archive_directory = args.archive or os.path.join(config.output_directory, config.archive_directory)
+    result = replay_archive(
+        config,
+        archive_directory,
+        parser_name=args.site,
+        processes=args.processes,
+        url_prefix=args.url_prefix,
+        since=args.since,
+        until=args.until,
+        latest_only=not args.all_versions
+    )
+
+    output = args.output or os.path.join(
+        config.output_directory, f"replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    if output.endswith(".olxsnap"):
+        from snapshot import write_snapshot
+        write_snapshot(result, output)
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+
+    replay_metrics = result.metrics["replay"]
+    print(f"Сторінок: {replay_metrics['pages']}, товарів: {result.total_products}, "
+          f"помилок: {len(result.errors)}, час: {result.parsing_time:.1f} сек")
+    print(output)
+    return 1 if result.errors else 0
+
+def cmd_export(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда export"""
+    from excel_exporter import ExcelExporter
+    from snapshot import load_result
+
+    result = load_result(args.input)
+
+    category_name = args.category or (result.products[0].category if result.products else "") or "Експорт"
+    filepath = ExcelExporter(dedup_policy=config.excel_dedup_policy).export_to_excel(result, config.output_directory, category_name)
+    print(filepath)
+    return 0
+
+def cmd_bench(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда bench: час розбору та витягування для кожної сторінки"""
+    from bs4 import BeautifulSoup
+    from olx_parser import OlxPriceParser
+
+    config.log_level = args.log_level or "WARNING"
+    parser = OlxPriceParser(config)
+
+    print("Сторінка\tРозбір, мс\tВитягування, мс\tКарток\tКарток/сек")
+    for path in args.html:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        parse_time = extract_time = 0.0
+        cards = 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            soup = BeautifulSoup(html, 'html.parser')
+            parse_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            elements = parser.layout_detector.select_cards(soup, config.base_url)
+            products = parser.extract_products_from_elements(elements, config.base_url)
+            parser.find_next_page_link(soup)
+            extract_time += time.perf_counter() - start
+            cards = len(products)
+
+        per_page_extract = extract_time / args.repeat
+        throughput = cards / per_page_extract if per_page_extract else 0.0
+        print(f"{path}\t{parse_time / args.repeat * 1000:.2f}\t{per_page_extract * 1000:.2f}\t{cards}\t{throughput:.0f}")
+
+    return 0
+
+def cmd_query(args: argparse.Namespace, config: ParserConfig) -> int:
+    """Підкоманда query: пошук по індексу збережених запусків"""
+    from query_index import ProductIndex, Query, default_query_inputs
+
+    inputs = args.inputs or default_query_inputs(config.output_directory)
+    if not inputs:
+        print(f"Немає збережених запусків в {config.output_directory}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    index = ProductIndex.from_files(inputs)
+    build_time = time.perf_counter() - start
+
+    result = index.search(Query(
+        text=args.text,
+        category=args.category,
+        min_price=args.min_price,
+        max_price=args.max_price,
+        currency=args.currency,
+        available_only=args.available,
+        sort=args.sort,
+        limit=args.limit
+    ))
+    products = index.products(result.rows)
+
+    if args.json:
+        print(json.dumps({
+            "total": result.total,
+            "products": [product.to_dict() for product in products]
+        }, ensure_ascii=False, indent=2))
+        return 0
+
+    for product in products:
+        print(f"{product.price} {product.currency}\t{product.name}\t{product.category}\t{product.product_url}")
+    print(f"Знайдено: {result.total}, показано: {len(products)} "
+          f"(запит {result.elapsed_ms:.1f} мс, індекс {len(index)} товарів за {build_time:.1f} сек)", file=sys.stderr)
+    return 0
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """Точка входу CLI, повертає код завершення"""
+    args = build_arg_parser().parse_args(argv)
+    config = make_config(args)
+
+    async_commands = {"categories": cmd_categories, "crawl": cmd_crawl, "schedule": cmd_schedule, "watch": cmd_watch}
+    if args.command in async_commands:
+        import asyncio
+        
+        return asyncio.run(async_commands[args.command](args, config))
+    if args.command == "export":
+        return cmd_export(args, config)
+    if args.command == "replay":
+        return cmd_replay(args, config)
+    if args.command == "bench":
+        return cmd_bench(args, config)
+    if args.command == "query":
+        return cmd_query(args, config)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(run())
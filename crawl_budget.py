@@ -0,0 +1,264 @@
+"""
+Обхід каталогу в межах бюджету: час, кількість запитів та обсяг даних
+
+Сторінки плануються за цінністю: спершу перші сторінки всіх категорій,
+потім другі і так далі. Коли бюджет вичерпано, нові сторінки не
+запитуються (при дедлайні незавершені запити скасовуються), а кожна
+категорія повертає вже зібрані товари разом зі звітом про покриття.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import Category, Product, ParsingResult
+
+@dataclass
+class ListingPage:
+    """Одна сторінка видачі категорії"""
+    products: List[Product]
+    next_page_url: Optional[str] = None  # None - остання сторінка
+    listing_url: str = ""                # URL для пагінації (після "Показати всі")
+    total_count: Optional[int] = None    # Лічильник оголошень (лише перша сторінка)
+
+class CrawlBudget:
+    """Ліміти обходу; 0 - без обмеження
+
+    Запити та байти рахуються за метриками спільного клієнта HTTP від
+    моменту start(), тож враховуються і повтори, і дубльовані запити.
+    """
+
+    def __init__(self, deadline_seconds: float = 0.0, max_requests: int = 0, max_bytes: int = 0):
+        self.deadline_seconds = deadline_seconds
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self._started_at: Optional[float] = None
+        self._baseline: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config) -> "CrawlBudget":
+        return cls(
+            deadline_seconds=config.crawl_deadline_seconds,
+            max_requests=config.crawl_max_requests,
+            max_bytes=int(config.crawl_max_mb * 1024 * 1024)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.deadline_seconds or self.max_requests or self.max_bytes)
+
+    def start(self, fetch_metrics: Dict[str, int]):
+        self._started_at = time.monotonic()
+        self._baseline = {"requests": fetch_metrics.get("requests", 0), "bytes": fetch_metrics.get("bytes", 0)}
+
+    def spent(self, fetch_metrics: Dict[str, int]) -> Dict[str, float]:
+        elapsed = time.monotonic() - self._started_at if self._started_at is not None else 0.0
+        return {
+            "seconds": round(elapsed, 3),
+            "requests": fetch_metrics.get("requests", 0) - self._baseline.get("requests", 0),
+            "bytes": fetch_metrics.get("bytes", 0) - self._baseline.get("bytes", 0)
+        }
+
+    def remaining_seconds(self) -> Optional[float]:
+        """Час до дедлайну (None - без дедлайну)"""
+        if not self.deadline_seconds or self._started_at is None:
+            return None
+        return max(0.0, self.deadline_seconds - (time.monotonic() - self._started_at))
+
+    def exhausted(self, fetch_metrics: Dict[str, int], reserved_requests: int = 0,
+                  next_requests: int = 1) -> Optional[str]:
+        """Причина зупинки (deadline, requests, bytes) або None, якщо бюджет ще є
+
+        reserved_requests - запити, що вже виконуються і ще не потрапили в метрики,
+        next_requests - скільки запитів може коштувати наступна дія.
+        """
+        spent = self.spent(fetch_metrics)
+        if self.deadline_seconds and spent["seconds"] >= self.deadline_seconds:
+            return "deadline"
+        if self.max_requests and spent["requests"] + reserved_requests + next_requests > self.max_requests:
+            return "requests"
+        if self.max_bytes and spent["bytes"] >= self.max_bytes:
+            return "bytes"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"deadline_seconds": self.deadline_seconds, "max_requests": self.max_requests, "max_bytes": self.max_bytes}
+
+@dataclass
+class CategoryCoverage:
+    """Покриття однієї категорії"""
+    category: Category
+    listing_url: str = ""
+    pages: int = 0
+    products: List[Product] = field(default_factory=list)
+    estimated_pages: Optional[int] = None
+    complete: bool = False
+    stopped_by: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pages": self.pages,
+            "estimated_pages": self.estimated_pages,
+            "products": len(self.products),
+            "complete": self.complete,
+            "stopped_by": self.stopped_by,
+            "errors": list(self.errors)
+        }
+
+class BudgetedCrawler:
+    """Планує сторінки всіх категорій у порядку (номер сторінки, категорія)"""
+
+    def __init__(self, parser, budget: CrawlBudget, concurrency: Optional[int] = None):
+        self.parser = parser
+        self.budget = budget
+        self.concurrency = concurrency or parser.config.max_requests_per_host
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.stop_reason: Optional[str] = None
+
+    def _fetch_metrics(self) -> Dict[str, int]:
+        return self.parser.get_fetch_client().metrics
+
+    async def _crawl_page(self, state: CategoryCoverage, page: int) -> Optional[ListingPage]:
+        if page == 1:
+            listing = await self.parser.fetch_listing_first_page(state.category)
+        else:
+            listing = await self.parser.fetch_listing_page(state.listing_url, page)
+        await asyncio.sleep(self.parser.config.delay_between_requests)
+        return listing
+
+    def _page_cost(self, page: int) -> int:
+        """Найбільша кількість запитів на сторінку (перша може перейти на "Показати всі")"""
+        return self.parser.FIRST_LISTING_PAGE_REQUESTS if page == 1 else 1
+
+    def _record(self, state: CategoryCoverage, page: int, listing: ListingPage):
+        state.pages += 1
+        if page == 1:
+            state.listing_url = listing.listing_url or state.category.url
+            if listing.total_count is not None and listing.products:
+                state.estimated_pages = min(
+                    self.parser.config.max_pages, math.ceil(listing.total_count / len(listing.products))
+                )
+        for product in listing.products:
+            product.category = state.category.name
+        state.products.extend(listing.products)
+        self.parser.queue_images(listing.products)
+        if self.parser.STREAMS_PRICE_STATS:
+            self.parser.record_price_stats(state.category.name, listing.products)
+
+    async def run(self, categories: List[Category]) -> List[CategoryCoverage]:
+        """Обходить категорії до кінця пагінації або вичерпання бюджету"""
+        states = [CategoryCoverage(category=category) for category in categories]
+        queue: List[Tuple[int, int]] = [(1, index) for index in range(len(states))]
+        heapq.heapify(queue)
+        # Задача -> (сторінка, індекс категорії, зарезервовані запити)
+        in_flight: Dict[asyncio.Future, Tuple[int, int, int]] = {}
+
+        try:
+            while queue or in_flight:
+                while queue and len(in_flight) < self.concurrency and self.stop_reason is None:
+                    cost = self._page_cost(queue[0][0])
+                    reason = self.budget.exhausted(
+                        self._fetch_metrics(),
+                        reserved_requests=sum(reserved for _, _, reserved in in_flight.values()),
+                        next_requests=cost
+                    )
+                    if reason == "requests" and in_flight:
+                        # Резерв може бути більшим за справжню ціну - чекаємо завершення сторінок
+                        break
+                    self.stop_reason = reason
+                    if self.stop_reason is not None:
+                        self.logger.info("Бюджет обходу вичерпано (%s)", self.stop_reason)
+                        break
+                    page, index = heapq.heappop(queue)
+                    in_flight[asyncio.ensure_future(self._crawl_page(states[index], page))] = (page, index, cost)
+
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=self.budget.remaining_seconds(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Дедлайн: незавершені сторінки не чекаємо
+                    self.stop_reason = "deadline"
+                    self.logger.info("Дедлайн обходу - скасовано %s запитів", len(in_flight))
+                    break
+
+                for task in done:
+                    page, index, _ = in_flight.pop(task)
+                    state = states[index]
+                    # Невдала сторінка зупиняє лише свою категорію, зібрані товари лишаються
+                    try:
+                        listing = task.result()
+                    except Exception as e:
+                        state.errors.append(f"Помилка при парсингу категорії {state.category.name}, сторінка {page}: {e}")
+                        state.stopped_by = "error"
+                        continue
+                    if listing is None:
+                        state.errors.append(f"Не вдалося отримати сторінку {page} категорії {state.category.name}")
+                        state.stopped_by = "error"
+                        continue
+
+                    self._record(state, page, listing)
+                    if listing.products and listing.next_page_url and page < self.parser.config.max_pages:
+                        heapq.heappush(queue, (page + 1, index))
+                    else:
+                        state.complete = True
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        for state in states:
+            if not state.complete and not state.errors:
+                state.stopped_by = self.stop_reason
+        return states
+
+    def coverage_report(self, states: List[CategoryCoverage]) -> Dict[str, Any]:
+        """Звіт про покриття: витрачений бюджет та сторінки по категоріях"""
+        estimated = sum(state.estimated_pages or state.pages for state in states)
+        crawled = sum(state.pages for state in states)
+        return {
+            "budget": self.budget.to_dict(),
+            "spent": self.budget.spent(self._fetch_metrics()),
+            "stop_reason": self.stop_reason,
+            "pages_crawled": crawled,
+            "pages_estimated": estimated,
+            "page_coverage": round(crawled / estimated, 4) if estimated else 0.0,
+            "categories_complete": sum(state.complete for state in states),
+            "categories": {state.category.name: state.to_dict() for state in states}
+        }
+
+def format_coverage_report(report: Dict[str, Any]) -> List[str]:
+    """Рядки звіту про покриття для консолі"""
+    spent = report["spent"]
+    lines = [
+        f"Бюджет: {spent['seconds']:.1f} сек, {spent['requests']} запитів, {spent['bytes'] / 1024 / 1024:.1f} МБ"
+        + (f" - зупинено ({report['stop_reason']})" if report["stop_reason"] else ""),
+        f"Сторінок: {report['pages_crawled']} з ~{report['pages_estimated']} ({report['page_coverage']:.0%}), "
+        f"повних категорій: {report['categories_complete']} з {len(report['categories'])}"
+    ]
+    for name, coverage in report["categories"].items():
+        status = "повністю" if coverage["complete"] else f"частково ({coverage['stopped_by'] or 'помилка'})"
+        lines.append(f"  {name}: {coverage['pages']}/{coverage['estimated_pages'] or '?'} сторінок, "
+                     f"{coverage['products']} товарів - {status}")
+    return lines
+
+def coverage_result(parser, state: CategoryCoverage, parsing_time: float) -> ParsingResult:
+    """Частковий або повний результат категорії з її покриттям"""
+    metrics = parser.get_metrics(categories=[state.category.name])
+    metrics["coverage"] = state.to_dict()
+    return ParsingResult(
+        success=bool(state.products) or not state.errors,
+        products=state.products,
+        categories=[state.category],
+        errors=list(state.errors),
+        total_products=len(state.products),
+        total_categories=1,
+        parsing_time=parsing_time,
+        metrics=metrics,
+        price_stats=parser.price_stats.to_dict(categories=[state.category.name])
+    )
@@ -10,12 +10,13 @@ from decimal import Decimal
 from base_parser import BasePriceParser
 from models import Product, Category, ParsingResult
 from config import ParserConfig
+from http_client import FetchClient
 
 class ExamplePriceParser(BasePriceParser):
     """Приклад парсера для демонстрації"""
     
-    def __init__(self, config: ParserConfig):
-        super().__init__(config)
+    def __init__(self, config: ParserConfig, fetch_client: Optional[FetchClient] = None):
+        super().__init__(config, fetch_client)
         self.logger.info("Ініціалізовано ExamplePriceParser")
     
     async def get_categories(self) -> List[Category]:
@@ -27,10 +28,10 @@ class ExamplePriceParser(BasePriceParser):
             Category(name="Книги", url=f"{self.config.base_url}/books")
         ]
         
-        self.logger.info(f"Знайдено {len(categories)} категорій (приклад)")
+        self.logger.info("Знайдено %s категорій (приклад)", len(categories))
         return categories
     
-    async def get_products_from_category(self, category: Category) -> List[Product]:
+    async def get_products_from_category(self, category: Category, max_pages: Optional[int] = None) -> List[Product]:
         """Отримання товарів з конкретної категорії - приклад"""
         # Це приклад - в реальному проекті тут буде парсинг сторінки
         products = []
@@ -49,7 +50,17 @@ class ExamplePriceParser(BasePriceParser):
             )
             products.append(product)
         
-        self.logger.info(f"Знайдено {len(products)} товарів в категорії {category.name}")
+        self.logger.info("Знайдено %s товарів в категорії %s", len(products), category.name)
+        return products
+    
+    def extract_listing_products(self, soup: BeautifulSoup, page_url: str) -> List[Product]:
+        """Товари зі сторінки видачі - приклад"""
+        # Це приклад - картки товарів позначені класом product
+        products = []
+        for element in soup.find_all(class_=re.compile(r'product')):
+            product = self.extract_product_data_from_element(element, page_url)
+            if product:
+                products.append(product)
         return products
     
     def extract_product_data_from_element(self, element: Tag, base_url: str) -> Optional[Product]:
@@ -90,7 +101,7 @@ class ExamplePriceParser(BasePriceParser):
             return product
             
         except Exception as e:
-            self.logger.error(f"Помилка при витягуванні даних про товар: {e}")
+            self.logger.error("Помилка при витягуванні даних про товар: %s", e)
             return None
     
     def extract_price(self, price_text: str) -> Optional[Decimal]:
@@ -109,6 +120,6 @@ class ExamplePriceParser(BasePriceParser):
                 return Decimal(price_str)
                 
         except (ValueError, AttributeError, TypeError):
-            self.logger.warning(f"Не вдалося розпарсити ціну: {price_text}")
+            self.logger.warning("Не вдалося розпарсити ціну: %s", price_text)
         
         return None
@@ -3,21 +3,46 @@
 """
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Set
+from decimal import Decimal, InvalidOperation
+from typing import List, Dict, Any, Optional, Set, TYPE_CHECKING
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 
 
 from models import Product, ParsingResult
+from near_duplicates import NearDuplicateIndex
+
+if TYPE_CHECKING:
+    from change_detection import ChangeRecord
+
+# Лист з дельтою відносно попереднього запуску
+CHANGES_SHEET = "Changes"
+
+CHANGE_LABELS = {
+    "added": "Нове",
+    "removed": "Зняте",
+    "price": "Ціна",
+    "title": "Назва"
+}
 
 class ExcelExporter:
     """Клас для експорту даних в Excel формат"""
     
-    def __init__(self):
+    def __init__(self, dedup_policy: str = "exact"):
+        if dedup_policy not in ("exact", "near"):
+            raise ValueError(f"Невідома політика дублікатів: {dedup_policy}")
+        
         self.workbook = None
         self.worksheet = None
         self.existing_products: Set[str] = set()  # Множина існуючих назв товарів
+        
+        # Політика "near" додатково відсіює майже-дублікати (перевипущені оголошення)
+        self.dedup_policy = dedup_policy
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
+        self.existing_clusters: Set[str] = set()
+        if dedup_policy == "near":
+            self.near_duplicates = NearDuplicateIndex()
     
     def create_workbook(self, category_name: str) -> str:
         """Створює новий Excel файл з назвою категорії"""
@@ -98,6 +123,8 @@ class ExcelExporter:
         """Завантажує існуючі назви товарів з листа"""
         try:
             self.existing_products.clear()
+            if self.near_duplicates is not None:
+                self.near_duplicates = NearDuplicateIndex(threshold=self.near_duplicates.threshold)
             
             # Перевіряємо чи є заголовки
             if self.worksheet.max_row < 2:
@@ -110,6 +137,14 @@ class ExcelExporter:
                     # Нормалізуємо назву для порівняння
                     normalized_name = self._normalize_product_name(str(cell_value))
                     self.existing_products.add(normalized_name)
+                    
+                    if self.near_duplicates is not None:
+                        price_value = self.worksheet.cell(row=row, column=2).value
+                        try:
+                            price = Decimal(str(price_value or "0"))
+                        except InvalidOperation:
+                            price = Decimal("0")
+                        self.near_duplicates.add(str(cell_value), price, f"row-{row}")
             
             print(f"📋 Завантажено {len(self.existing_products)} існуючих товарів")
             
@@ -129,7 +164,15 @@ class ExcelExporter:
     def is_duplicate_product(self, product: Product) -> bool:
         """Перевіряє чи є товар дублікатом"""
         normalized_name = self._normalize_product_name(product.name)
-        return normalized_name in self.existing_products
+        if normalized_name in self.existing_products:
+            return True
+        
+        if self.near_duplicates is not None:
+            if product.duplicate_cluster and product.duplicate_cluster in self.existing_clusters:
+                return True
+            return self.near_duplicates.find(product.name, product.price) is not None
+        
+        return False
     
     def setup_headers(self):
         """Налаштовує заголовки колонок"""
@@ -213,6 +256,11 @@ class ExcelExporter:
                 normalized_name = self._normalize_product_name(product.name)
                 self.existing_products.add(normalized_name)
                 
+                if self.near_duplicates is not None:
+                    self.near_duplicates.add(product.name, product.price, product.sku or product.product_url)
+                    if product.duplicate_cluster:
+                        self.existing_clusters.add(product.duplicate_cluster)
+                
                 new_products_count += 1
                     
             except Exception as e:
@@ -224,6 +272,37 @@ class ExcelExporter:
         
         return new_products_count, duplicate_products_count
     
+    def add_changes_sheet(self, changes: List["ChangeRecord"]):
+        """Замінює лист змін дельтою поточного запуску"""
+        if CHANGES_SHEET in self.workbook.sheetnames:
+            self.workbook.remove(self.workbook[CHANGES_SHEET])
+        sheet = self.workbook.create_sheet(title=CHANGES_SHEET)
+        
+        headers = ["Зміна", "Назва товару", "Стара ціна", "Нова ціна", "Валюта", "Стара назва", "Посилання"]
+        widths = [12, 80, 15, 15, 10, 60, 20]
+        for col, (header, width) in enumerate(zip(headers, widths), 1):
+            cell = sheet.cell(row=1, column=col, value=header)
+            cell.font = Font(bold=True, color="FFFFFF")
+            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            sheet.column_dimensions[get_column_letter(col)].width = width
+        
+        for row, change in enumerate(changes, 2):
+            sheet.cell(row=row, column=1, value=CHANGE_LABELS.get(change.change, change.change))
+            sheet.cell(row=row, column=2, value=change.name or "Без назви")
+            for col, price in ((3, change.old_price), (4, change.new_price)):
+                if price is not None:
+                    sheet.cell(row=row, column=col, value=str(price)).alignment = Alignment(horizontal="right")
+            sheet.cell(row=row, column=5, value=change.currency)
+            if change.change == "title":
+                sheet.cell(row=row, column=6, value=change.old_name)
+            if change.product_url:
+                link_cell = sheet.cell(row=row, column=7, value="Перейти до товару")
+                link_cell.hyperlink = change.product_url
+                link_cell.font = Font(color="0000FF", underline="single")
+        
+        print(f"🔁 Змін відносно попереднього запуску: {len(changes)}")
+    
     def apply_alternating_row_colors(self):
         """Застосовує чергування кольорів рядків для кращої читабельності"""
         try:
@@ -264,8 +343,9 @@ class ExcelExporter:
         except Exception as e:
             raise Exception(f"Помилка при збереженні файлу: {e}")
     
-    def export_to_excel(self, result: ParsingResult, output_directory: str, category_name: str) -> str:
-        """Основна функція експорту в Excel"""
+    def export_to_excel(self, result: ParsingResult, output_directory: str, category_name: str,
+                        changes: Optional[List["ChangeRecord"]] = None) -> str:
+        """Основна функція експорту в Excel (changes - лист змін відносно попереднього запуску)"""
         try:
             # Перевіряємо наявність даних
             if not result.products:
@@ -286,6 +366,9 @@ class ExcelExporter:
                     # Застосовуємо стилі
                     self.apply_alternating_row_colors()
                     
+                    if changes is not None:
+                        self.add_changes_sheet(changes)
+                    
                     # Зберігаємо оновлений файл
                     self.workbook.save(existing_file)
                     return existing_file
@@ -304,6 +387,9 @@ class ExcelExporter:
             # Застосовуємо стилі
             self.apply_alternating_row_colors()
             
+            if changes is not None:
+                self.add_changes_sheet(changes)
+            
             # Зберігаємо файл
             filepath = self.save_workbook(output_directory, category_name)
             
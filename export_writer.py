@@ -0,0 +1,83 @@
+"""
+Фоновий запис результатів категорій
+
+Запис JSON, знімка та Excel виконується в окремому потоці, тож наступна
+категорія парситься, поки попередня записується на диск. Черга обмежена:
+якщо запис не встигає, парсинг чекає на вільне місце, а не накопичує
+результати в пам'яті. close() чекає завершення всіх записів і повертає
+помилки, щоб вони не загубились наприкінці запуску.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from models import Category, ParsingResult
+
+# Маркер кінця черги
+_END = object()
+
+class ExportWriter:
+    """Черга записів результатів з одним потоком запису
+
+    export(result, category) виконується в потоці та повертає записані
+    файли; один потік зберігає порядок записів і не навантажує openpyxl
+    паралельними книгами.
+    """
+
+    def __init__(self, export: Callable[[ParsingResult, Category], Dict[str, str]], queue_size: int = 2):
+        self.export = export
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.errors: List[str] = []
+        self.written: List[Dict[str, str]] = []
+        self.metrics: Dict[str, Any] = {
+            "submitted": 0, "written": 0, "failed": 0, "queue_wait_seconds": 0.0, "write_seconds": 0.0
+        }
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size, 1))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+        self._worker: Optional[asyncio.Future] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def submit(self, result: ParsingResult, category: Category):
+        """Ставить результат у чергу запису (чекає, якщо черга заповнена)"""
+        if self._worker is None:
+            self._worker = asyncio.ensure_future(self._run())
+        start = time.perf_counter()
+        await self._queue.put((result, category))
+        self.metrics["queue_wait_seconds"] += time.perf_counter() - start
+        self.metrics["submitted"] += 1
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            result, category = item
+            start = time.perf_counter()
+            try:
+                files = await loop.run_in_executor(self._executor, self.export, result, category)
+                self.written.append(files)
+                self.metrics["written"] += 1
+            except Exception as e:
+                error_msg = f"Помилка при збереженні категорії {category.name}: {e}"
+                self.errors.append(error_msg)
+                self.metrics["failed"] += 1
+                self.logger.error(error_msg)
+            finally:
+                self.metrics["write_seconds"] += time.perf_counter() - start
+
+    async def close(self) -> List[str]:
+        """Чекає завершення всіх записів і повертає помилки"""
+        if self._worker is not None:
+            await self._queue.put(_END)
+            await self._worker
+            self._worker = None
+        self._executor.shutdown(wait=True)
+        return self.errors
@@ -0,0 +1,270 @@
+"""
+Спільний шар HTTP запитів: один пул з'єднань на всі парсери
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional
+
+from config import ParserConfig
+from proxy_pool import IdentityPool
+
+# Статуси, що свідчать про блокування або проблеми проксі
+PROXY_FAILURE_STATUSES = {403, 407, 429}
+
+# Скільки останніх затримок зберігати для оцінки квантиля
+LATENCY_WINDOW = 500
+
+@dataclass
+class FetchResponse:
+    """Відповідь сервера"""
+    url: str
+    status: int
+    text: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    content: bytes = b""  # Тіло без декодування (лише з raw=True)
+
+class FetchClient:
+    """Пул з'єднань aiohttp з лімітом на хост та глобальним лімітом одночасних запитів
+
+    Один клієнт можна передати кільком парсерам, щоб вони ділили сокети
+    та загальний бюджет паралельності в одному циклі подій.
+
+    Таймаути задаються окремо для з'єднання, першого байта (і пауз між частинами
+    тіла) та всього запиту. З hedge=True запит, що не отримав відповіді за
+    спостережуваний квантиль затримки, дублюється через інше з'єднання (і інший
+    проксі), перемагає перша успішна відповідь. Затримка відраховується від
+    отримання слота, а без вільного слота запит не дублюється.
+    """
+
+    def __init__(self, max_concurrency: int = 10, per_host_limit: int = 4,
+                 user_agent: str = "Mozilla/5.0", identity_pool: Optional[IdentityPool] = None,
+                 total_timeout: float = 30.0, connect_timeout: float = 10.0, first_byte_timeout: float = 15.0,
+                 hedge: bool = False, hedge_quantile: float = 0.95, hedge_min_samples: int = 20):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.identity_pool = identity_pool or IdentityPool(user_agents=[user_agent])
+        self.total_timeout = total_timeout
+        self.connect_timeout = connect_timeout
+        self.first_byte_timeout = first_byte_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.metrics: Dict[str, int] = {
+            "requests": 0, "errors": 0, "timeouts": 0, "bytes": 0, "hedged": 0, "hedge_wins": 0,
+            "hedge_skipped": 0, "streamed": 0, "stream_early_stops": 0
+        }
+
+    @classmethod
+    def from_config(cls, config: ParserConfig) -> "FetchClient":
+        """Створює клієнт з налаштувань парсера"""
+        return cls(
+            max_concurrency=config.max_concurrent_requests,
+            per_host_limit=config.max_requests_per_host,
+            identity_pool=IdentityPool.from_config(config),
+            total_timeout=config.request_timeout,
+            connect_timeout=config.connect_timeout,
+            first_byte_timeout=config.first_byte_timeout,
+            hedge=config.hedge_requests,
+            hedge_quantile=config.hedge_quantile,
+            hedge_min_samples=config.hedge_min_samples
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _get_session(self):
+        """Створює сесію при першому запиті (всередині циклу подій)"""
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_limit)
+            timeout = aiohttp.ClientTimeout(
+                total=self.total_timeout,
+                sock_connect=self.connect_timeout,
+                sock_read=self.first_byte_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """Закриває пул з'єднань"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        """Квантиль затримки останніх відповідей (None, доки відповідей замало)"""
+        if len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(math.ceil(quantile * len(ordered)) - 1, len(ordered) - 1)]
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None,
+                    raw: bool = False) -> Optional[FetchResponse]:
+        """Виконує GET запит; повертає None при мережевій помилці
+
+        raw=True - тіло повертається байтами в content (зображення тощо).
+        """
+        hedge_delay = self.latency_quantile(self.hedge_quantile) if self.hedge else None
+        if hedge_delay is None:
+            return await self._fetch_once(url, headers, raw)
+
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(self._fetch_once(url, headers, raw, started))
+        tasks = [primary]
+        try:
+            # Час в черзі до семафора не рахується: затримка - від отримання слота
+            slot = asyncio.ensure_future(started.wait())
+            try:
+                await asyncio.wait({primary, slot}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                slot.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=hedge_delay)
+            if primary.done():
+                return primary.result()
+            if self._semaphore.locked():
+                # Вільних слотів немає - дубль лише став би в чергу і подвоїв навантаження
+                self.metrics["hedge_skipped"] += 1
+                return await primary
+
+            # Відповідь затримується довше квантиля - дублюємо запит
+            self.metrics["hedged"] += 1
+            hedge = asyncio.ensure_future(self._fetch_once(url, headers, raw))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            result = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response = task.result()
+                    if response is not None and result is None:
+                        result = response
+                        if task is hedge:
+                            self.metrics["hedge_wins"] += 1
+                if result is not None:
+                    break
+            return result
+        finally:
+            # Програшний (або скасований разом з викликом) запит не продовжується
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _fetch_once(self, url: str, headers: Optional[Dict[str, str]] = None, raw: bool = False,
+                          started: Optional[asyncio.Event] = None) -> Optional[FetchResponse]:
+        """Одна спроба запиту через обраний проксі (started - подія отримання слота)"""
+        session = self._get_session()
+        identity = self.identity_pool.acquire()
+        request_headers = {'User-Agent': identity.user_agent}
+        if headers:
+            request_headers.update(headers)
+
+        async with self._semaphore:
+            if started is not None:
+                started.set()
+            start = time.perf_counter()
+            self.metrics["requests"] += 1
+            try:
+                async with session.get(url, headers=request_headers, proxy=identity.proxy_url) as response:
+                    text = ""
+                    body = b""
+                    if response.status == 200:
+                        body = await response.read()
+                        self.metrics["bytes"] += len(body)
+                        if not raw:
+                            text = body.decode(response.get_encoding(), errors='replace')
+                    elapsed = time.perf_counter() - start
+                    ok = response.status < 500 and response.status not in PROXY_FAILURE_STATUSES
+                    self.identity_pool.report(identity, ok, elapsed)
+                    if ok:
+                        self._latencies.append(elapsed)
+                    return FetchResponse(
+                        url=str(response.url),
+                        status=response.status,
+                        text=text,
+                        headers=dict(response.headers),
+                        elapsed=elapsed,
+                        content=body if raw else b""
+                    )
+            except asyncio.TimeoutError:
+                self.metrics["timeouts"] += 1
+                self.identity_pool.report(identity, False, time.perf_counter() - start)
+                self.logger.warning("Таймаут запиту %s через %s", url, identity.proxy_url or "direct")
+                return None
+            except Exception as e:
+                self.metrics["errors"] += 1
+                self.identity_pool.report(identity, False, time.perf_counter() - start)
+                self.logger.error("Помилка при отриманні %s через %s: %s", url, identity.proxy_url or "direct", e)
+                return None
+
+    async def fetch_stream(self, url: str, consumer: Callable[[bytes], bool],
+                           headers: Optional[Dict[str, str]] = None, chunk_size: int = 16384,
+                           drain_limit: int = 65536) -> Optional[FetchResponse]:
+        """GET запит з передачею тіла частинами в consumer
+
+        consumer повертає True, коли далі читати не потрібно. Якщо залишок тіла
+        відомий і не більший за drain_limit, він дочитується без обробки, щоб
+        з'єднання повернулось у пул; інакше з'єднання закривається. Тіло в
+        FetchResponse не зберігається. Дубльовані запити тут не застосовуються.
+        """
+        session = self._get_session()
+        identity = self.identity_pool.acquire()
+        request_headers = {'User-Agent': identity.user_agent}
+        if headers:
+            request_headers.update(headers)
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            self.metrics["requests"] += 1
+            try:
+                async with session.get(url, headers=request_headers, proxy=identity.proxy_url) as response:
+                    if response.status == 200:
+                        self.metrics["streamed"] += 1
+                        received = 0
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            received += len(chunk)
+                            self.metrics["bytes"] += len(chunk)
+                            if consumer(chunk):
+                                remaining = (response.content_length - received
+                                             if response.content_length is not None else None)
+                                if remaining is not None and remaining <= drain_limit:
+                                    self.metrics["bytes"] += len(await response.read())
+                                else:
+                                    self.metrics["stream_early_stops"] += 1
+                                    response.close()
+                                break
+                    elapsed = time.perf_counter() - start
+                    ok = response.status < 500 and response.status not in PROXY_FAILURE_STATUSES
+                    self.identity_pool.report(identity, ok, elapsed)
+                    if ok:
+                        self._latencies.append(elapsed)
+                    return FetchResponse(
+                        url=str(response.url),
+                        status=response.status,
+                        headers=dict(response.headers),
+                        elapsed=elapsed
+                    )
+            except asyncio.TimeoutError:
+                self.metrics["timeouts"] += 1
+                self.identity_pool.report(identity, False, time.perf_counter() - start)
+                self.logger.warning("Таймаут запиту %s через %s", url, identity.proxy_url or "direct")
+                return None
+            except Exception as e:
+                self.metrics["errors"] += 1
+                self.identity_pool.report(identity, False, time.perf_counter() - start)
+                self.logger.error("Помилка при отриманні %s через %s: %s", url, identity.proxy_url or "direct", e)
+                return None
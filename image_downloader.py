@@ -0,0 +1,170 @@
+"""
+Завантаження зображень оголошень зі сховищем за хешем вмісту
+
+Файли зберігаються як <sha256>.<розширення> (у піддиректоріях за першими
+двома символами хешу), тож однакове зображення перевипущених оголошень
+зберігається один раз. Поруч ведеться компактний індекс URL → файл
+(index.tsv, лише дописування), за яким уже збережені URL не запитуються
+повторно. Зображення завантажуються фоновими обробниками через спільний
+клієнт HTTP паралельно з обходом і в межах частки бюджету запитів.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from models import Product
+
+INDEX_FILE = "index.tsv"
+
+# Розширення файлу за Content-Type
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/avif": ".avif",
+}
+
+class ImageStore:
+    """Файли зображень за хешем вмісту та індекс URL → файл"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index: Dict[str, str] = {}
+        self._load_index()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                url, _, name = line.rstrip('\n').partition('\t')
+                if url and name:
+                    self.index[url] = name
+
+    def path_for(self, name: str) -> str:
+        """Шлях до файлу зображення в сховищі"""
+        return os.path.join(self.directory, name[:2], name)
+
+    def add(self, url: str, content: bytes, content_type: str = "") -> bool:
+        """Зберігає зображення; повертає True, якщо такого вмісту ще не було"""
+        mime = content_type.split(';', 1)[0].strip().lower()
+        name = hashlib.sha256(content).hexdigest() + IMAGE_EXTENSIONS.get(mime, ".bin")
+        path = self.path_for(name)
+
+        is_new = not os.path.exists(path)
+        if is_new:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        self.index[url] = name
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(f"{url}\t{name}\n")
+        return is_new
+
+class ImageDownloader:
+    """Фонові обробники, що завантажують зображення з черги URL
+
+    submit() не блокує обхід: URL потрапляють у чергу, а обробники (не
+    більше concurrency одночасно) завантажують їх через спільний FetchClient.
+    max_requests обмежує власні запити завантажувача, budget - спільний
+    бюджет обходу; після їх вичерпання решта URL пропускається.
+    """
+
+    def __init__(self, fetch_client, store: ImageStore, concurrency: int = 4,
+                 max_requests: int = 0, budget=None):
+        self.fetch_client = fetch_client
+        self.store = store
+        self.concurrency = concurrency
+        self.max_requests = max_requests
+        self.budget = budget
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.metrics: Dict[str, int] = {
+            "queued": 0, "downloaded": 0, "stored": 0, "deduplicated": 0,
+            "already_stored": 0, "failed": 0, "skipped_budget": 0, "bytes": 0
+        }
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._queued: Set[str] = set()
+
+    def submit(self, products: Iterable[Product]):
+        """Ставить в чергу зображення товарів, яких ще немає в сховищі"""
+        for product in products:
+            url = product.image_url
+            if not url or url in self._queued:
+                continue
+            self._queued.add(url)
+            if url in self.store.index:
+                self.metrics["already_stored"] += 1
+                continue
+            self._ensure_workers()
+            self._queue.put_nowait(url)
+            self.metrics["queued"] += 1
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._workers:
+            self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+
+    def _budget_exhausted(self) -> bool:
+        if self.max_requests and self.metrics["downloaded"] + self.metrics["failed"] >= self.max_requests:
+            return True
+        return self.budget is not None and self.budget.exhausted(self.fetch_client.metrics) is not None
+
+    async def _worker(self):
+        while True:
+            url = await self._queue.get()
+            try:
+                if self._budget_exhausted():
+                    self.metrics["skipped_budget"] += 1
+                    continue
+                await self._download(url)
+            except Exception as e:
+                self.metrics["failed"] += 1
+                self.logger.error("Помилка при збереженні зображення %s: %s", url, e)
+            finally:
+                self._queue.task_done()
+
+    async def _download(self, url: str):
+        response = await self.fetch_client.fetch(url, raw=True)
+        if response is None or response.status != 200 or not response.content:
+            self.metrics["failed"] += 1
+            return
+        self.metrics["downloaded"] += 1
+        self.metrics["bytes"] += len(response.content)
+
+        content_type = next((value for key, value in response.headers.items() if key.lower() == 'content-type'), "")
+        if self.store.add(url, response.content, content_type):
+            self.metrics["stored"] += 1
+        else:
+            # Той самий вміст під іншим URL (перевипущене оголошення)
+            self.metrics["deduplicated"] += 1
+
+    async def drain(self):
+        """Чекає завершення всіх завантажень у черзі та зупиняє обробники"""
+        if self._queue is not None:
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    def attach(self, products: Iterable[Product]):
+        """Записує ім'я файлу зображення в атрибути товарів"""
+        for product in products:
+            name = self.store.index.get(product.image_url)
+            if name:
+                product.attributes["image_file"] = name
+
+    def summary(self) -> Dict[str, Any]:
+        return dict(self.metrics, directory=self.store.directory)
@@ -0,0 +1,150 @@
+"""
+Визначення макета сторінки та вибір стратегії витягування карток товарів
+"""
+import copy
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, Tag
+
+@dataclass(frozen=True)
+class LayoutStrategy:
+    """Відома стратегія витягування карток зі сторінки"""
+    name: str                # Назва стратегії
+    page_type: str           # Тип сторінки (listing, empty_listing)
+    fingerprint: str         # CSS селектор, за яким впізнається макет
+    card_selector: str = ""  # CSS селектор карток товарів
+
+# Відомі макети сторінок OLX.ua (порядок має значення - від найточнішого)
+OLX_LAYOUT_STRATEGIES: List[LayoutStrategy] = [
+    LayoutStrategy(
+        name="olx_listing_grid",
+        page_type="listing",
+        fingerprint='div[data-testid="listing-grid"] div[data-cy="l-card"]',
+        card_selector='div[data-testid="listing-grid"] div[data-cy="l-card"]'
+    ),
+    LayoutStrategy(
+        name="olx_l_card",
+        page_type="listing",
+        fingerprint='div[data-cy="l-card"]',
+        card_selector='div[data-cy="l-card"]'
+    ),
+    LayoutStrategy(
+        name="olx_l_card_testid",
+        page_type="listing",
+        fingerprint='div[data-testid="l-card"]',
+        card_selector='div[data-testid="l-card"]'
+    ),
+    LayoutStrategy(
+        name="olx_empty_listing",
+        page_type="empty_listing",
+        fingerprint='div[data-testid="listing-grid"], div[data-testid="total-count"]'
+    ),
+]
+
+_DIGITS_RE = re.compile(r'\d+')
+
+# Скільки прикладів нерозпізнаних URL зберігати в метриках
+MAX_UNMATCHED_URLS = 20
+
+class LayoutDetector:
+    """Класифікує сторінку один раз і кешує стратегію для шаблону URL
+
+    Кеш і метрики захищені блокуванням: етапи розбору конвеєра викликають
+    детектор з кількох потоків.
+    """
+
+    def __init__(self, strategies: Optional[List[LayoutStrategy]] = None):
+        self.strategies = strategies if strategies is not None else OLX_LAYOUT_STRATEGIES
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._cache: Dict[str, LayoutStrategy] = {}
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, Any] = {
+            "pages_classified": 0,
+            "cache_hits": 0,
+            "cache_invalidations": 0,
+            "layout_unmatched": 0,
+            "unmatched_urls": [],
+            "strategies": {}
+        }
+
+    @staticmethod
+    def url_pattern(url: str) -> str:
+        """Шаблон URL: хост, мовний префікс та глибина шляху без параметрів"""
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split('/') if segment]
+
+        prefix = []
+        if segments and len(segments[0]) == 2:
+            # Мовний префікс (/uk/) зберігаємо як є
+            prefix = [segments.pop(0)]
+
+        pattern_path = '/'.join(prefix + ['*'] * len(segments))
+        return _DIGITS_RE.sub('#', f"{parts.netloc.lower()}/{pattern_path}")
+
+    def classify(self, soup: BeautifulSoup) -> Optional[LayoutStrategy]:
+        """Визначає стратегію за ознаками макета без кешу"""
+        with self._lock:
+            self.metrics["pages_classified"] += 1
+        for strategy in self.strategies:
+            if soup.select_one(strategy.fingerprint) is not None:
+                return strategy
+        return None
+
+    def detect(self, soup: BeautifulSoup, url: str) -> Optional[LayoutStrategy]:
+        """Повертає стратегію для сторінки, використовуючи кеш шаблонів URL"""
+        pattern = self.url_pattern(url)
+        with self._lock:
+            cached = self._cache.get(pattern)
+
+        if cached is not None:
+            if soup.select_one(cached.fingerprint) is not None:
+                with self._lock:
+                    self.metrics["cache_hits"] += 1
+                return cached
+            # Макет змінився - класифікуємо заново (інший потік міг уже прибрати запис)
+            with self._lock:
+                self.metrics["cache_invalidations"] += 1
+                if self._cache.get(pattern) is cached:
+                    del self._cache[pattern]
+
+        strategy = self.classify(soup)
+        if strategy is not None and strategy.card_selector:
+            # Кешуємо тільки макети з картками - порожня видача не визначає шаблон
+            with self._lock:
+                self._cache[pattern] = strategy
+            self.logger.debug("Макет %s для шаблону %s: %s", strategy.page_type, pattern, strategy.name)
+        return strategy
+
+    def select_cards(self, soup: BeautifulSoup, url: str) -> List[Tag]:
+        """Повертає картки товарів або порожній список, якщо макет невідомий"""
+        strategy = self.detect(soup, url)
+
+        if strategy is None:
+            with self._lock:
+                self.metrics["layout_unmatched"] += 1
+                unmatched = self.metrics["layout_unmatched"]
+                if len(self.metrics["unmatched_urls"]) < MAX_UNMATCHED_URLS:
+                    self.metrics["unmatched_urls"].append(url)
+            self.logger.warning(
+                "Невідомий макет сторінки %s (layout_unmatched=%d) - витягування пропущено",
+                url, unmatched
+            )
+            return []
+
+        with self._lock:
+            strategy_counts = self.metrics["strategies"]
+            strategy_counts[strategy.name] = strategy_counts.get(strategy.name, 0) + 1
+
+        if not strategy.card_selector:
+            return []
+        return soup.select(strategy.card_selector)
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """Копія метрик, яку можна читати, поки етапи конвеєра їх оновлюють"""
+        with self._lock:
+            return copy.deepcopy(self.metrics)
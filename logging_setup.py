@@ -0,0 +1,81 @@
+"""
+Неблокуюче налаштування логування через QueueHandler/QueueListener
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime
+from typing import Optional
+
+from config import ParserConfig
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+class JsonLinesFormatter(logging.Formatter):
+    """Форматує записи логу як JSON рядки"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+def setup_logging(config: ParserConfig) -> None:
+    """Налаштовує логування один раз на процес
+
+    Записи потрапляють в чергу в потоці виклику, а запис на диск та в консоль
+    виконує окремий потік QueueListener, тому цикл подій не блокується.
+    """
+    global _listener, _queue_handler
+
+    level = logging.getLevelName(config.log_level.upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+
+    if _listener is not None:
+        # Вже налаштовано - оновлюємо лише рівень
+        return
+
+    formatter = JsonLinesFormatter() if config.log_json else logging.Formatter(LOG_FORMAT)
+
+    handlers = [logging.StreamHandler()]
+    if config.log_file:
+        handlers.append(logging.FileHandler(config.log_file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    root_logger.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Зупиняє фоновий потік логування, дописавши всі записи з черги"""
+    global _listener, _queue_handler
+
+    if _listener is None:
+        return
+
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger().removeHandler(_queue_handler)
+
+    _listener = None
+    _queue_handler = None
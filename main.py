@@ -4,28 +4,35 @@
 import asyncio
 import json
 import os
+import sys
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Optional, List, Dict, Tuple, TYPE_CHECKING
 
-from config import ParserConfig, DEFAULT_CONFIG
-from olx_parser import OlxPriceParser
+from config import ParserConfig, load_config
 from models import ParsingResult, Category
-from excel_exporter import ExcelExporter
+from crawl_budget import CrawlBudget
+
+# Важкі модулі (bs4, aiohttp, openpyxl) імпортуються лише коли вони потрібні
+if TYPE_CHECKING:
+    from olx_parser import OlxPriceParser
+    from export_writer import ExportWriter
+    from change_detection import ChangeRecord
 
 class PriceParserManager:
     """Менеджер для управління парсером цін"""
     
-    def __init__(self):
-        self.config = self.load_config()
-        self.parser: Optional[OlxPriceParser] = None
+    def __init__(self, config: Optional[ParserConfig] = None):
+        self.config = config or self.load_config()
+        self.parser: Optional["OlxPriceParser"] = None
     
     def load_config(self) -> ParserConfig:
-        """Завантаження конфігурації"""
-        # Тут можна додати завантаження з файлу або змінних середовища
-        return DEFAULT_CONFIG
+        """Завантаження конфігурації з файлу (OLX_PARSER_CONFIG) та змінних середовища"""
+        return load_config()
     
     def setup_parser(self, base_url: str):
         """Налаштування парсера"""
+        from olx_parser import OlxPriceParser
+        
         self.config.base_url = base_url
         self.parser = OlxPriceParser(self.config)
     
@@ -77,6 +84,33 @@ class PriceParserManager:
             result = await parser.parse_catalog()
             return result
     
+    async def run_multi_site(self, sites: Dict[str, ParserConfig]) -> ParsingResult:
+        """Паралельний парсинг кількох сайтів в одному циклі подій
+        
+        Всі парсери ділять один пул з'єднань (ліміт на хост) та глобальний
+        бюджет одночасних запитів з конфігурації менеджера. Файли стану
+        кожного сайту зберігаються в окремій піддиректорії output_directory.
+        """
+        from http_client import FetchClient
+        from parser_registry import create_parser, site_config
+        
+        async with FetchClient.from_config(self.config) as fetch_client:
+            parsers = {
+                name: create_parser(name, site_config(name, config), fetch_client) for name, config in sites.items()
+            }
+            
+            async def run_site(name: str) -> ParsingResult:
+                async with parsers[name] as parser:
+                    result = await parser.parse_catalog()
+                for product in result.products:
+                    product.attributes.setdefault("site", name)
+                return result
+            
+            results = await asyncio.gather(*(run_site(name) for name in parsers))
+            combined = ParsingResult.merge(dict(zip(parsers, results)))
+            combined.metrics["fetch"] = dict(fetch_client.metrics)
+            return combined
+    
     def save_results(self, result: ParsingResult, filename: Optional[str] = None, essential_only: bool = False):
         """Збереження результатів"""
         if not filename:
@@ -106,23 +140,113 @@ class PriceParserManager:
         print(f"Результати збережено в {filepath}")
         return filepath
     
-    def save_results_excel(self, result: ParsingResult, category_name: str) -> str:
+    def save_snapshot(self, result: ParsingResult, filename: str) -> str:
+        """Збереження колонкового знімка (швидке перечитування та порівняння запусків)"""
+        from snapshot import write_snapshot
+        
+        filepath = write_snapshot(result, os.path.join(self.config.output_directory, filename))
+        print(f"Знімок збережено в {filepath}")
+        return filepath
+    
+    def save_changes(self, result: ParsingResult, snapshot_filename: str, filename: str) -> Tuple[str, List["ChangeRecord"]]:
+        """Дельта відносно знімка попереднього запуску в JSONL (до перезапису знімка)"""
+        from change_detection import detect_changes, write_changes_jsonl
+        
+        changes = detect_changes(result.products, os.path.join(self.config.output_directory, snapshot_filename))
+        filepath = write_changes_jsonl(changes, os.path.join(self.config.output_directory, filename))
+        print(f"Зміни збережено в {filepath}")
+        return filepath, changes
+    
+    def save_results_excel(self, result: ParsingResult, category_name: str,
+                           changes: Optional[List["ChangeRecord"]] = None) -> str:
         """Збереження результатів в Excel формат"""
         try:
-            exporter = ExcelExporter()
-            filepath = exporter.export_to_excel(result, self.config.output_directory, category_name)
+            from excel_exporter import ExcelExporter
+            
+            exporter = ExcelExporter(dedup_policy=self.config.excel_dedup_policy)
+            filepath = exporter.export_to_excel(result, self.config.output_directory, category_name, changes=changes)
             print(f"Результати експортовано в Excel: {filepath}")
             return filepath
         except Exception as e:
             print(f"❌ Помилка при експорті в Excel: {e}")
             return None
 
-async def process_parsing_result(manager: PriceParserManager, result: ParsingResult, category: Category):
-    """Обробляє результат парсингу та зберігає дані"""
+def export_parsing_result(manager: PriceParserManager, result: ParsingResult, category: Category) -> Dict[str, str]:
+    """Записує файли результату категорії (виконується поза циклом подій)"""
+    files: Dict[str, str] = {}
+    file_prefix = f"olx_{category.name.lower().replace(' ', '_')}"
+    
+    # Зберігаємо повні дані
+    files["full"] = manager.save_results(result, f"{file_prefix}_full.json")
+    
+    # Зберігаємо тільки основні дані
+    files["essential"] = manager.save_results(result, f"{file_prefix}_essential.json", essential_only=True)
+    
+    # Обхід зупинено бюджетом - не досягнуті оголошення не є знятими
+    coverage = result.metrics.get("coverage") or {}
+    partial = coverage.get("complete") is False
+    
+    # Зміни відносно попереднього знімка (знімок потрібен і для наступного порівняння)
+    changes = None
+    if manager.config.export_changes and partial:
+        print(f"⚠️  Категорію {category.name} оброблено частково - дельту не рахуємо, знімок не оновлюємо")
+    elif manager.config.export_changes:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        files["changes"], changes = manager.save_changes(
+            result, f"{file_prefix}.olxsnap", f"{file_prefix}_changes_{timestamp}.jsonl"
+        )
+    
+    # Експортуємо в Excel
+    excel_file = manager.save_results_excel(result, category.name, changes)
+    if not excel_file:
+        # Знімок не оновлюємо: повторний запуск порахує ту саму дельту
+        raise RuntimeError(f"не вдалося експортувати в Excel (вже записано: {', '.join(files.values())})")
+    files["excel"] = excel_file
+    
+    # Колонковий знімок (частковий - окремим файлом, щоб не замінити базу для порівняння)
+    if manager.config.save_snapshot or manager.config.export_changes:
+        snapshot_name = f"{file_prefix}_partial.olxsnap" if partial else f"{file_prefix}.olxsnap"
+        files["snapshot"] = manager.save_snapshot(result, snapshot_name)
+    return files
+
+def print_export_files(files: Dict[str, str]):
+    """Друкує шляхи записаних файлів"""
+    print(f"📁 Повні дані: {files['full']}")
+    print(f"📁 Основні дані: {files['essential']}")
+    if files.get("changes"):
+        print(f"🔁 Зміни: {files['changes']}")
+    if files.get("excel"):
+        print(f"📊 Excel файл: {files['excel']}")
+
+def make_export_writer(manager: PriceParserManager) -> "ExportWriter":
+    """Фоновий запис результатів категорій з обмеженою чергою"""
+    from export_writer import ExportWriter
+    
+    def export(result: ParsingResult, category: Category) -> Dict[str, str]:
+        files = export_parsing_result(manager, result, category)
+        print_export_files(files)
+        return files
+    
+    return ExportWriter(export, queue_size=manager.config.export_queue_size)
+
+def print_export_errors(errors: List[str]):
+    """Друкує помилки фонового запису"""
+    if errors:
+        print(f"\n❌ Помилки при збереженні результатів:")
+        for error in errors:
+            print(f"   - {error}")
+
+async def process_parsing_result(manager: PriceParserManager, result: ParsingResult, category: Category,
+                                 writer: Optional["ExportWriter"] = None):
+    """Обробляє результат парсингу та зберігає дані (у фоні, якщо передано writer)"""
     if result.success:
         print(f"\n✅ Парсинг успішно завершено!")
         print(f"📊 Знайдено товарів: {result.total_products}")
         print(f"⏱️  Час парсингу: {result.parsing_time:.2f} сек")
+        page_memo = result.metrics.get("page_memo")
+        if page_memo:
+            print(f"♻️  Кеш сторінок: {page_memo['hits']} влучань, {page_memo['misses']} промахів "
+                  f"({page_memo['hit_rate']:.0%})")
         
         # Показуємо приклад знайдених даних
         if result.products:
@@ -136,29 +260,34 @@ async def process_parsing_result(manager: PriceParserManager, result: ParsingRes
                 print(f"   Артикул: {first_product.sku}")
         
         # Збереження результатів
-        print(f"\n💾 Збереження результатів...")
-        
-        # Зберігаємо повні дані
-        full_file = manager.save_results(result, f"olx_{category.name.lower().replace(' ', '_')}_full.json")
-        
-        # Зберігаємо тільки основні дані
-        essential_file = manager.save_results(result, f"olx_{category.name.lower().replace(' ', '_')}_essential.json", essential_only=True)
-        
-        # Експортуємо в Excel
-        excel_file = manager.save_results_excel(result, category.name)
+        if writer is not None:
+            # Запис у фоні - тим часом парситься наступна категорія
+            print(f"\n💾 Результати поставлено в чергу запису")
+            await writer.submit(result, category)
+            return
         
-        print(f"📁 Повні дані: {full_file}")
-        print(f"📁 Основні дані: {essential_file}")
-        if excel_file:
-            print(f"📊 Excel файл: {excel_file}")
+        print(f"\n💾 Збереження результатів...")
+        try:
+            files = await asyncio.get_event_loop().run_in_executor(None, export_parsing_result, manager, result, category)
+            print_export_files(files)
+        except Exception as e:
+            print(f"❌ Помилка при збереженні результатів: {e}")
         
     else:
         print(f"\n❌ Помилка при парсингу:")
         for error in result.errors:
             print(f"   - {error}")
 
+def print_coverage_report(report: Dict[str, Any]):
+    """Друкує звіт про покриття обходу в межах бюджету"""
+    from crawl_budget import format_coverage_report
+    
+    print("\n📐 Покриття обходу:")
+    for line in format_coverage_report(report):
+        print(f"   {line}")
+
 async def parse_all_categories(manager: PriceParserManager, categories: List[Category]):
-    """Парсить всі категорії по черзі"""
+    """Парсить всі категорії по черзі; результати записуються у фоні"""
     total_categories = len(categories)
     successful_categories = 0
     failed_categories = 0
@@ -166,46 +295,66 @@ async def parse_all_categories(manager: PriceParserManager, categories: List[Cat
     print(f"\n🚀 Початок парсингу {total_categories} категорій...")
     print("=" * 60)
     
-    for i, category in enumerate(categories, 1):
-        try:
-            print(f"\n📊 [{i}/{total_categories}] Парсинг категорії: {category.name}")
-            print(f"   URL: {category.url}")
-            
-            # Парсимо категорію
-            result = await manager.parse_specific_category(i)
-            
-            if result.success:
-                print(f"✅ Категорія {category.name} успішно оброблена!")
-                print(f"   📊 Знайдено товарів: {result.total_products}")
-                print(f"   ⏱️  Час парсингу: {result.parsing_time:.2f} сек")
+    writer = make_export_writer(manager)
+    try:
+        if CrawlBudget.from_config(manager.config).enabled:
+            # Бюджет ділиться між категоріями: спершу перші сторінки всіх категорій
+            async with manager.parser as parser:
+                results, report = await parser.parse_categories_within_budget(categories)
+            for category, result in zip(categories, results):
+                await process_parsing_result(manager, result, category, writer)
+                if result.success:
+                    successful_categories += 1
+                else:
+                    failed_categories += 1
+            print_coverage_report(report)
+            print(f"✅ Успішно оброблено: {successful_categories}, ❌ помилки: {failed_categories}")
+            return
+        
+        for i, category in enumerate(categories, 1):
+            try:
+                print(f"\n📊 [{i}/{total_categories}] Парсинг категорії: {category.name}")
+                print(f"   URL: {category.url}")
                 
-                # Зберігаємо результати
-                await process_parsing_result(manager, result, category)
+                # Парсимо категорію
+                result = await manager.parse_specific_category(i)
                 
-                successful_categories += 1
-            else:
-                print(f"❌ Помилка при парсингу категорії {category.name}:")
-                for error in result.errors:
-                    print(f"   - {error}")
+                if result.success:
+                    print(f"✅ Категорія {category.name} успішно оброблена!")
+                    print(f"   📊 Знайдено товарів: {result.total_products}")
+                    print(f"   ⏱️  Час парсингу: {result.parsing_time:.2f} сек")
+                    
+                    # Зберігаємо результати (запис перекривається з парсингом наступної категорії)
+                    await process_parsing_result(manager, result, category, writer)
+                    
+                    successful_categories += 1
+                else:
+                    print(f"❌ Помилка при парсингу категорії {category.name}:")
+                    for error in result.errors:
+                        print(f"   - {error}")
+                    failed_categories += 1
+                
+                # Невелика пауза між категоріями
+                if i < total_categories:
+                    print(f"⏳ Пауза 3 секунди перед наступною категорією...")
+                    await asyncio.sleep(3)
+                
+                print("-" * 40)
+                
+            except Exception as e:
+                print(f"❌ Критична помилка при парсингу категорії {category.name}: {e}")
                 failed_categories += 1
-            
-            # Невелика пауза між категоріями
-            if i < total_categories:
-                print(f"⏳ Пауза 3 секунди перед наступною категорією...")
-                await asyncio.sleep(3)
-            
-            print("-" * 40)
-            
-        except Exception as e:
-            print(f"❌ Критична помилка при парсингу категорії {category.name}: {e}")
-            failed_categories += 1
-            continue
+                continue
+    finally:
+        # Всі записи мають завершитись до кінця запуску
+        print_export_errors(await writer.close())
     
     # Підсумкова статистика
     print("\n" + "=" * 60)
     print("🏁 ПАРСИНГ ВСІХ КАТЕГОРІЙ ЗАВЕРШЕНО!")
     print(f"✅ Успішно оброблено: {successful_categories}")
     print(f"❌ Помилки: {failed_categories}")
+    print(f"💾 Записано: {writer.metrics['written']}, помилок запису: {writer.metrics['failed']}")
     print(f"📊 Всього категорій: {total_categories}")
     print("=" * 60)
 
@@ -282,4 +431,8 @@ async def main():
         print(f"\n❌ Критична помилка: {e}")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Неінтерактивний режим: python main.py <підкоманда> ...
+        from cli import run
+        sys.exit(run(sys.argv[1:]))
     asyncio.run(main())
@@ -29,6 +29,7 @@ class Product:
     rating: Optional[float] = None
     review_count: int = 0
     attributes: Dict[str, Any] = field(default_factory=dict)
+    duplicate_cluster: str = ""  # Кластер майже-дублікатів (перевипущені оголошення)
     parsed_at: datetime = field(default_factory=datetime.now)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -49,9 +50,34 @@ class Product:
             "rating": self.rating,
             "review_count": self.review_count,
             "attributes": self.attributes,
+            "duplicate_cluster": self.duplicate_cluster,
             "parsed_at": self.parsed_at.isoformat()
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Product":
+        """Створює товар зі словника (формат to_dict або get_essential_data)"""
+        parsed_at = data.get("parsed_at")
+        return cls(
+            name=data["name"],
+            price=Decimal(str(data.get("price") or "0")),
+            product_url=data["product_url"],
+            availability=data.get("availability", True),
+            sku=data.get("sku", ""),
+            id=data.get("id", ""),
+            currency=data.get("currency", "UAH"),
+            category=data.get("category", ""),
+            subcategory=data.get("subcategory", ""),
+            brand=data.get("brand", ""),
+            description=data.get("description", ""),
+            image_url=data.get("image_url", ""),
+            rating=data.get("rating"),
+            review_count=data.get("review_count", 0),
+            attributes=dict(data.get("attributes") or {}),
+            duplicate_cluster=data.get("duplicate_cluster", ""),
+            parsed_at=datetime.fromisoformat(parsed_at) if parsed_at else datetime.now()
+        )
+    
     def get_essential_data(self) -> Dict[str, Any]:
         """Отримує тільки основні дані про товар"""
         return {
@@ -67,8 +93,8 @@ class Category:
     """Модель категорії"""
     name: str
     url: str
-    parent_category: Optional[str] = None
-    subcategories: List[str] = field(default_factory=list)
+    parent_category: Optional[str] = None                    # URL батьківської категорії
+    subcategories: List[str] = field(default_factory=list)   # URL підкатегорій
     product_count: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
@@ -80,6 +106,17 @@ class Category:
             "subcategories": self.subcategories,
             "product_count": self.product_count
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Category":
+        """Створює категорію зі словника"""
+        return cls(
+            name=data["name"],
+            url=data["url"],
+            parent_category=data.get("parent_category"),
+            subcategories=list(data.get("subcategories", [])),
+            product_count=data.get("product_count", 0)
+        )
 
 @dataclass
 class ParsingResult:
@@ -91,6 +128,8 @@ class ParsingResult:
     total_products: int = 0
     total_categories: int = 0
     parsing_time: float = 0.0
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    price_stats: Dict[str, Any] = field(default_factory=dict)  # Зведення та скетчі цін по категоріях
     
     def to_dict(self) -> Dict[str, Any]:
         """Конвертує результат в словник"""
@@ -101,9 +140,50 @@ class ParsingResult:
             "errors": self.errors,
             "total_products": self.total_products,
             "total_categories": self.total_categories,
-            "parsing_time": self.parsing_time
+            "parsing_time": self.parsing_time,
+            "metrics": self.metrics,
+            "price_stats": self.price_stats
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsingResult":
+        """Створює результат зі словника (збереженого JSON)"""
+        products = [Product.from_dict(item) for item in data.get("products", [])]
+        categories = [Category.from_dict(item) for item in data.get("categories", [])]
+        return cls(
+            success=data.get("success", True),
+            products=products,
+            categories=categories,
+            errors=list(data.get("errors", [])),
+            total_products=data.get("total_products", len(products)),
+            total_categories=data.get("total_categories", len(categories)),
+            parsing_time=data.get("parsing_time", 0.0),
+            metrics=dict(data.get("metrics") or {}),
+            price_stats=dict(data.get("price_stats") or {})
+        )
+    
+    @classmethod
+    def merge(cls, results: Dict[str, "ParsingResult"]) -> "ParsingResult":
+        """Об'єднує результати кількох сайтів в один (ключ - назва сайту)"""
+        merged = cls(success=all(result.success for result in results.values()))
+        for site, result in results.items():
+            merged.products.extend(result.products)
+            merged.categories.extend(result.categories)
+            merged.errors.extend(f"[{site}] {error}" for error in result.errors)
+            merged.parsing_time = max(merged.parsing_time, result.parsing_time)
+            merged.metrics.setdefault("sites", {})[site] = result.metrics
+        merged.total_products = len(merged.products)
+        
+        if any(result.price_stats for result in results.values()):
+            # NumPy потрібен лише коли є що об'єднувати
+            from price_stats import PriceStatsCollector
+            collector = PriceStatsCollector()
+            for result in results.values():
+                collector.merge(PriceStatsCollector.from_dict(result.price_stats))
+            merged.price_stats = collector.to_dict()
+        merged.total_categories = len(merged.categories)
+        return merged
+    
     def get_essential_products_data(self) -> List[Dict[str, Any]]:
         """Отримує тільки основні дані про товари"""
         return [product.get_essential_data() for product in self.products]
@@ -0,0 +1,164 @@
+"""
+Виявлення майже-дублікатів оголошень (MinHash + LSH за смугами)
+
+Назва оголошення перетворюється на множину слів, а її MinHash підпис
+ділиться на смуги. Кандидати в дублікати - оголошення, у яких збігається
+хоча б одна смуга; їх знаходить індекс смуг за сталий час, без порівняння
+всіх пар. Кандидат підтверджується оцінкою схожості Жаккара та ціною.
+"""
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from models import Product
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def title_features(name: str) -> Set[str]:
+    """Множина слів назви"""
+    return set(_TOKEN_RE.findall(name.lower()))
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def _permutations(count: int) -> List[Tuple[int, int]]:
+    """Детерміновані параметри хеш-функцій a*x+b mod p"""
+    params = []
+    for i in range(count):
+        seed = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(seed[:8], 'little') % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(seed[8:], 'little') % _MERSENNE_PRIME
+        params.append((a, b))
+    return params
+
+@dataclass
+class _Entry:
+    signature: Tuple[int, ...]
+    price: Decimal
+    cluster: str
+    key: Optional[str] = None   # Артикул або посилання (немає в історії старого формату)
+
+class NearDuplicateIndex:
+    """Індекс MinHash підписів з пошуком майже-дублікатів за смугами LSH"""
+
+    def __init__(self, bands: int = 16, rows: int = 4, threshold: float = 0.55,
+                 price_tolerance: float = 0.15):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self.price_tolerance = Decimal(str(price_tolerance))
+        self._permutations = _permutations(bands * rows)
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+        self._entries: List[_Entry] = []
+        self._by_key: Dict[str, int] = {}
+        # Є записи, яких ще немає у файлі історії
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, name: str) -> Tuple[int, ...]:
+        """MinHash підпис назви"""
+        hashes = [_feature_hash(feature) for feature in title_features(name)] or [0]
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes) & _MAX_HASH
+            for a, b in self._permutations
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        return [signature[band * self.rows:(band + 1) * self.rows] for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """Оцінка схожості Жаккара за підписами"""
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+    def _prices_match(self, first: Decimal, second: Decimal) -> bool:
+        if not first or not second:
+            # Договірна / без ціни - порівнюємо лише назви
+            return True
+        return abs(first - second) <= self.price_tolerance * max(first, second)
+
+    def _find(self, signature: Tuple[int, ...], price: Decimal) -> Optional[str]:
+        checked = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            for entry_id in self._buckets[band].get(key, ()):
+                if entry_id in checked:
+                    continue
+                checked.add(entry_id)
+                entry = self._entries[entry_id]
+                if (self.similarity(signature, entry.signature) >= self.threshold
+                        and self._prices_match(price, entry.price)):
+                    return entry.cluster
+        return None
+
+    def find(self, name: str, price: Decimal) -> Optional[str]:
+        """Повертає кластер майже-дубліката або None"""
+        return self._find(self.signature(name), price)
+
+    def _insert(self, signature: Tuple[int, ...], price: Decimal, cluster: str, key: Optional[str] = None):
+        entry_id = len(self._entries)
+        self._entries.append(_Entry(signature=signature, price=price, cluster=cluster, key=key))
+        if key is not None:
+            self._by_key[key] = entry_id
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(entry_id)
+
+    def add(self, name: str, price: Decimal, key: str) -> str:
+        """Додає оголошення до індексу, повертає його кластер
+        
+        Вже відоме оголошення (той самий ключ) не додається повторно і
+        зберігає свій кластер.
+        """
+        entry_id = self._by_key.get(key)
+        if entry_id is not None:
+            return self._entries[entry_id].cluster
+        signature = self.signature(name)
+        cluster = self._find(signature, price) or key
+        self._insert(signature, price, cluster, key)
+        self.dirty = True
+        return cluster
+
+    def assign_clusters(self, products: List[Product]) -> int:
+        """Записує кластер у кожен товар, повертає кількість майже-дублікатів"""
+        duplicates = 0
+        for product in products:
+            key = product.sku or product.product_url
+            product.duplicate_cluster = self.add(product.name, product.price, key)
+            if product.duplicate_cluster != key:
+                duplicates += 1
+        return duplicates
+
+    def save(self, path: str):
+        """Зберігає історію підписів на диск"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = [[list(entry.signature), str(entry.price), entry.cluster, entry.key] for entry in self._entries]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"bands": self.bands, "rows": self.rows, "entries": data}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    def load(self, path: str) -> bool:
+        """Завантажує історію підписів з диска"""
+        if not os.path.exists(path):
+            return False
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if (data.get("bands"), data.get("rows")) != (self.bands, self.rows):
+            # Підписи з іншими параметрами несумісні
+            return False
+        for signature, price, cluster, *rest in data.get("entries", []):
+            key = rest[0] if rest else None
+            if key is not None and key in self._by_key:
+                continue
+            self._insert(tuple(signature), Decimal(price), cluster, key)
+        return True
@@ -2,22 +2,78 @@
 Спеціалізований парсер для OLX.ua
 """
 import asyncio
+import copy
+import json
+import math
+import os
 import re
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, NamedTuple, Tuple, Union, TYPE_CHECKING
 from bs4 import BeautifulSoup, Tag
 from decimal import Decimal
+from urllib.parse import urlsplit
 
 from base_parser import BasePriceParser
 from models import Product, Category, ParsingResult
 from config import ParserConfig
+from http_client import FetchClient
+from layout_detector import LayoutDetector
+from price_normalizer import PriceNormalizer, PRICE_HINT_RE
+from price_sharding import PriceShard, PriceShardPlanner, merge_unique_products
+
+if TYPE_CHECKING:
+    from crawl_budget import ListingPage
+    from stream_parser import StreamedListing
+
+# Кількість оголошень на сторінці, якщо її не вдалося визначити
+DEFAULT_LISTINGS_PER_PAGE = 50
+
+# Парсер в процесі-обробнику конвеєра (створюється при першій сторінці)
+_process_parser: Optional["OlxPriceParser"] = None
+
+class CachedListingPage(NamedTuple):
+    """Сторінка конвеєра з кешу витягування: етапи розбору передають її до експорту"""
+    page: int
+
+def _extract_page_in_process(item: Union[Tuple[ParserConfig, int, str, str, Optional[str]], CachedListingPage]
+                             ) -> Union[Tuple[int, List[Product], Optional[str], Optional[str]], CachedListingPage]:
+    """Розбір і витягування сторінки в окремому процесі (етап конвеєра)"""
+    global _process_parser
+    if isinstance(item, CachedListingPage):
+        return item
+    config, page, page_url, html, memo_key = item
+    if _process_parser is None:
+        _process_parser = OlxPriceParser(config)
+    products, next_page = _process_parser.extract_listing_page(BeautifulSoup(html, 'html.parser'), page_url)
+    return page, products, next_page, memo_key
 
 class OlxPriceParser(BasePriceParser):
     """Парсер для OLX.ua"""
     
-    def __init__(self, config: ParserConfig):
-        super().__init__(config)
+    STREAMS_PRICE_STATS = True
+    # Сторінка категорії та, можливо, перехід за "Показати всі"
+    FIRST_LISTING_PAGE_REQUESTS = 2
+    
+    def __init__(self, config: ParserConfig, fetch_client: Optional[FetchClient] = None):
+        super().__init__(config, fetch_client)
+        self.layout_detector = LayoutDetector()
+        self.price_normalizer = PriceNormalizer.from_config(config)
+        self.pipeline_metrics: Dict[str, Any] = {}
         self.logger.info("Ініціалізовано OlxPriceParser для OLX.ua")
     
+    def get_metrics(self, categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Метрики парсера OLX.ua (конвеєр - лише для категорій categories, якщо задано)"""
+        cache_info = self.price_normalizer.cache_info()
+        metrics = super().get_metrics(categories)
+        metrics["layout"] = self.layout_detector.metrics_snapshot()
+        metrics["price_cache"] = {"hits": cache_info.hits, "misses": cache_info.misses}
+        pipeline = {
+            name: copy.deepcopy(stages) for name, stages in self.pipeline_metrics.items()
+            if categories is None or name in categories
+        }
+        if pipeline:
+            metrics["pipeline"] = pipeline
+        return metrics
+    
     async def get_categories(self) -> List[Category]:
         """Отримання списку категорій з OLX.ua"""
         categories = []
@@ -39,124 +95,440 @@ class OlxPriceParser(BasePriceParser):
                     if text_elem and href and not href.startswith('http'):
                         text = text_elem.get_text(strip=True)
                         if text and len(text) > 2:
-                            self.logger.debug(f"Знайдено категорію: {text}, href: {href}")
+                            self.logger.debug("Знайдено категорію: %s, href: %s", text, href)
                             category_url = self.make_absolute_url(href, self.config.base_url)
-                            self.logger.debug(f"Сформовано URL категорії: {category_url}")
+                            self.logger.debug("Сформовано URL категорії: %s", category_url)
                             category = Category(
                                 name=text,
                                 url=category_url
                             )
                             categories.append(category)
             
-            self.logger.info(f"Знайдено {len(categories)} категорій")
+            self.logger.info("Знайдено %s категорій", len(categories))
             
         except Exception as e:
-            self.logger.error(f"Помилка при отриманні категорій: {e}")
+            self.logger.error("Помилка при отриманні категорій: %s", e)
         
         return categories
     
-    async def get_products_from_category(self, category: Category) -> List[Product]:
+    async def get_subcategories(self, category: Category) -> Optional[List[Category]]:
+        """Отримання прямих підкатегорій зі сторінки категорії OLX.ua (None - сторінку не отримано)"""
+        soup = await self.fetch_page(category.url)
+        if not soup:
+            return None
+        
+        parent_path = urlsplit(category.url).path.rstrip('/') + '/'
+        subcategories = []
+        seen = set()
+        
+        links = soup.select('a[data-testid^="sub-cat-"], [data-testid="category-count-links"] a[href]')
+        for link in links:
+            if link.get('data-testid') == 'sub-cat-1-root-link':
+                continue
+            
+            href = link.get('href', '')
+            if not href or href.startswith('http'):
+                continue
+            
+            url = self.make_absolute_url(href.split('?')[0], self.config.base_url)
+            path = urlsplit(url).path.rstrip('/') + '/'
+            # Підкатегорія має бути глибше за батьківську
+            if not path.startswith(parent_path) or path == parent_path or url in seen:
+                continue
+            
+            name = self.clean_text(link.get_text())
+            if not name:
+                continue
+            
+            seen.add(url)
+            subcategories.append(Category(name=name, url=url, parent_category=category.url))
+        
+        self.logger.debug("Категорія %s: %s підкатегорій", category.name, len(subcategories))
+        return subcategories
+    
+    async def get_products_from_category(self, category: Category, max_pages: Optional[int] = None) -> List[Product]:
         """Отримання товарів з конкретної категорії OLX.ua з пагінацією"""
         all_products = []
-        page = 1
-        current_url = category.url  # Зберігаємо поточний URL для пагінації
         
         try:
-            while True:
-                # Формуємо URL з номером сторінки
-                if page == 1:
-                    page_url = current_url
-                else:
-                    # Додаємо параметр сторінки
-                    if '?' in current_url:
-                        page_url = f"{current_url}&page={page}"
-                    else:
-                        page_url = f"{current_url}?page={page}"
+            listing_url, soup = await self.resolve_listing_page(category.url, category.name)
+            if not soup:
+                self.logger.warning("Не вдалося отримати сторінку 1")
+                return all_products
+            
+            # Велику категорію розбиваємо на цінові діапазони, щоб обійти ліміт сторінок
+            if self.config.enable_price_sharding and max_pages is None:
+                total_count = self.extract_total_count(soup)
+                per_page = len(self.layout_detector.select_cards(soup, listing_url)) or DEFAULT_LISTINGS_PER_PAGE
+                capacity = self.config.max_pages * per_page
                 
-                self.logger.info(f"Парсинг сторінки {page}: {page_url}")
-                self.logger.debug(f"Поточний URL для пагінації: {current_url}")
+                if total_count is not None and total_count > capacity:
+                    self.logger.info(
+                        "Категорія %s: %s оголошень перевищує ліміт пагінації (%s) - розбиваємо за ціною",
+                        category.name, total_count, capacity
+                    )
+                    all_products = await self.crawl_price_shards(listing_url, category.name, capacity)
+                    self.logger.info("Всього знайдено %s товарів в категорії %s", len(all_products), category.name)
+                    return all_products
+            
+            if self.config.use_pipeline:
+                all_products = await self.crawl_listing_pipeline(listing_url, category.name, soup, max_pages=max_pages)
+            else:
+                all_products = await self.crawl_listing(listing_url, category.name, first_soup=soup, max_pages=max_pages)
+            self.logger.info("Всього знайдено %s товарів в категорії %s", len(all_products), category.name)
+            
+        except Exception as e:
+            self.logger.error("Помилка при парсингу категорії %s: %s", category.name, e)
+        
+        return all_products
+    
+    async def resolve_listing_page(self, url: str, category_name: str = "") -> Tuple[str, Optional[BeautifulSoup]]:
+        """Повертає URL сторінки з оголошеннями та її першу сторінку
+        
+        Якщо на сторінці категорії є кнопка "Показати всі оголошення",
+        пагінація ведеться за її посиланням. category_name зберігається
+        в записах архіву сторінок цієї видачі.
+        """
+        if category_name:
+            self.remember_listing_category(url, category_name)
+        soup = await self.fetch_page(url)
+        if not soup:
+            return url, None
+        
+        show_all_link = soup.find('a', {'data-testid': 'sub-cat-1-root-link'})
+        if show_all_link:
+            show_all_url = show_all_link.get('href')
+            if show_all_url:
+                show_all_url = self.make_absolute_url(show_all_url, self.config.base_url)
+                if category_name:
+                    self.remember_listing_category(show_all_url, category_name)
+                self.logger.info("Знайдено посилання 'Показати всі': %s", show_all_url)
+                self.logger.info("Оновлено URL для пагінації: %s -> %s", url, show_all_url)
                 
-                # Отримуємо сторінку
-                soup = await self.fetch_page(page_url)
+                # Отримуємо сторінку з усіма оголошеннями
+                soup = await self.fetch_page(show_all_url)
                 if not soup:
-                    self.logger.warning(f"Не вдалося отримати сторінку {page}")
-                    break
-                
-                # Перевіряємо чи є на сторінці кнопка "Показати всі оголошення" (тільки на першій сторінці)
-                if page == 1:
-                    show_all_link = soup.find('a', {'data-testid': 'sub-cat-1-root-link'})
-                    if show_all_link:
-                        show_all_url = show_all_link.get('href')
-                        if show_all_url:
-                            show_all_url = self.make_absolute_url(show_all_url, self.config.base_url)
-                            self.logger.info(f"Знайдено посилання 'Показати всі': {show_all_url}")
-                            
-                            # Оновлюємо поточний URL для пагінації
-                            old_url = current_url
-                            current_url = show_all_url
-                            self.logger.info(f"Оновлено URL для пагінації: {old_url} -> {current_url}")
-                            
-                            # Отримуємо сторінку з усіма оголошеннями
-                            soup = await self.fetch_page(show_all_url)
-                            if not soup:
-                                self.logger.warning("Не вдалося отримати сторінку з усіма оголошеннями")
-                                break
-                
-                # Шукаємо елементи товарів (оголошень)
-                product_elements = soup.find_all('div', {'data-cy': 'l-card'})
-                
-                if not product_elements:
-                    # Альтернативний пошук
-                    product_elements = soup.find_all('div', class_=re.compile(r'css-.*'))
-                
-                if not product_elements:
-                    self.logger.warning(f"Не знайдено товарів на сторінці {page}")
-                    break
-                
-                self.logger.debug(f"Сторінка {page}: знайдено {len(product_elements)} елементів товарів")
-                
-                # Обробляємо знайдені товари
-                page_products = []
-                for element in product_elements:
-                    product = self.extract_product_data_from_element(element, self.config.base_url)
-                    if product:
-                        page_products.append(product)
-                
-                if page_products:
-                    all_products.extend(page_products)
-                    self.logger.info(f"Сторінка {page}: знайдено {len(page_products)} товарів")
-                else:
-                    self.logger.warning(f"Сторінка {page}: не знайдено товарів")
-                    break
-                
-                # Перевіряємо чи є наступна сторінка (покращений пошук)
-                self.logger.debug(f"Шукаємо наступну сторінку на сторінці {page}")
-                next_page_link = self.find_next_page_link(soup)
-                if not next_page_link:
-                    self.logger.info(f"Наступна сторінка не знайдена, завершуємо пагінацію")
-                    break
-                
-                self.logger.info(f"Знайдено посилання на наступну сторінку: {next_page_link.get('href', 'N/A')}")
-                page += 1
-                
-                # Обмежуємо кількість сторінок для тестування
-                if page > 25:  # Збільшуємо ліміт до 25 сторінок
-                    self.logger.info("Досягнуто ліміт сторінок (25)")
+                    self.logger.warning("Не вдалося отримати сторінку з усіма оголошеннями")
+                return show_all_url, soup
+        
+        return url, soup
+    
+    @staticmethod
+    def build_page_url(url: str, page: int) -> str:
+        """Формує URL сторінки пагінації"""
+        if page == 1:
+            return url
+        if '?' in url:
+            return f"{url}&page={page}"
+        return f"{url}?page={page}"
+    
+    async def crawl_listing(self, listing_url: str, category_name: str,
+                            first_soup: Optional[BeautifulSoup] = None,
+                            max_pages: Optional[int] = None, record_stats: bool = True) -> List[Product]:
+        """Обходить сторінки пагінації однієї видачі
+        
+        record_stats=False - статистику цін веде той, хто викликає (цінові
+        діапазони рахують її після об'єднання дублікатів на межах).
+        """
+        all_products = []
+        page = 1
+        max_pages = max_pages or self.config.max_pages
+        
+        while True:
+            page_url = self.build_page_url(listing_url, page)
+            self.logger.info("Парсинг сторінки %s: %s", page, page_url)
+            
+            if page == 1 and first_soup is not None:
+                page_products, next_page_href = self.extract_listing_page(first_soup, listing_url)
+            else:
+                listing = await self.fetch_listing_page(listing_url, page)
+                if listing is None:
+                    self.logger.warning("Не вдалося отримати сторінку %s", page)
                     break
-                
-                # Невелика пауза між сторінками
-                await asyncio.sleep(1)
+                page_products, next_page_href = listing.products, listing.next_page_url
             
-            self.logger.info(f"Всього знайдено {len(all_products)} товарів в категорії {category.name}")
+            for product in page_products:
+                product.category = category_name
             
-        except Exception as e:
-            self.logger.error(f"Помилка при парсингу категорії {category.name}: {e}")
+            if page_products:
+                all_products.extend(page_products)
+                if record_stats:
+                    self.record_price_stats(category_name, page_products)
+                self.queue_images(page_products)
+                self.logger.info("Сторінка %s: знайдено %s товарів", page, len(page_products))
+            else:
+                self.logger.warning("Сторінка %s: не знайдено товарів", page)
+                break
+            
+            if not next_page_href:
+                self.logger.info("Наступна сторінка не знайдена, завершуємо пагінацію")
+                break
+            
+            self.logger.info("Знайдено посилання на наступну сторінку: %s", next_page_href)
+            page += 1
+            
+            # OLX не віддає сторінки після ліміту
+            if page > max_pages:
+                self.logger.info("Досягнуто ліміт сторінок (%s)", max_pages)
+                break
+            
+            # Невелика пауза між сторінками
+            await asyncio.sleep(self.config.delay_between_requests)
         
         return all_products
     
+    async def fetch_listing_first_page(self, category: Category) -> Optional["ListingPage"]:
+        """Перша сторінка видачі категорії з лічильником оголошень"""
+        from crawl_budget import ListingPage
+        
+        listing_url, soup = await self.resolve_listing_page(category.url, category.name)
+        if not soup:
+            return None
+        products, next_page_href = self.extract_listing_page(soup, listing_url)
+        return ListingPage(products=products, next_page_url=next_page_href, listing_url=listing_url,
+                           total_count=self.extract_total_count(soup))
+    
+    async def fetch_listing_page(self, listing_url: str, page: int) -> Optional["ListingPage"]:
+        """Сторінка пагінації видачі: потоково або з кешу розібраних сторінок"""
+        from crawl_budget import ListingPage
+        
+        page_url = self.build_page_url(listing_url, page)
+        if self.config.stream_listing_pages:
+            # Картки витягуються під час завантаження, решта сторінки після пагінації не читається
+            streamed = await self.fetch_listing_stream(page_url)
+            if streamed is None:
+                return None
+            products, stream = streamed
+            return ListingPage(products=products, next_page_url=stream.next_page_url, listing_url=listing_url)
+        
+        # Однакова з попереднім обходом сторінка береться з кешу без розбору
+        html = await self.fetch_html(page_url)
+        if html is None:
+            return None
+        products, next_page_href = self.parse_listing_html(html, listing_url)
+        return ListingPage(products=products, next_page_url=next_page_href, listing_url=listing_url)
+    
+    async def fetch_listing_stream(self, page_url: str) -> Optional[Tuple[List[Product], "StreamedListing"]]:
+        """Завантажує сторінку видачі частинами та витягує картки, щойно вони закрились
+        
+        Розбір перекривається із завантаженням, а в пам'яті не тримаються ні
+        весь текст сторінки, ні все дерево. Наступна сторінка визначається за
+        кнопкою пагінації "вперед".
+        """
+        from stream_parser import StreamingListingParser
+        
+        stream = StreamingListingParser(keep_raw=self.config.archive_pages)
+        cards = []
+        
+        def consume(chunk: bytes) -> bool:
+            for element in stream.feed(chunk):
+                card = self._extract_card(element, self.config.base_url)
+                if card:
+                    cards.append(card)
+            return stream.done
+        
+        response = await self.get_fetch_client().fetch_stream(
+            page_url, consume,
+            chunk_size=self.config.stream_chunk_size,
+            drain_limit=self.config.stream_drain_kb * 1024
+        )
+        if response is None:
+            return None
+        if response.status != 200:
+            self.logger.warning("HTTP %s для %s", response.status, page_url)
+            return None
+        
+        if not stream.done:
+            # Тіло прочитано до кінця - забираємо картки, що залишились у парсері
+            for element in stream.close():
+                card = self._extract_card(element, self.config.base_url)
+                if card:
+                    cards.append(card)
+        if self.config.archive_pages:
+            # Архівується прочитана частина сторінки (до кінця пагінації)
+            self.archive_page(page_url, stream.result.html)
+        
+        prices = self.price_normalizer.normalize_batch(price_text for _, price_text in cards)
+        products = [self.price_normalizer.apply(product, price) for (product, _), price in zip(cards, prices)]
+        return products, stream.result
+    
+    def extract_listing_products(self, soup: BeautifulSoup, page_url: str) -> List[Product]:
+        """Товари з однієї сторінки видачі"""
+        product_elements = self.layout_detector.select_cards(soup, page_url)
+        return self.extract_products_from_elements(product_elements, self.config.base_url)
+    
+    def extract_listing_page(self, soup: BeautifulSoup, page_url: str) -> Tuple[List[Product], Optional[str]]:
+        """Товари сторінки видачі та посилання на наступну сторінку"""
+        product_elements = self.layout_detector.select_cards(soup, page_url)
+        if not product_elements:
+            self.logger.warning("Не знайдено карток товарів на %s", page_url)
+            return [], None
+        self.logger.debug("Знайдено %s елементів товарів на %s", len(product_elements), page_url)
+        
+        products = self.extract_products_from_elements(product_elements, self.config.base_url)
+        next_page_link = self.find_next_page_link(soup)
+        return products, next_page_link.get('href', 'N/A') if next_page_link else None
+    
+    async def crawl_listing_pipeline(self, listing_url: str, category_name: str, first_soup: BeautifulSoup,
+                                     max_pages: Optional[int] = None) -> List[Product]:
+        """Обходить видачу конвеєром fetch → parse → extract → export
+        
+        Кількість сторінок відома з лічильника оголошень першої сторінки, тож
+        усі сторінки запитуються паралельно, а розбір і запис перекриваються
+        з мережевими запитами. Без лічильника - звичайний послідовний обхід.
+        """
+        from pipeline import Pipeline, Stage
+        
+        max_pages = max_pages or self.config.max_pages
+        total_count = self.extract_total_count(first_soup)
+        if total_count is None:
+            return await self.crawl_listing(listing_url, category_name, first_soup=first_soup, max_pages=max_pages)
+        
+        per_page = len(self.layout_detector.select_cards(first_soup, listing_url)) or DEFAULT_LISTINGS_PER_PAGE
+        page_count = max(1, min(max_pages, math.ceil(total_count / per_page)))
+        self.logger.info("Конвеєр: %s сторінок видачі %s", page_count, listing_url)
+        
+        use_processes = self.config.pipeline_cpu_executor == "process"
+        cpu_workers = self.config.pipeline_cpu_workers
+        pages: Dict[int, List[Product]] = {}
+        # Результати з кешу до етапу експорту (лише він пише сторінки та статистику)
+        cached_pages: Dict[int, Tuple[List[Product], Optional[str]]] = {}
+        stream_path = (os.path.join(self.config.output_directory, self.config.pipeline_stream_file)
+                       if self.config.pipeline_stream_file else "")
+        
+        async def fetch(item):
+            page, page_url = item
+            if page == 1:
+                return page, page_url, None, first_soup, None
+            html = await self.fetch_html(page_url)
+            if html is None:
+                raise ValueError(f"не вдалося отримати сторінку {page}")
+            await asyncio.sleep(self.config.delay_between_requests)
+            memo_key = self.listing_memo_key(html)
+            cached = self.page_memo.get(memo_key) if memo_key is not None else None
+            if cached is not None:
+                # Сторінка не змінилась - розбір і витягування пропускаються
+                cached_pages[page] = cached
+                return CachedListingPage(page)
+            if use_processes:
+                return self.config, page, page_url, html, memo_key
+            return page, page_url, html, None, memo_key
+        
+        def parse(item):
+            if isinstance(item, CachedListingPage):
+                return item
+            page, page_url, html, soup, memo_key = item
+            return page, page_url, soup if soup is not None else BeautifulSoup(html, 'html.parser'), memo_key
+        
+        def extract(item):
+            if isinstance(item, CachedListingPage):
+                return item
+            page, page_url, soup, memo_key = item
+            products, next_page = self.extract_listing_page(soup, page_url)
+            return page, products, next_page, memo_key
+        
+        def export(item):
+            if isinstance(item, CachedListingPage):
+                item = (item.page, *cached_pages.pop(item.page), None)
+            page, products, next_page, memo_key = item
+            if memo_key is not None and products:
+                self.page_memo.put(memo_key, products, next_page)
+            for product in products:
+                product.category = category_name
+            self.record_price_stats(category_name, products)
+            pages[page] = products
+            if stream_path:
+                with open(stream_path, 'a', encoding='utf-8') as f:
+                    for product in products:
+                        f.write(json.dumps(product.to_dict(), ensure_ascii=False) + "\n")
+        
+        if stream_path:
+            os.makedirs(os.path.dirname(stream_path) or ".", exist_ok=True)
+        fetch_workers = self.config.pipeline_fetch_workers or self.config.max_requests_per_host
+        if use_processes:
+            # Сторінку 1 вже розібрано - витягуємо її тут, решта йде в процеси
+            pages_to_fetch = range(2, page_count + 1)
+            export((1, self.extract_listing_products(first_soup, listing_url), None, None))
+            cpu_stages = [Stage("extract", _extract_page_in_process, workers=cpu_workers, executor="process")]
+        else:
+            pages_to_fetch = range(1, page_count + 1)
+            cpu_stages = [
+                Stage("parse", parse, workers=cpu_workers, executor="thread"),
+                Stage("extract", extract, workers=cpu_workers, executor="thread"),
+            ]
+        pipeline = Pipeline(
+            [Stage("fetch", fetch, workers=fetch_workers)] + cpu_stages + [Stage("export", export, executor="thread")],
+            queue_size=self.config.pipeline_queue_size
+        )
+        self.pipeline_metrics[category_name] = await pipeline.run(
+            (page, self.build_page_url(listing_url, page)) for page in pages_to_fetch
+        )
+        for error in pipeline.errors:
+            self.logger.warning("Конвеєр %s: %s", category_name, error)
+        
+        products = [product for page in sorted(pages) for product in pages[page]]
+        # Етап експорту працює в потоці - зображення ставимо в чергу тут
+        self.queue_images(products)
+        return products
+    
+    def extract_total_count(self, soup: BeautifulSoup) -> Optional[int]:
+        """Кількість оголошень у видачі ("Ми знайшли 12 345 оголошень")"""
+        count_elem = soup.find(attrs={'data-testid': 'total-count'})
+        if not count_elem:
+            return None
+        
+        digits = re.sub(r'\D', '', count_elem.get_text())
+        return int(digits) if digits else None
+    
+    async def count_listings(self, url: str) -> Optional[int]:
+        """Отримує кількість оголошень для URL видачі"""
+        soup = await self.fetch_page(url)
+        if not soup:
+            return None
+        return self.extract_total_count(soup)
+    
+    async def crawl_price_shards(self, listing_url: str, category_name: str, capacity: int) -> List[Product]:
+        """Розбиває видачу на цінові діапазони та обходить їх паралельно"""
+        planner = PriceShardPlanner(
+            count_listings=self.count_listings,
+            capacity=capacity,
+            max_price=self.config.shard_max_price,
+            max_depth=self.config.shard_max_depth
+        )
+        shards = await planner.plan(listing_url)
+        self.logger.info("Категорія %s: %s цінових діапазонів", category_name, len(shards))
+        
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+        
+        async def crawl_shard(shard: PriceShard) -> List[Product]:
+            async with semaphore:
+                self.logger.debug("Діапазон %s-%s: %s", shard.price_from, shard.price_to, shard.url)
+                return await self.crawl_listing(shard.url, category_name, record_stats=False)
+        
+        shard_results = await asyncio.gather(*(crawl_shard(shard) for shard in shards), return_exceptions=True)
+        
+        product_lists = []
+        for shard, shard_result in zip(shards, shard_results):
+            if isinstance(shard_result, Exception):
+                self.logger.error("Помилка при обході діапазону %s: %s", shard.url, shard_result)
+                continue
+            product_lists.append(shard_result)
+        
+        # Оголошення з ціною на межі двох діапазонів враховуються один раз
+        products = merge_unique_products(product_lists)
+        self.record_price_stats(category_name, products)
+        return products
+    
     def find_next_page_link(self, soup: BeautifulSoup) -> Optional[Tag]:
         """Знаходить посилання на наступну сторінку в OLX"""
         try:
+            # Пагінація OLX без кнопки "вперед" - це остання сторінка
+            # (інакше пошук за page= нижче знайде посилання на попередні)
+            if (soup.find(attrs={'data-testid': 'pagination-list'})
+                    and not soup.find('a', {'data-testid': 'pagination-forward'})):
+                self.logger.debug("Остання сторінка пагінації")
+                return None
+            
             # Різні варіанти пошуку кнопки "Наступна"
             next_page_selectors = [
                 # Пошук за текстом
@@ -174,7 +546,7 @@ class OlxPriceParser(BasePriceParser):
             # Знаходимо перший знайдений елемент
             for selector in next_page_selectors:
                 if selector:
-                    self.logger.debug(f"Знайдено посилання на наступну сторінку: {selector.get('href', 'N/A')}")
+                    self.logger.debug("Знайдено посилання на наступну сторінку: %s", selector.get('href', 'N/A'))
                     return selector
             
             # Додатковий пошук - шукаємо всі посилання та перевіряємо чи містять вони номер сторінки
@@ -188,23 +560,79 @@ class OlxPriceParser(BasePriceParser):
                         page_num = int(current_page_match.group(1))
                         # Якщо номер сторінки більший за поточний, то це наступна сторінка
                         if page_num > 1:  # Приблизна перевірка
-                            self.logger.debug(f"Знайдено посилання на сторінку {page_num}: {href}")
+                            self.logger.debug("Знайдено посилання на сторінку %s: %s", page_num, href)
                             return link
             
             self.logger.debug("Посилання на наступну сторінку не знайдено")
             return None
             
         except Exception as e:
-            self.logger.error(f"Помилка при пошуку наступної сторінки: {e}")
+            self.logger.error("Помилка при пошуку наступної сторінки: %s", e)
             return None
     
+    def extract_products_from_elements(self, elements: List[Tag], base_url: str) -> List[Product]:
+        """Витягування товарів з карток сторінки з пакетною нормалізацією цін"""
+        cards = []
+        for element in elements:
+            card = self._extract_card(element, base_url)
+            if card:
+                cards.append(card)
+        
+        # Нормалізуємо всі ціни сторінки одним пакетом
+        prices = self.price_normalizer.normalize_batch(price_text for _, price_text in cards)
+        
+        products = []
+        for (product, _), price in zip(cards, prices):
+            products.append(self.price_normalizer.apply(product, price))
+        return products
+    
     def extract_product_data_from_element(self, element: Tag, base_url: str) -> Optional[Product]:
         """Витягування даних про товар з HTML елемента OLX.ua"""
+        products = self.extract_products_from_elements([element], base_url)
+        return products[0] if products else None
+    
+    @staticmethod
+    def _find_name_elem(element: Tag) -> Optional[Tag]:
+        """Елемент з назвою товару в картці"""
+        return element.find('h6') or element.find('h5') or element.find('h4') or element.find('a', href=True)
+    
+    def _extract_price_text(self, element: Tag) -> str:
+        """Знаходить текст ціни в картці товару
+        
+        Назва оголошення в пошук не входить: цифри на кшталт "128 ГБ" не є ціною.
+        """
+        name_elem = self._find_name_elem(element)
+        
+        def outside_name(node) -> bool:
+            return name_elem is None or all(parent is not name_elem for parent in node.parents)
+        
+        price_elem = element.find(attrs={'data-testid': 'ad-price'})
+        if not price_elem:
+            price_elem = next((text for text in element.find_all(string=PRICE_HINT_RE) if outside_name(text)), None)
+        if not price_elem:
+            price_elem = element.find(class_=re.compile(r'price|cost'))
+        
+        price_text = ""
+        if price_elem:
+            if hasattr(price_elem, 'get_text'):
+                price_text = price_elem.get_text(' ')
+            else:
+                price_text = str(price_elem)
+        
+        # Пошук ціни в тексті картки - лише число з позначкою валюти
+        if not price_text:
+            card_text = ' '.join(text for text in element.find_all(string=True) if outside_name(text))
+            price_match = re.search(r'(\d+(?:[\s,]*\d+)*)\s*(?:грн|₴|UAH)', card_text)
+            if price_match:
+                price_text = price_match.group()
+        
+        return price_text
+    
+    def _extract_card(self, element: Tag, base_url: str) -> Optional[Tuple[Product, str]]:
+        """Витягує товар (без нормалізованої ціни) та сирий текст ціни з картки"""
         try:
             # Назва товару
-            name_elem = element.find('h6') or element.find('h5') or element.find('h4')
-            if not name_elem:
-                name_elem = element.find('a', href=True)
+            name_elem = self._find_name_elem(element)
             
             name = ""
             if name_elem:
@@ -213,32 +641,8 @@ class OlxPriceParser(BasePriceParser):
             if not name:
                 return None
             
-            # Ціна
-            price_elem = element.find(string=re.compile(r'грн|₴|UAH'))
-            if not price_elem:
-                price_elem = element.find(class_=re.compile(r'price|cost'))
-            
-            price_text = ""
-            if price_elem:
-                if hasattr(price_elem, 'get_text'):
-                    price_text = price_elem.get_text()
-                else:
-                    price_text = str(price_elem)
-            
-            # Пошук ціни в тексті
-            if not price_text:
-                element_text = element.get_text()
-                # Покращений регулярний вираз для пошуку цін
-                price_match = re.search(r'(\d+(?:[\s,]*\d+)*)\s*(?:грн|₴|UAH)', element_text)
-                if price_match:
-                    price_text = price_match.group()
-                else:
-                    # Альтернативний пошук - просто числа
-                    price_match = re.search(r'(\d+(?:[\s,]*\d+)*)', element_text)
-                    if price_match:
-                        price_text = price_match.group() + " грн"
-            
-            price = self.extract_price(price_text)
+            # Ціна (нормалізується пакетом для всієї сторінки)
+            price_text = self._extract_price_text(element)
             
             # Посилання на товар
             link_elem = element.find('a', href=True)
@@ -263,38 +667,33 @@ class OlxPriceParser(BasePriceParser):
                 if sku_match:
                     sku = sku_match.group(1)
             
+            # Мініатюра (OLX підвантажує зображення ліниво через data-src)
+            image_url = ""
+            img_elem = element.find('img')
+            if img_elem:
+                for src in (img_elem.get('src'), img_elem.get('data-src')):
+                    if src and not src.startswith('data:') and 'no_thumbnail' not in src:
+                        image_url = src if src.startswith('http') else self.make_absolute_url(src, base_url)
+                        break
+            
             # Створюємо об'єкт товару
             product = Product(
                 name=name,
-                price=price if price else Decimal("0"),
+                price=Decimal("0"),
                 product_url=product_url,
                 availability=availability,
-                sku=sku
+                sku=sku,
+                image_url=image_url
             )
             
-            return product
+            return product, price_text
             
         except Exception as e:
-            self.logger.error(f"Помилка при витягуванні даних про товар: {e}")
+            self.logger.error("Помилка при витягуванні даних про товар: %s", e)
             return None
     
     def extract_price(self, price_text: str) -> Optional[Decimal]:
-        """Витягування ціни з тексту OLX.ua"""
-        try:
-            if not price_text:
-                return None
-            
-            # Видаляємо зайві символи та конвертуємо валюту
-            price_text = price_text.replace('грн', '').replace('₴', '').replace('UAH', '').strip()
-            
-            # Шукаємо числа - змінюємо регулярний вираз щоб брати всі цифри
-            # Використовуємо (\d+(?:[\s,]*\d+)*) для пошуку всіх цифр
-            price_match = re.search(r'(\d+(?:[\s,]*\d+)*)', price_text)
-            if price_match:
-                price_str = price_match.group(1).replace(' ', '').replace(',', '')
-                return Decimal(price_str)
-                
-        except (ValueError, AttributeError, TypeError):
-            self.logger.warning(f"Не вдалося розпарсити ціну: {price_text}")
-        
-        return None
\ No newline at end of file
+        """Витягування ціни з тексту OLX.ua (сума у виявленій валюті)"""
+        if not price_text:
+            return None
+        return self.price_normalizer.normalize(price_text).amount
@@ -0,0 +1,228 @@
+"""
+Архів сирих сторінок у стилі WARC та офлайн-перевитягування
+
+Кожна отримана сторінка дописується в поточний сегмент `*.warc.gz` окремим
+gzip-членом (запис WARC/1.0 типу resource), тож запис читається за зсувом
+без розпакування всього сегмента. Індекс `index.jsonl` зберігає URL, час
+отримання, сегмент і зсув кожного запису. Сегменти лише дописуються; новий
+сегмент починається, коли поточний перевищує segment_max_bytes.
+
+Повторне витягування (replay) читає записи з архіву в пулі процесів без
+мережі, тож після виправлення витягування історичні дані переобробляються
+за хвилини.
+"""
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models import Product, ParsingResult
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_SUFFIX = ".warc.gz"
+
+@dataclass
+class ArchiveEntry:
+    """Запис індексу архіву"""
+    url: str
+    fetched_at: str      # ISO час отримання (UTC; старі записи - місцевий час без поясу)
+    segment: str         # Ім'я файлу сегмента
+    offset: int          # Зсув gzip-члена в сегменті
+    length: int          # Довжина стиснутого запису
+    status: int = 200
+    category: str = ""   # Категорія видачі (порожня для інших сторінок)
+
+def _as_utc(value: datetime) -> datetime:
+    """Час у UTC з поясом; час без поясу вважається місцевим"""
+    return value.astimezone(timezone.utc)
+
+def _warc_record(url: str, html: str, fetched_at: datetime) -> bytes:
+    """Запис WARC/1.0 типу resource з HTML сторінки
+
+    WARC-Date завжди в UTC.
+    """
+    body = html.encode('utf-8')
+    headers = (
+        "WARC/1.0\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {_as_utc(fetched_at).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return headers.encode('utf-8') + body + b"\r\n\r\n"
+
+def _parse_warc_record(data: bytes) -> str:
+    """HTML з запису WARC"""
+    header_end = data.index(b"\r\n\r\n")
+    length = 0
+    for line in data[:header_end].decode('utf-8').split("\r\n"):
+        name, _, value = line.partition(':')
+        if name.lower() == 'content-length':
+            length = int(value.strip())
+    body_start = header_end + 4
+    return data[body_start:body_start + length].decode('utf-8')
+
+class PageArchive:
+    """Архів сторінок з дописуванням у сегменти та індексом за URL і часом"""
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._segment: Optional[str] = None
+        self.stored = 0
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def segment_path(self, segment: str) -> str:
+        return os.path.join(self.directory, segment)
+
+    def _current_segment(self) -> str:
+        if self._segment is not None:
+            path = self.segment_path(self._segment)
+            if os.path.getsize(path) < self.segment_max_bytes:
+                return self._segment
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self._segment = f"segment-{stamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}"
+        open(self.segment_path(self._segment), 'ab').close()
+        return self._segment
+
+    def append(self, url: str, html: str, status: int = 200,
+               fetched_at: Optional[datetime] = None, category: str = "") -> ArchiveEntry:
+        """Дописує сторінку в архів (час без поясу вважається місцевим)"""
+        fetched_at = _as_utc(fetched_at or datetime.now(timezone.utc))
+        segment = self._current_segment()
+        data = gzip.compress(_warc_record(url, html, fetched_at))
+
+        path = self.segment_path(segment)
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(data)
+
+        entry = ArchiveEntry(url=url, fetched_at=fetched_at.isoformat(), segment=segment,
+                             offset=offset, length=len(data), status=status, category=category)
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+        self.stored += 1
+        return entry
+
+    def entries(self, url_prefix: str = "", since: Optional[datetime] = None,
+                until: Optional[datetime] = None, latest_only: bool = False) -> List[ArchiveEntry]:
+        """Записи індексу з фільтром за префіксом URL та часом отримання
+
+        since та until можуть бути з поясом або без (тоді - місцевий час).
+        """
+        if not os.path.exists(self.index_path):
+            return []
+
+        since = _as_utc(since) if since else None
+        until = _as_utc(until) if until else None
+        selected: List[ArchiveEntry] = []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = ArchiveEntry(**json.loads(line))
+                if url_prefix and not entry.url.startswith(url_prefix):
+                    continue
+                fetched_at = _as_utc(datetime.fromisoformat(entry.fetched_at))
+                if since and fetched_at < since:
+                    continue
+                if until and fetched_at > until:
+                    continue
+                selected.append(entry)
+
+        if latest_only:
+            def fetched(entry: ArchiveEntry) -> datetime:
+                return _as_utc(datetime.fromisoformat(entry.fetched_at))
+
+            latest: Dict[str, ArchiveEntry] = {}
+            for entry in selected:
+                if entry.url not in latest or fetched(entry) >= fetched(latest[entry.url]):
+                    latest[entry.url] = entry
+            selected = sorted(latest.values(), key=fetched)
+        return selected
+
+    def read(self, entry: ArchiveEntry) -> str:
+        """HTML сторінки з архіву"""
+        with open(self.segment_path(entry.segment), 'rb') as f:
+            f.seek(entry.offset)
+            data = f.read(entry.length)
+        return _parse_warc_record(gzip.decompress(data))
+
+    def iter_pages(self, **filters) -> Iterator[Tuple[ArchiveEntry, str]]:
+        """Записи разом з HTML"""
+        for entry in self.entries(**filters):
+            yield entry, self.read(entry)
+
+# Парсер процесу-обробника (створюється ініціалізатором пулу)
+_replay_parser = None
+_replay_archive: Optional[PageArchive] = None
+
+def _init_replay_worker(config, parser_name: str, directory: str):
+    global _replay_parser, _replay_archive
+    from parser_registry import create_parser
+
+    _replay_parser = create_parser(parser_name, config)
+    _replay_archive = PageArchive(directory)
+
+def _replay_entry(entry: ArchiveEntry) -> Tuple[ArchiveEntry, List[Dict[str, Any]], Optional[str]]:
+    """Витягує товари з одного запису архіву (в процесі пулу)"""
+    from bs4 import BeautifulSoup
+
+    try:
+        soup = BeautifulSoup(_replay_archive.read(entry), 'html.parser')
+        products = _replay_parser.extract_listing_products(soup, entry.url)
+        for product in products:
+            product.category = entry.category
+        return entry, [product.to_dict() for product in products], None
+    except Exception as e:
+        return entry, [], f"{entry.url} ({entry.fetched_at}): {e}"
+
+def replay_archive(config, directory: str, parser_name: str = "olx", processes: Optional[int] = None,
+                   url_prefix: str = "", since: Optional[datetime] = None, until: Optional[datetime] = None,
+                   latest_only: bool = True) -> ParsingResult:
+    """Повторно витягує товари з архіву в пулі процесів, без мережі"""
+    logger = logging.getLogger("PageArchive")
+    archive = PageArchive(directory)
+    entries = archive.entries(url_prefix=url_prefix, since=since, until=until, latest_only=latest_only)
+    logger.info("Повторне витягування %s сторінок з %s", len(entries), directory)
+
+    start = datetime.now()
+    products: List[Product] = []
+    errors: List[str] = []
+    pages_without_cards = 0
+    with multiprocessing.Pool(processes, initializer=_init_replay_worker,
+                              initargs=(config, parser_name, directory)) as pool:
+        for entry, items, error in pool.imap_unordered(_replay_entry, entries, chunksize=8):
+            if error:
+                errors.append(error)
+                continue
+            if not items:
+                pages_without_cards += 1
+            products.extend(Product.from_dict(item) for item in items)
+
+    if errors:
+        logger.warning("Не вдалося прочитати %s записів архіву", len(errors))
+    return ParsingResult(
+        # Пошкоджені записи не скасовують товари, відновлені з решти сторінок
+        success=bool(products) or not errors,
+        products=products,
+        errors=errors,
+        total_products=len(products),
+        parsing_time=(datetime.now() - start).total_seconds(),
+        metrics={"replay": {"pages": len(entries), "pages_without_cards": pages_without_cards,
+                            "failed_pages": len(errors)}}
+    )
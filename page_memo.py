@@ -0,0 +1,122 @@
+"""
+Мемоізація витягування сторінок видачі за хешем вмісту
+
+Ключ - хеш частини HTML, від якої залежить результат: від сітки (або першої
+картки) до пагінації, без скриптів. Тож сторінка, в якій змінився лише
+скрипт аналітики чи футер, не розбирається повторно. Результат (товари та
+посилання на наступну сторінку) зберігається в SQLite з витісненням
+найдавніше використаних записів, тож кеш переживає перезапуск і працює
+навіть тоді, коли сервер ігнорує умовні запити.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import Product
+
+# Змінюється разом з логікою витягування, щоб старі записи не використовувались
+MEMO_VERSION = "2"
+
+_REGION_START_RE = re.compile(r'data-(?:testid|cy)="(?:listing-grid|l-card)"')
+_REGION_END_RE = re.compile(r'data-testid="pagination-(?:forward|list|wrapper)"')
+_SCRIPT_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+def listing_region(html: str) -> Optional[str]:
+    """Частина сторінки з картками та пагінацією (None - це не видача)"""
+    start = _REGION_START_RE.search(html)
+    if start is None:
+        return None
+    end = len(html)
+    for end_match in _REGION_END_RE.finditer(html, start.start()):
+        # Закінчуємо на першому тегу після останнього елемента пагінації
+        close = html.find('>', end_match.end())
+        end = close + 1 if close != -1 else len(html)
+    return _SCRIPT_RE.sub('', html[start.start():end])
+
+def listing_hash(html: str, context: str = "") -> Optional[str]:
+    """Хеш частини сторінки з картками (context - все, що ще впливає на результат)"""
+    region = listing_region(html)
+    if region is None:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{MEMO_VERSION}\0{context}\0".encode('utf-8'))
+    digest.update(region.encode('utf-8', errors='surrogatepass'))
+    return digest.hexdigest()
+
+class PageMemo:
+    """Кеш результатів витягування на диску з витісненням LRU"""
+
+    def __init__(self, path: str, max_entries: int = 20000):
+        self.path = path
+        self.max_entries = max_entries
+        self.metrics: Dict[str, int] = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Доступ з потоків конвеєра та стеження
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # Кеш можна втратити - не чекаємо fsync на кожен запис
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Tuple[List[Product], Optional[str]]]:
+        """Товари та посилання на наступну сторінку, якщо сторінку вже розбирали"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.metrics["misses"] += 1
+                return None
+            self._db.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.metrics["hits"] += 1
+
+        data = json.loads(row[0])
+        return [Product.from_dict(item) for item in data["products"]], data.get("next_page")
+
+    def put(self, key: str, products: List[Product], next_page: Optional[str]):
+        """Зберігає результат витягування сторінки"""
+        items = []
+        for product in products:
+            item = product.to_dict()
+            # Час розбору при влучанні - поточний
+            item.pop("parsed_at", None)
+            items.append(item)
+        value = json.dumps({
+            "products": items,
+            "next_page": next_page
+        }, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (key, value, last_used) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            self.metrics["stored"] += 1
+            overflow = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM pages WHERE key IN (SELECT key FROM pages ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+                self.metrics["evicted"] += overflow
+            self._db.commit()
+
+    def summary(self) -> Dict[str, Any]:
+        """Метрики з часткою влучань"""
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return dict(self.metrics, hit_rate=round(self.metrics["hits"] / lookups, 4) if lookups else 0.0)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
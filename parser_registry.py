@@ -0,0 +1,53 @@
+"""
+Реєстр парсерів сайтів
+"""
+import importlib
+import os
+from dataclasses import replace
+from typing import Dict, List, Optional, Type
+
+from config import ParserConfig
+from http_client import FetchClient
+
+# Вбудовані парсери задані шляхом до класу, щоб не імпортувати їх без потреби
+_BUILTIN_PARSERS: Dict[str, str] = {
+    "olx": "olx_parser.OlxPriceParser",
+    "example": "example_parser.ExamplePriceParser",
+}
+
+_registered: Dict[str, Type] = {}
+
+def register_parser(name: str):
+    """Декоратор для реєстрації власного парсера під іменем сайту"""
+    def decorator(parser_class: Type) -> Type:
+        _registered[name] = parser_class
+        return parser_class
+    return decorator
+
+def available_parsers() -> List[str]:
+    """Імена всіх доступних парсерів"""
+    return sorted(set(_BUILTIN_PARSERS) | set(_registered))
+
+def get_parser_class(name: str) -> Type:
+    """Повертає клас парсера за іменем сайту"""
+    if name in _registered:
+        return _registered[name]
+    if name not in _BUILTIN_PARSERS:
+        raise ValueError(f"Невідомий парсер: {name}. Доступні: {', '.join(available_parsers())}")
+
+    module_name, class_name = _BUILTIN_PARSERS[name].rsplit('.', 1)
+    parser_class = getattr(importlib.import_module(module_name), class_name)
+    _registered[name] = parser_class
+    return parser_class
+
+def site_config(name: str, config: ParserConfig) -> ParserConfig:
+    """Конфігурація сайту з окремою директорією для файлів стану
+    
+    Дерево категорій, історія майже-дублікатів, кеш і архів сторінок
+    зберігаються в output_directory/<сайт>, тож сайти не читають чужі файли.
+    """
+    return replace(config, output_directory=os.path.join(config.output_directory, name))
+
+def create_parser(name: str, config: ParserConfig, fetch_client: Optional[FetchClient] = None):
+    """Створює парсер сайту зі спільним клієнтом запитів"""
+    return get_parser_class(name)(config, fetch_client)
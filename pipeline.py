@@ -0,0 +1,190 @@
+"""
+Конвеєр етапів обробки з обмеженими чергами asyncio
+
+Етапи (наприклад, fetch → parse → extract → export) з'єднані чергами
+обмеженого розміру: якщо наступний етап не встигає, попередній чекає на
+вільне місце (зворотний тиск). Кожен етап має власну кількість обробників;
+синхронні функції виконуються в пулі потоків або процесів, тож розбір HTML
+та запис на диск перекриваються з мережевими запитами.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Union
+
+EXECUTORS = ("async", "thread", "process")
+
+# Маркер кінця потоку в черзі
+_END = object()
+
+@dataclass
+class Stage:
+    """Етап конвеєра
+
+    func отримує елемент і повертає результат для наступного етапу,
+    None (відкинути) або список (кожен елемент іде далі окремо, якщо
+    fan_out=True). executor: async - корутина в циклі подій, thread або
+    process - синхронна функція в пулі (для process - функція модуля).
+    """
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    executor: str = "async"
+    queue_size: int = 0      # 0 - розмір черги конвеєра за замовчуванням
+    fan_out: bool = False
+
+    def __post_init__(self):
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"Невідомий виконавець етапу {self.name}: {self.executor}")
+
+@dataclass
+class StageMetrics:
+    """Метрики етапу"""
+    processed: int = 0
+    emitted: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    queue_depth_sum: int = 0
+    queue_samples: int = 0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    def sample_queue(self, depth: int):
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self.queue_depth_sum += depth
+        self.queue_samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        duration = (self.finished_at or time.perf_counter()) - self.started_at if self.started_at else 0.0
+        return {
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "throughput_per_second": round(self.processed / duration, 2) if duration > 0 else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_depth": round(self.queue_depth_sum / self.queue_samples, 2) if self.queue_samples else 0.0
+        }
+
+class Pipeline:
+    """З'єднує етапи обмеженими чергами та запускає їх обробники"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8):
+        if not stages:
+            raise ValueError("Конвеєр без етапів")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.metrics: Dict[str, StageMetrics] = {stage.name: StageMetrics() for stage in stages}
+        self.errors: List[str] = []
+
+    def _make_executor(self, stage: Stage) -> Optional[Executor]:
+        if stage.executor == "thread":
+            return ThreadPoolExecutor(max_workers=stage.workers, thread_name_prefix=f"pipeline-{stage.name}")
+        if stage.executor == "process":
+            return ProcessPoolExecutor(max_workers=stage.workers)
+        return None
+
+    async def _call(self, stage: Stage, executor: Optional[Executor], item: Any) -> Any:
+        if executor is None:
+            result = stage.func(item)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, stage.func, item)
+
+    async def _worker(self, stage: Stage, executor: Optional[Executor],
+                      inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]):
+        metrics = self.metrics[stage.name]
+        while True:
+            item = await inbox.get()
+            if item is _END:
+                # Повертаємо маркер для інших обробників етапу
+                await inbox.put(_END)
+                return
+
+            start = time.perf_counter()
+            try:
+                result = await self._call(stage, executor, item)
+            except Exception as e:
+                metrics.errors += 1
+                error_msg = f"Етап {stage.name}: {e}"
+                self.errors.append(error_msg)
+                self.logger.error(error_msg)
+                continue
+            finally:
+                metrics.busy_seconds += time.perf_counter() - start
+                metrics.processed += 1
+
+            if outbox is None or result is None:
+                continue
+            results = result if stage.fan_out else [result]
+            for value in results:
+                # Зворотний тиск: чекаємо, доки наступний етап звільнить місце
+                await outbox.put(value)
+                metrics.emitted += 1
+                self._sample_next_queue(stage, outbox)
+
+    def _sample_next_queue(self, stage: Stage, queue: asyncio.Queue):
+        """Глибина черги на вході наступного етапу"""
+        index = self.stages.index(stage) + 1
+        self.metrics[self.stages[index].name].sample_queue(queue.qsize())
+
+    async def _feed(self, items: Union[Iterable[Any], AsyncIterable[Any]], queue: asyncio.Queue):
+        first = self.metrics[self.stages[0].name]
+        if hasattr(items, '__aiter__'):
+            async for item in items:
+                await queue.put(item)
+                first.sample_queue(queue.qsize())
+        else:
+            for item in items:
+                await queue.put(item)
+                first.sample_queue(queue.qsize())
+        await queue.put(_END)
+
+    async def run(self, items: Union[Iterable[Any], AsyncIterable[Any]]) -> Dict[str, Dict[str, Any]]:
+        """Пропускає елементи через усі етапи, повертає метрики етапів"""
+        queues = [asyncio.Queue(maxsize=stage.queue_size or self.queue_size) for stage in self.stages]
+        executors = [self._make_executor(stage) for stage in self.stages]
+        tasks: List[asyncio.Future] = []
+        finish_tasks = []
+        try:
+            feeder = asyncio.ensure_future(self._feed(items, queues[0]))
+            tasks.append(feeder)
+            for index, stage in enumerate(self.stages):
+                outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+                metrics = self.metrics[stage.name]
+                metrics.started_at = time.perf_counter()
+                workers = [
+                    asyncio.ensure_future(self._worker(stage, executors[index], queues[index], outbox))
+                    for _ in range(stage.workers)
+                ]
+                tasks.extend(workers)
+                # Коли всі обробники етапу завершились - кінець потоку для наступного
+                finish_tasks.append(asyncio.ensure_future(self._finish_stage(stage, workers, outbox)))
+            tasks.extend(finish_tasks)
+            await feeder
+            await asyncio.gather(*finish_tasks)
+        finally:
+            # При скасуванні конвеєра зупиняємо всі обробники
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            for executor in executors:
+                if executor is not None:
+                    executor.shutdown(wait=False)
+        return self.get_metrics()
+
+    async def _finish_stage(self, stage: Stage, workers: List[asyncio.Future], outbox: Optional[asyncio.Queue]):
+        await asyncio.gather(*workers)
+        self.metrics[stage.name].finished_at = time.perf_counter()
+        if outbox is not None:
+            await outbox.put(_END)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Метрики всіх етапів"""
+        return {name: metrics.to_dict() for name, metrics in self.metrics.items()}
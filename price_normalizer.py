@@ -0,0 +1,150 @@
+"""
+Пакетна нормалізація цін з підтримкою кількох валют
+"""
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Dict, List, Optional, Iterable
+
+from config import ParserConfig
+from models import Product
+
+# Ознаки валют (порядок має значення - перша знайдена ознака визначає валюту)
+CURRENCY_PATTERNS = [
+    ("USD", re.compile(r'\$|\busd\b|дол', re.IGNORECASE)),
+    ("EUR", re.compile(r'€|\beur\b|євро|евро', re.IGNORECASE)),
+    ("UAH", re.compile(r'грн|₴|\buah\b', re.IGNORECASE)),
+]
+
+NEGOTIABLE_RE = re.compile(r'договірн|договорн|торг', re.IGNORECASE)
+FREE_RE = re.compile(r'безкоштовн|бесплатн|даром|free', re.IGNORECASE)
+EXCHANGE_RE = re.compile(r'обмін|обмен', re.IGNORECASE)
+
+# Число з роздільниками тисяч (пробіли, у т.ч. нерозривні) та десятковою частиною
+AMOUNT_RE = re.compile(r'\d+(?:[ \u00a0\u202f.,]\d+)*')
+SEPARATOR_RE = re.compile(r'[ \u00a0\u202f.,]')
+
+# Підказка для пошуку тексту ціни в картці товару
+PRICE_HINT_RE = re.compile(
+    r'грн|₴|UAH|\$|USD|€|EUR|Договірна|Договорная|Безкоштовно|Бесплатно|Обмін|Обмен',
+    re.IGNORECASE
+)
+
+CENTS = Decimal("0.01")
+
+@dataclass(frozen=True)
+class NormalizedPrice:
+    """Результат нормалізації рядка ціни"""
+    amount: Optional[Decimal]   # Сума у виявленій валюті (None якщо суми немає)
+    currency: str               # Код валюти (UAH, USD, EUR)
+    negotiable: bool = False    # Ціна договірна
+    free: bool = False          # Безкоштовно
+    exchange: bool = False      # Обмін
+
+def parse_amount(text: str) -> Optional[Decimal]:
+    """Витягує суму з тексту з урахуванням роздільників тисяч і десяткових"""
+    match = AMOUNT_RE.search(text)
+    if not match:
+        return None
+
+    number = match.group()
+    separators = SEPARATOR_RE.findall(number)
+    groups = SEPARATOR_RE.split(number)
+
+    # Останній роздільник "." або "," перед 1-2 цифрами - десятковий
+    if separators and separators[-1] in '.,' and len(groups[-1]) <= 2:
+        integer_part = ''.join(groups[:-1])
+        number = f"{integer_part}.{groups[-1]}"
+    else:
+        number = ''.join(groups)
+
+    try:
+        return Decimal(number)
+    except InvalidOperation:
+        return None
+
+class PriceNormalizer:
+    """Нормалізує рядки цін пакетами з кешуванням повторюваних рядків"""
+
+    def __init__(self, default_currency: str = "UAH", base_currency: Optional[str] = None,
+                 rates: Optional[Dict[str, Decimal]] = None, cache_size: int = 10000):
+        self.default_currency = default_currency
+        self.base_currency = base_currency
+        self.rates: Dict[str, Decimal] = {
+            currency.upper(): Decimal(str(rate)) for currency, rate in (rates or {}).items()
+        }
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    @classmethod
+    def from_config(cls, config: ParserConfig) -> "PriceNormalizer":
+        """Створює нормалізатор з налаштувань парсера"""
+        return cls(
+            base_currency=config.base_currency,
+            rates=config.currency_rates
+        )
+
+    def _normalize(self, price_text: str) -> NormalizedPrice:
+        """Розбирає один рядок ціни"""
+        currency = self.default_currency
+        for code, pattern in CURRENCY_PATTERNS:
+            if pattern.search(price_text):
+                currency = code
+                break
+
+        free = bool(FREE_RE.search(price_text))
+        amount = Decimal("0") if free else parse_amount(price_text)
+
+        return NormalizedPrice(
+            amount=amount,
+            currency=currency,
+            negotiable=bool(NEGOTIABLE_RE.search(price_text)),
+            free=free,
+            exchange=bool(EXCHANGE_RE.search(price_text))
+        )
+
+    def normalize(self, price_text: str) -> NormalizedPrice:
+        """Нормалізує рядок ціни (з кешем)"""
+        return self._normalize_cached(' '.join((price_text or '').split()))
+
+    def normalize_batch(self, price_texts: Iterable[str]) -> List[NormalizedPrice]:
+        """Нормалізує всі ціни сторінки, розбираючи кожен унікальний рядок один раз"""
+        texts = list(price_texts)
+        unique = {text: self.normalize(text) for text in dict.fromkeys(texts)}
+        return [unique[text] for text in texts]
+
+    def cache_info(self):
+        """Статистика кешу нормалізації"""
+        return self._normalize_cached.cache_info()
+
+    def convert(self, amount: Decimal, currency: str) -> Optional[Decimal]:
+        """Конвертує суму в базову валюту за локальною таблицею курсів"""
+        if not self.base_currency or currency == self.base_currency:
+            return amount
+        rate = self.rates.get(currency)
+        if rate is None:
+            return None
+        return (amount * rate).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+    def apply(self, product: Product, price: NormalizedPrice) -> Product:
+        """Записує нормалізовану ціну в товар"""
+        amount = price.amount if price.amount is not None else Decimal("0")
+        product.price = amount
+        product.currency = price.currency
+
+        if price.negotiable:
+            product.attributes["negotiable"] = True
+        if price.free:
+            product.attributes["free"] = True
+        if price.exchange:
+            product.attributes["exchange"] = True
+
+        if self.base_currency and price.currency != self.base_currency and price.amount is not None:
+            converted = self.convert(amount, price.currency)
+            if converted is not None:
+                product.attributes["original_price"] = str(amount)
+                product.attributes["original_currency"] = price.currency
+                product.price = converted
+                product.currency = self.base_currency
+
+        return product
@@ -0,0 +1,105 @@
+"""
+Розбиття великих категорій на цінові діапазони для обходу ліміту пагінації
+"""
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from models import Product
+
+PRICE_FROM_PARAM = "search[filter_float_price:from]"
+PRICE_TO_PARAM = "search[filter_float_price:to]"
+
+@dataclass
+class PriceShard:
+    """Ціновий діапазон видачі"""
+    url: str
+    price_from: int
+    price_to: Optional[int]        # None - без верхньої межі
+    listing_count: Optional[int] = None
+    depth: int = 0
+
+def build_price_filter_url(url: str, price_from: int, price_to: Optional[int]) -> str:
+    """Додає до URL фільтр ціни, замінюючи наявні фільтр і номер сторінки"""
+    parts = urlsplit(url)
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in (PRICE_FROM_PARAM, PRICE_TO_PARAM, "page")
+    ]
+    query.append((PRICE_FROM_PARAM, str(price_from)))
+    if price_to is not None:
+        query.append((PRICE_TO_PARAM, str(price_to)))
+    return urlunsplit(parts._replace(query=urlencode(query, safe='[]:')))
+
+def merge_unique_products(product_lists: Iterable[List[Product]]) -> List[Product]:
+    """Об'єднує списки товарів без дублікатів (за артикулом або посиланням)"""
+    seen = set()
+    merged = []
+    for products in product_lists:
+        for product in products:
+            key = product.sku or product.product_url
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(product)
+    return merged
+
+class PriceShardPlanner:
+    """Рекурсивно ділить ціновий діапазон, доки кожна частина не влізе в ліміт сторінок
+
+    Сусідні діапазони мають спільну межу ([0, m], [m, n], ...): фільтр ціни
+    включає обидві межі, тож дробові ціни між цілими межами не губляться, а
+    оголошення рівно на межі потрапляє в обидва діапазони і прибирається
+    merge_unique_products. Оголошення без ціни (лише "Договірна", "Обмін")
+    фільтр ціни не повертає - такі оголошення розбиттям не охоплюються.
+    """
+
+    def __init__(self, count_listings: Callable[[str], Awaitable[Optional[int]]],
+                 capacity: int, max_price: int = 10_000_000, max_depth: int = 12):
+        self.count_listings = count_listings
+        self.capacity = capacity
+        self.max_price = max_price
+        self.max_depth = max_depth
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def plan(self, listing_url: str) -> List[PriceShard]:
+        """Будує список діапазонів для видачі"""
+        shards = await asyncio.gather(
+            self._split(listing_url, 0, self.max_price, 0),
+            # Все дорожче за max_price - один відкритий діапазон
+            self._measure(listing_url, self.max_price, None, 0)
+        )
+        planned = shards[0] + [shards[1]]
+        return [shard for shard in planned if shard.listing_count != 0]
+
+    async def _measure(self, listing_url: str, price_from: int, price_to: Optional[int], depth: int) -> PriceShard:
+        """Створює діапазон та отримує кількість оголошень у ньому"""
+        url = build_price_filter_url(listing_url, price_from, price_to)
+        count = await self.count_listings(url)
+        return PriceShard(url=url, price_from=price_from, price_to=price_to, listing_count=count, depth=depth)
+
+    async def _split(self, listing_url: str, price_from: int, price_to: int, depth: int) -> List[PriceShard]:
+        """Рекурсивно ділить діапазон навпіл (геометрично - більшість цін низькі)"""
+        shard = await self._measure(listing_url, price_from, price_to, depth)
+
+        if shard.listing_count is None or shard.listing_count <= self.capacity:
+            return [shard]
+        # Межі цілі й спільні, тож діапазон [n, n + 1] далі не ділиться
+        if depth >= self.max_depth or price_to - price_from < 2:
+            self.logger.warning(
+                "Діапазон %s-%s містить %s оголошень і не може бути розбитий далі",
+                price_from, price_to, shard.listing_count
+            )
+            return [shard]
+
+        middle = int(math.sqrt((price_from + 1) * (price_to + 1)))
+        middle = min(max(middle, price_from + 1), price_to - 1)
+
+        halves = await asyncio.gather(
+            self._split(listing_url, price_from, middle, depth + 1),
+            self._split(listing_url, middle, price_to, depth + 1)
+        )
+        return halves[0] + halves[1]
@@ -0,0 +1,176 @@
+"""
+Потокова статистика цін по категоріях (t-digest з пакетним оновленням на NumPy)
+
+Скетчі можна об'єднувати між воркерами та запусками без сирих цін.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models import Product
+
+SUMMARY_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+class TDigest:
+    """Скетч розподілу: центроїди (середнє, вага) + count/min/max/sum"""
+
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.total = 0.0
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Зливає відсортовані точки в центроїди за шкалою k1 (точніше на хвостах)"""
+        order = np.argsort(means, kind='mergesort')
+        means = means[order]
+        weights = weights[order]
+
+        total_weight = weights.sum()
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / total_weight
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        cluster = np.floor(k - k.min()).astype(np.int64)
+
+        cluster_weights = np.bincount(cluster, weights=weights)
+        cluster_sums = np.bincount(cluster, weights=weights * means)
+        nonempty = cluster_weights > 0
+        self.weights = cluster_weights[nonempty]
+        self.means = cluster_sums[nonempty] / self.weights
+
+    def update(self, values: np.ndarray):
+        """Додає пакет значень (наприклад, ціни однієї сторінки)"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.total += float(values.sum())
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(values.size)])
+        )
+
+    def merge(self, other: "TDigest"):
+        """Об'єднує інший скетч з цим"""
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.total += other.total
+        self._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights])
+        )
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """Оцінки квантилів інтерполяцією між центрами центроїдів"""
+        qs = np.asarray(list(qs), dtype=np.float64)
+        if self.count == 0:
+            return [float('nan')] * len(qs)
+        positions = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], positions, [float(self.count)]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(qs * self.count, positions, values).tolist()
+
+    def summary(self) -> Dict[str, Any]:
+        """Зведення: кількість, мінімум, максимум, середнє та квантилі"""
+        if self.count == 0:
+            return {"count": 0}
+        data = {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count
+        }
+        for q, value in zip(SUMMARY_QUANTILES, self.quantiles(SUMMARY_QUANTILES)):
+            data[f"p{int(q * 100)}"] = round(value, 2)
+        return data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "total": self.total
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        digest = cls(compression=data.get("compression", 100.0))
+        digest.means = np.asarray(data.get("means", []), dtype=np.float64)
+        digest.weights = np.asarray(data.get("weights", []), dtype=np.float64)
+        digest.count = data.get("count", 0)
+        if digest.count:
+            digest.min = data["min"]
+            digest.max = data["max"]
+        digest.total = data.get("total", 0.0)
+        return digest
+
+class PriceStatsCollector:
+    """Скетчі цін по (категорія, валюта), що оновлюються по сторінці за раз"""
+
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.sketches: Dict[Tuple[str, str], TDigest] = {}
+
+    def consume(self, category: str, products: List[Product]):
+        """Додає ціни товарів сторінки (без нульових - договірна/безкоштовно)"""
+        by_currency: Dict[str, List[float]] = {}
+        for product in products:
+            if product.price:
+                by_currency.setdefault(product.currency, []).append(float(product.price))
+
+        for currency, prices in by_currency.items():
+            key = (category, currency)
+            sketch = self.sketches.get(key)
+            if sketch is None:
+                sketch = self.sketches[key] = TDigest(self.compression)
+            sketch.update(np.fromiter(prices, dtype=np.float64, count=len(prices)))
+
+    def merge(self, other: "PriceStatsCollector"):
+        """Об'єднує скетчі іншого збирача (іншого воркера чи запуску)"""
+        for key, sketch in other.sketches.items():
+            own = self.sketches.get(key)
+            if own is None:
+                own = self.sketches[key] = TDigest(self.compression)
+            own.merge(sketch)
+
+    def _selected(self, categories: Optional[Iterable[str]]):
+        selected = set(categories) if categories is not None else None
+        for (category, currency), sketch in self.sketches.items():
+            if selected is None or category in selected:
+                yield category, currency, sketch
+
+    def summary(self, categories: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Зведення {категорія: {валюта: статистика}}"""
+        data: Dict[str, Dict[str, Any]] = {}
+        for category, currency, sketch in self._selected(categories):
+            data.setdefault(category, {})[currency] = sketch.summary()
+        return data
+
+    def to_dict(self, categories: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Зведення та скетчі (для подальшого об'єднання) вибраних категорій"""
+        categories = list(categories) if categories is not None else None
+        return {
+            "summary": self.summary(categories),
+            "sketches": [
+                {"category": category, "currency": currency, "digest": sketch.to_dict()}
+                for category, currency, sketch in self._selected(categories)
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PriceStatsCollector":
+        collector = cls()
+        for item in data.get("sketches", []):
+            collector.sketches[(item["category"], item["currency"])] = TDigest.from_dict(item["digest"])
+        return collector
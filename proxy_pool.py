@@ -0,0 +1,136 @@
+"""
+Пул проксі та User-Agent з ротацією і оцінкою стану проксі
+"""
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any
+
+from config import ParserConfig
+
+@dataclass
+class ProxyState:
+    """Стан проксі (url=None - пряме з'єднання)"""
+    url: Optional[str]
+    latency_ewma: Optional[float] = None   # Згладжена затримка відповіді (сек)
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    quarantined_until: float = 0.0
+    session_user_agent: str = ""           # User-Agent при ротації "на сесію"
+
+    @property
+    def score(self) -> float:
+        """Оцінка проксі: частка успішних запитів на одиницю затримки"""
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        latency = self.latency_ewma if self.latency_ewma is not None else 1.0
+        return success_rate / (latency + 0.1)
+
+    def is_quarantined(self, now: float) -> bool:
+        return self.quarantined_until > now
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "latency_ewma": self.latency_ewma,
+            "successes": self.successes,
+            "failures": self.failures,
+            "quarantined": self.is_quarantined(time.monotonic()),
+            "score": round(self.score, 4)
+        }
+
+@dataclass
+class Identity:
+    """Проксі та User-Agent для одного запиту"""
+    proxy: ProxyState
+    user_agent: str
+
+    @property
+    def proxy_url(self) -> Optional[str]:
+        return self.proxy.url
+
+class IdentityPool:
+    """Розподіляє запити між проксі пропорційно їх оцінці
+
+    Проксі, що поспіль не відповідають failure_threshold разів, потрапляють
+    на карантин на quarantine_seconds. Якщо на карантині всі, використовується
+    той, чий карантин закінчується найраніше.
+    """
+
+    def __init__(self, proxies: Optional[List[str]] = None, user_agents: Optional[List[str]] = None,
+                 rotation: str = "request", include_direct: bool = False,
+                 quarantine_seconds: float = 60.0, failure_threshold: int = 3,
+                 ewma_alpha: float = 0.3, rng: Optional[random.Random] = None):
+        if rotation not in ("request", "session"):
+            raise ValueError(f"Невідомий режим ротації: {rotation}")
+
+        proxy_urls: List[Optional[str]] = list(proxies or [])
+        if include_direct or not proxy_urls:
+            proxy_urls.append(None)
+
+        self.proxies = [ProxyState(url=url) for url in proxy_urls]
+        self.user_agents = list(user_agents or ["Mozilla/5.0"])
+        self.rotation = rotation
+        self.quarantine_seconds = quarantine_seconds
+        self.failure_threshold = failure_threshold
+        self.ewma_alpha = ewma_alpha
+        self.rng = rng or random.Random()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        for proxy in self.proxies:
+            proxy.session_user_agent = self.rng.choice(self.user_agents)
+
+    @classmethod
+    def from_config(cls, config: ParserConfig) -> "IdentityPool":
+        """Створює пул з налаштувань парсера"""
+        return cls(
+            proxies=config.proxies,
+            user_agents=config.user_agents or [config.user_agent],
+            rotation=config.identity_rotation,
+            include_direct=config.proxy_include_direct,
+            quarantine_seconds=config.proxy_quarantine_seconds,
+            failure_threshold=config.proxy_failure_threshold
+        )
+
+    def acquire(self) -> Identity:
+        """Обирає проксі (зважено за оцінкою) та User-Agent для запиту"""
+        now = time.monotonic()
+        available = [proxy for proxy in self.proxies if not proxy.is_quarantined(now)]
+
+        if available:
+            weights = [proxy.score for proxy in available]
+            proxy = self.rng.choices(available, weights=weights, k=1)[0]
+        else:
+            proxy = min(self.proxies, key=lambda item: item.quarantined_until)
+
+        if self.rotation == "session":
+            user_agent = proxy.session_user_agent
+        else:
+            user_agent = self.rng.choice(self.user_agents)
+        return Identity(proxy=proxy, user_agent=user_agent)
+
+    def report(self, identity: Identity, ok: bool, latency: float):
+        """Оновлює оцінку проксі за результатом запиту"""
+        proxy = identity.proxy
+        if ok:
+            proxy.successes += 1
+            proxy.consecutive_failures = 0
+            if proxy.latency_ewma is None:
+                proxy.latency_ewma = latency
+            else:
+                proxy.latency_ewma = self.ewma_alpha * latency + (1 - self.ewma_alpha) * proxy.latency_ewma
+            return
+
+        proxy.failures += 1
+        proxy.consecutive_failures += 1
+        if proxy.consecutive_failures >= self.failure_threshold:
+            proxy.quarantined_until = time.monotonic() + self.quarantine_seconds
+            proxy.consecutive_failures = 0
+            # Нова сесія після карантину - з іншим User-Agent
+            proxy.session_user_agent = self.rng.choice(self.user_agents)
+            self.logger.warning("Проксі %s на карантині на %.0f сек", proxy.url or "direct", self.quarantine_seconds)
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Стан усіх проксі"""
+        return [proxy.to_dict() for proxy in self.proxies]
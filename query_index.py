@@ -0,0 +1,298 @@
+"""
+Індекс для запитів до зібраних товарів у пам'яті
+
+Будується один раз з ParsingResult або збережених запусків (JSON, .olxsnap):
+ціни в копійках відсортовані (діапазон ціни - два бінарні пошуки),
+назви та категорії мають інвертовані індекси токенів (рядки у зростаючому
+порядку, тож умови перетинаються без сортування). Перші k результатів
+вибираються частковим сортуванням, а Product створюється лише для них.
+"""
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from models import Product, ParsingResult
+
+SORT_ORDERS = ("price", "-price", "newest", "oldest")
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def tokenize(text: str) -> List[str]:
+    """Токени для пошуку: слова та числа в нижньому регістрі"""
+    return _TOKEN_RE.findall(text.lower())
+
+@dataclass
+class Query:
+    """Умови запиту; порожні умови не обмежують результат"""
+    text: str = ""                   # Всі слова мають бути в назві
+    category: str = ""               # Всі слова мають бути в назві категорії
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    currency: str = ""               # UAH, USD, ...
+    available_only: bool = False
+    sort: str = "price"              # price, -price, newest, oldest
+    limit: int = 20
+
+    def __post_init__(self):
+        if self.sort not in SORT_ORDERS:
+            raise ValueError(f"Невідомий порядок сортування: {self.sort}")
+
+@dataclass
+class QueryResult:
+    """Рядки індексу першої сторінки результату та загальна кількість збігів"""
+    rows: np.ndarray
+    total: int
+    elapsed_ms: float
+
+class ProductIndex:
+    """Колонки товарів та індекси для фільтрів за ціною, словами та категорією"""
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._categories: List[str] = []
+        self._currencies: List[str] = []
+        self._urls: List[str] = []
+        self._price_cents: List[np.ndarray] = []
+        self._parsed_at: List[np.ndarray] = []
+        self._available: List[np.ndarray] = []
+        # Відновлення Product: функція джерела та номер рядка в ньому
+        self._loaders: List[Callable[[int], Product]] = []
+        self._source_ids: List[np.ndarray] = []
+        self._source_rows: List[np.ndarray] = []
+        self._built = False
+
+    @classmethod
+    def from_products(cls, products: Sequence[Product]) -> "ProductIndex":
+        index = cls()
+        index.add_products(products)
+        return index.build()
+
+    @classmethod
+    def from_result(cls, result: ParsingResult) -> "ProductIndex":
+        return cls.from_products(result.products)
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str]) -> "ProductIndex":
+        """Індекс по збережених запусках; повтори оголошення - найновіша версія"""
+        from snapshot import SnapshotReader, is_snapshot
+
+        index = cls()
+        for path in paths:
+            if is_snapshot(path):
+                # Знімок лишається відкритим: Product відновлюються з mmap за запитом
+                index.add_snapshot(SnapshotReader(path))
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index.add_products(ParsingResult.from_dict(json.load(f)).products)
+        return index.build()
+
+    def _add_source(self, loader: Callable[[int], Product], count: int):
+        self._source_ids.append(np.full(count, len(self._loaders), dtype=np.int32))
+        self._source_rows.append(np.arange(count, dtype=np.int32))
+        self._loaders.append(loader)
+
+    def add_products(self, products: Sequence[Product]):
+        count = len(products)
+        self._names.extend(product.name for product in products)
+        self._categories.extend(product.category for product in products)
+        self._currencies.extend(product.currency for product in products)
+        self._urls.extend(product.product_url for product in products)
+        self._price_cents.append(np.fromiter(
+            (int((product.price * 100).to_integral_value()) for product in products), dtype=np.int64, count=count
+        ))
+        self._parsed_at.append(np.fromiter(
+            (int(product.parsed_at.timestamp() * 1_000_000) for product in products), dtype=np.int64, count=count
+        ))
+        self._available.append(np.fromiter((product.availability for product in products), dtype=bool, count=count))
+        self._add_source(products.__getitem__, count)
+
+    def add_snapshot(self, reader):
+        """Колонки знімка без створення Product для кожного рядка"""
+        from snapshot import FLAG_AVAILABLE
+
+        self._names.extend(reader.strings("name"))
+        self._categories.extend(reader.strings("category"))
+        self._currencies.extend(reader.strings("currency"))
+        self._urls.extend(reader.strings("product_url"))
+        self._price_cents.append(np.array(reader.price_cents, dtype=np.int64))
+        self._parsed_at.append(np.array(reader.column("parsed_at"), dtype=np.int64))
+        self._available.append((reader.column("flags") & FLAG_AVAILABLE).astype(bool))
+        self._add_source(reader.product, len(reader))
+
+    def build(self) -> "ProductIndex":
+        """Об'єднує джерела та будує індекси"""
+        self.price_cents = np.concatenate(self._price_cents) if self._price_cents else np.zeros(0, dtype=np.int64)
+        self.parsed_at = np.concatenate(self._parsed_at) if self._parsed_at else np.zeros(0, dtype=np.int64)
+        self.available = np.concatenate(self._available) if self._available else np.zeros(0, dtype=bool)
+        self.source_ids = np.concatenate(self._source_ids) if self._source_ids else np.zeros(0, dtype=np.int32)
+        self.source_rows = np.concatenate(self._source_rows) if self._source_rows else np.zeros(0, dtype=np.int32)
+        self._price_cents = self._parsed_at = self._available = self._source_ids = self._source_rows = []
+
+        self._drop_older_versions()
+        count = len(self.price_cents)
+
+        currency_codes, self.currency_ids = np.unique(np.array(self._currencies, dtype=object), return_inverse=True)
+        self.currency_codes = {code: position for position, code in enumerate(currency_codes.tolist())}
+
+        # Категорій небагато: токени ведуть на номери категорій, а не на рядки
+        category_names, self.category_ids = np.unique(np.array(self._categories, dtype=object), return_inverse=True)
+        self.category_tokens: Dict[str, Set[int]] = {}
+        for position, name in enumerate(category_names.tolist()):
+            for token in tokenize(name):
+                self.category_tokens.setdefault(token, set()).add(position)
+        # Рядки кожної категорії - суцільний відрізок (за зростанням рядків)
+        self.category_order = np.argsort(self.category_ids, kind='stable').astype(np.int32)
+        self.category_bounds = np.searchsorted(
+            self.category_ids[self.category_order], np.arange(len(category_names) + 1)
+        )
+
+        # Рядки додаються за зростанням, тож списки вже відсортовані
+        postings: Dict[str, List[int]] = {}
+        for row, name in enumerate(self._names):
+            for token in set(tokenize(name)):
+                postings.setdefault(token, []).append(row)
+        self.name_postings: Dict[str, np.ndarray] = {
+            token: np.array(rows, dtype=np.int32) for token, rows in postings.items()
+        }
+
+        self.price_order = np.argsort(self.price_cents, kind='stable').astype(np.int32)
+        self.sorted_prices = self.price_cents[self.price_order]
+        self._currencies = self._categories = self._urls = []
+        self._count = count
+        self._built = True
+        return self
+
+    def _drop_older_versions(self):
+        """Лишає найновішу версію оголошення, що є в кількох запусках"""
+        newest: Dict[str, int] = {}
+        parsed_at = self.parsed_at
+        for row, url in enumerate(self._urls):
+            best = newest.get(url)
+            if best is None or parsed_at[row] >= parsed_at[best]:
+                newest[url] = row
+        if len(newest) == len(self._urls):
+            return
+
+        keep = np.array(sorted(newest.values()), dtype=np.int64)
+        self.price_cents = self.price_cents[keep]
+        self.parsed_at = self.parsed_at[keep]
+        self.available = self.available[keep]
+        self.source_ids = self.source_ids[keep]
+        self.source_rows = self.source_rows[keep]
+        rows = keep.tolist()
+        self._names = [self._names[row] for row in rows]
+        self._categories = [self._categories[row] for row in rows]
+        self._currencies = [self._currencies[row] for row in rows]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def name(self, row: int) -> str:
+        return self._names[row]
+
+    def product(self, row: int) -> Product:
+        return self._loaders[int(self.source_ids[row])](int(self.source_rows[row]))
+
+    def products(self, rows: Iterable[int]) -> List[Product]:
+        return [self.product(row) for row in rows]
+
+    def _keyword_rows(self, query: Query) -> Optional[np.ndarray]:
+        """Рядки, що відповідають словам назви та категорії (None - без умов)"""
+        lists: List[np.ndarray] = []
+        for token in set(tokenize(query.text)):
+            lists.append(self.name_postings.get(token, np.zeros(0, dtype=np.int32)))
+
+        category_tokens = tokenize(query.category)
+        if category_tokens:
+            matching = set.intersection(*(self.category_tokens.get(token, set()) for token in category_tokens))
+            parts = [self.category_order[self.category_bounds[position]:self.category_bounds[position + 1]]
+                     for position in sorted(matching)]
+            if len(parts) == 1:
+                lists.append(parts[0])
+            else:
+                lists.append(np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int32))
+
+        if not lists:
+            return None
+        # Починаємо з найкоротшого списку - кожен перетин лише зменшує його
+        lists.sort(key=len)
+        rows = lists[0]
+        if len(lists) > 1 and len(rows):
+            # Позначки найкоротшого списку: перетин без сортування, порядок рядків зберігається
+            marked = np.zeros(self._count, dtype=bool)
+            marked[rows] = True
+            for other in lists[1:]:
+                keep = np.zeros(self._count, dtype=bool)
+                keep[other] = True
+                marked &= keep
+            rows = np.flatnonzero(marked).astype(np.int32)
+        return rows
+
+    def search(self, query: Query) -> QueryResult:
+        """Виконує запит і повертає перші query.limit рядків у заданому порядку"""
+        if not self._built:
+            raise RuntimeError("Індекс ще не побудовано")
+        start = time.perf_counter()
+
+        min_cents = round(query.min_price * 100) if query.min_price is not None else None
+        max_cents = round(query.max_price * 100) if query.max_price is not None else None
+
+        rows = self._keyword_rows(query)
+        price_ordered = rows is None
+        if rows is None:
+            # Без слів кандидати - відрізок відсортованих цін
+            low = np.searchsorted(self.sorted_prices, min_cents, 'left') if min_cents is not None else 0
+            high = np.searchsorted(self.sorted_prices, max_cents, 'right') if max_cents is not None else self._count
+            rows = self.price_order[low:high]
+        elif min_cents is not None or max_cents is not None:
+            prices = self.price_cents[rows]
+            mask = np.ones(len(rows), dtype=bool)
+            if min_cents is not None:
+                mask &= prices >= min_cents
+            if max_cents is not None:
+                mask &= prices <= max_cents
+            rows = rows[mask]
+
+        if query.currency:
+            code = self.currency_codes.get(query.currency.upper())
+            rows = rows[self.currency_ids[rows] == code] if code is not None else rows[:0]
+        if query.available_only:
+            rows = rows[self.available[rows]]
+
+        total = len(rows)
+        rows = self._top(rows, query, price_ordered)
+        return QueryResult(rows=rows, total=total, elapsed_ms=(time.perf_counter() - start) * 1000)
+
+    def _top(self, rows: np.ndarray, query: Query, price_ordered: bool) -> np.ndarray:
+        limit = max(query.limit, 0)
+        if price_ordered and query.sort in ("price", "-price"):
+            # Рядки вже впорядковані за ціною
+            return rows[:limit] if query.sort == "price" else rows[::-1][:limit]
+
+        if query.sort == "price":
+            keys = self.price_cents[rows]
+        elif query.sort == "-price":
+            keys = -self.price_cents[rows]
+        elif query.sort == "newest":
+            keys = -self.parsed_at[rows]
+        else:
+            keys = self.parsed_at[rows]
+
+        if len(rows) > limit:
+            part = np.argpartition(keys, limit - 1)[:limit] if limit else np.zeros(0, dtype=np.int64)
+            rows, keys = rows[part], keys[part]
+        return rows[np.argsort(keys, kind='stable')]
+
+def default_query_inputs(output_directory: str) -> List[str]:
+    """Збережені запуски в output_directory: знімки та JSON з повними даними"""
+    if not os.path.isdir(output_directory):
+        return []
+    return sorted(
+        os.path.join(output_directory, name) for name in os.listdir(output_directory)
+        if name.endswith(".olxsnap") or name.endswith("_full.json")
+    )
@@ -0,0 +1,224 @@
+"""
+Адаптивний планувальник повторних обходів категорій
+
+Для кожної категорії оцінюється швидкість появи нових оголошень (EWMA за
+попередніми обходами). Частіше і глибше обходяться категорії, де очікується
+більше нових оголошень, в межах фіксованого бюджету запитів на годину.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Any, Set, Tuple
+
+from models import Category, Product
+
+@dataclass
+class CategoryRevisitState:
+    """Історія обходів однієї категорії"""
+    name: str
+    url: str
+    new_ads_per_hour: Optional[float] = None   # EWMA швидкості появи нових оголошень
+    last_visit: float = 0.0                    # time.time() останнього обходу
+    visits: int = 0
+    seen_skus: Deque[str] = field(default_factory=deque)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.url,
+            "new_ads_per_hour": self.new_ads_per_hour,
+            "last_visit": self.last_visit,
+            "visits": self.visits,
+            "seen_skus": list(self.seen_skus)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CategoryRevisitState":
+        return cls(
+            name=data["name"],
+            url=data["url"],
+            new_ads_per_hour=data.get("new_ads_per_hour"),
+            last_visit=data.get("last_visit", 0.0),
+            visits=data.get("visits", 0),
+            seen_skus=deque(data.get("seen_skus", []))
+        )
+
+class RevisitScheduler:
+    """Розподіляє бюджет запитів між категоріями за очікуваною кількістю змін"""
+
+    def __init__(self, parser, categories: List[Category], state_path: Optional[str] = None,
+                 requests_per_hour: int = 600, listings_per_page: int = 50, max_pages: int = 25,
+                 min_interval: float = 300.0, max_interval: float = 86400.0,
+                 target_new_ads: float = 20.0, initial_rate: float = 10.0,
+                 smoothing: float = 0.3, seen_limit: int = 5000,
+                 on_new_products: Optional[Callable[[Category, List[Product]], Awaitable[None]]] = None):
+        self.parser = parser
+        self.state_path = state_path
+        self.requests_per_hour = requests_per_hour
+        self.listings_per_page = listings_per_page
+        self.max_pages = max_pages
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new_ads = target_new_ads
+        self.initial_rate = initial_rate
+        self.smoothing = smoothing
+        self.seen_limit = seen_limit
+        self.on_new_products = on_new_products
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.states: Dict[str, CategoryRevisitState] = {}
+        self.load_state({category.url for category in categories})
+        for category in categories:
+            if category.url not in self.states:
+                self.states[category.url] = CategoryRevisitState(name=category.name, url=category.url)
+
+        self._tokens = 0.0
+
+    def rate(self, state: CategoryRevisitState) -> float:
+        """Оцінка нових оголошень на годину"""
+        return state.new_ads_per_hour if state.new_ads_per_hour is not None else self.initial_rate
+
+    def revisit_interval(self, state: CategoryRevisitState) -> float:
+        """Інтервал, за який накопичується target_new_ads нових оголошень"""
+        rate = self.rate(state)
+        if rate <= 0:
+            return self.max_interval
+        interval = self.target_new_ads / rate * 3600
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def expected_new_ads(self, state: CategoryRevisitState, now: float) -> float:
+        """Очікувана кількість нових оголошень з моменту останнього обходу"""
+        if state.visits == 0:
+            return math.inf
+        return self.rate(state) * (now - state.last_visit) / 3600
+
+    def page_depth(self, state: CategoryRevisitState, now: float) -> int:
+        """Скільки сторінок обійти, щоб охопити очікувані нові оголошення"""
+        if state.visits == 0:
+            return 1
+        expected = self.expected_new_ads(state, now)
+        return min(max(math.ceil(expected / self.listings_per_page), 1), self.max_pages)
+
+    def plan(self, now: float, budget: int) -> List[Tuple[CategoryRevisitState, int]]:
+        """Обирає категорії для обходу в межах бюджету запитів"""
+        due = [
+            state for state in self.states.values()
+            if state.visits == 0 or now - state.last_visit >= self.revisit_interval(state)
+        ]
+        due.sort(key=lambda state: self.expected_new_ads(state, now), reverse=True)
+
+        planned = []
+        for state in due:
+            depth = self.page_depth(state, now)
+            # Сторінка категорії + сторінки видачі
+            cost = depth + 1
+            if cost > budget:
+                depth = budget - 1
+                cost = budget
+            if depth < 1:
+                break
+            planned.append((state, depth))
+            budget -= cost
+        return planned
+
+    def record_visit(self, state: CategoryRevisitState, products: List[Product], depth: int, now: float) -> List[Product]:
+        """Оновлює оцінку швидкості за результатом обходу, повертає нові оголошення"""
+        seen = set(state.seen_skus)
+        new_products = [product for product in products if (product.sku or product.product_url) not in seen]
+
+        if state.visits > 0 and now > state.last_visit:
+            hours = (now - state.last_visit) / 3600
+            observed = len(new_products) / hours
+            # Всі оголошення на всіх сторінках нові - реальна швидкість вища за виміряну
+            if new_products and len(new_products) == len(products) and depth < self.max_pages:
+                observed *= 2
+            if state.new_ads_per_hour is None:
+                state.new_ads_per_hour = observed
+            else:
+                state.new_ads_per_hour = self.smoothing * observed + (1 - self.smoothing) * state.new_ads_per_hour
+
+        for product in new_products:
+            state.seen_skus.append(product.sku or product.product_url)
+        while len(state.seen_skus) > self.seen_limit:
+            state.seen_skus.popleft()
+
+        state.last_visit = now
+        state.visits += 1
+        return new_products
+
+    async def visit(self, state: CategoryRevisitState, depth: int) -> List[Product]:
+        """Обходить категорію на задану глибину"""
+        category = Category(name=state.name, url=state.url)
+        products = await self.parser.get_products_from_category(category, max_pages=depth)
+        new_products = self.record_visit(state, products, depth, time.time())
+
+        self.logger.info(
+            "Категорія %s: %s сторінок, %s нових оголошень, оцінка %.1f/год, наступний обхід через %.0f сек",
+            state.name, depth, len(new_products), self.rate(state), self.revisit_interval(state)
+        )
+        if new_products and self.on_new_products:
+            await self.on_new_products(category, new_products)
+        return new_products
+
+    async def run_forever(self, tick_seconds: float = 60.0, stop_event: Optional[asyncio.Event] = None):
+        """Цикл демона: кожен такт поповнює бюджет і витрачає його на найперспективніші категорії"""
+        stop_event = stop_event or asyncio.Event()
+        max_tokens = self.requests_per_hour * max(tick_seconds, 1.0) / 3600 * 2 + self.max_pages + 1
+
+        while not stop_event.is_set():
+            self._tokens = min(self._tokens + self.requests_per_hour * tick_seconds / 3600, max_tokens)
+            planned = self.plan(time.time(), int(self._tokens))
+
+            for state, depth in planned:
+                if stop_event.is_set():
+                    break
+                self._tokens -= depth + 1
+                try:
+                    await self.visit(state, depth)
+                except Exception as e:
+                    self.logger.error("Помилка при обході категорії %s: %s", state.name, e)
+
+            if planned:
+                self.save_state()
+
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+        self.save_state()
+
+    def load_state(self, urls: Optional[Set[str]] = None):
+        """Завантажує історію обходів з диска
+        
+        Якщо задано urls, завантажуються лише ці категорії: категорії, яких
+        більше немає серед запитаних, не плануються і при збереженні відкидаються.
+        """
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in data.get("categories", []):
+                state = CategoryRevisitState.from_dict(item)
+                if urls is None or state.url in urls:
+                    self.states[state.url] = state
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Не вдалося прочитати стан планувальника: %s", e)
+
+    def save_state(self):
+        """Зберігає історію обходів на диск"""
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"categories": [state.to_dict() for state in self.states.values()]}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,104 @@
+"""
+Об'єднання одночасних запитів однієї сторінки (single-flight)
+
+Одночасні виклики для того самого нормалізованого URL чекають на один
+запит і отримують той самий розібраний результат. Успішний результат ще
+кілька секунд зберігається в пам'яті, тож майже одночасні повтори (головна
+сторінка, спільні сторінки "Показати всі") теж не йдуть у мережу.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url: str) -> str:
+    """Ключ URL: схема та хост у нижньому регістрі, без фрагмента, стандартного порту та з відсортованим запитом"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+class SingleFlight:
+    """Спільні запити в процесі та короткочасний кеш результатів"""
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.metrics: Dict[str, int] = {"calls": 0, "fetches": 0, "coalesced": 0, "cache_hits": 0}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[key]
+            return False, None
+        return True, value
+
+    def _store(self, key: str, value: Any):
+        if self.ttl <= 0 or value is None:
+            # Невдалі запити не кешуються - наступний виклик спробує знову
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def run(self, url: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Результат fetch() для URL, спільний для одночасних викликів
+
+        Перший виклик виконує запит сам, решта чекає на його результат. Якщо
+        перший виклик скасовано, один з тих, що чекають (і не скасовані самі),
+        повторює запит.
+        """
+        self.metrics["calls"] += 1
+        key = normalize_url(url)
+        while True:
+            hit, value = self._cached(key)
+            if hit:
+                self.metrics["cache_hits"] += 1
+                return value
+
+            shared = self._in_flight.get(key)
+            if shared is None:
+                break
+            self.metrics["coalesced"] += 1
+            # wait не скасовує спільний запит і не кидає виняток, коли скасовано
+            # власника, тож CancelledError тут означає скасування самого виклику
+            await asyncio.wait({shared})
+            if not shared.cancelled():
+                return shared.result()
+
+        self.metrics["fetches"] += 1
+        shared = asyncio.get_event_loop().create_future()
+        self._in_flight[key] = shared
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            shared.cancel()
+            raise
+        except Exception as e:
+            shared.set_exception(e)
+            # Виняток отримує і сам виклик - без попередження про необроблений виняток
+            shared.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+        self._store(key, value)
+        shared.set_result(value)
+        return value
+
+    def summary(self) -> Dict[str, Any]:
+        """Метрики з часткою викликів без власного запиту"""
+        saved = self.metrics["coalesced"] + self.metrics["cache_hits"]
+        calls = self.metrics["calls"]
+        return dict(self.metrics, saved_rate=round(saved / calls, 4) if calls else 0.0)
@@ -0,0 +1,271 @@
+"""
+Колонковий знімок результату парсингу з читанням через mmap
+
+Формат файлу:
+    MAGIC (8 байт) | довжина заголовка (uint64 LE) | заголовок JSON | колонки
+
+Числові колонки (ціна в копійках, прапорці, рейтинг, час) - масиви NumPy,
+рядкові - масив зсувів uint64 (n + 1) та суцільний блок UTF-8. Всі колонки
+вирівняні на 64 байти, тож читач відображає їх з mmap без розбору і
+створює Product лише для потрібних рядків.
+"""
+import json
+import mmap
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from models import Product, Category, ParsingResult
+
+MAGIC = b"OLXSNAP1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+FLAG_AVAILABLE = 1
+FLAG_HAS_RATING = 2
+
+STRING_COLUMNS = (
+    "name", "product_url", "sku", "id", "currency", "category", "subcategory",
+    "brand", "description", "image_url", "duplicate_cluster", "attributes"
+)
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _encode_strings(values: Iterable[str]):
+    """Зсуви та суцільний блок UTF-8 для рядкової колонки"""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return offsets, b''.join(encoded)
+
+def write_snapshot(result: ParsingResult, path: str) -> str:
+    """Записує результат парсингу в колонковий знімок"""
+    products = result.products
+    count = len(products)
+
+    arrays: Dict[str, np.ndarray] = {
+        "price_cents": np.fromiter(
+            (int((product.price * 100).to_integral_value()) for product in products), dtype='<i8', count=count
+        ),
+        "flags": np.fromiter(
+            ((FLAG_AVAILABLE if product.availability else 0) | (FLAG_HAS_RATING if product.rating is not None else 0)
+             for product in products), dtype='u1', count=count
+        ),
+        "rating": np.fromiter(
+            (product.rating if product.rating is not None else np.nan for product in products), dtype='<f4', count=count
+        ),
+        "review_count": np.fromiter((product.review_count for product in products), dtype='<i4', count=count),
+        "parsed_at": np.fromiter(
+            (int(product.parsed_at.timestamp() * 1_000_000) for product in products), dtype='<i8', count=count
+        ),
+    }
+    blobs: Dict[str, bytes] = {}
+    for column in STRING_COLUMNS:
+        if column == "attributes":
+            values = (json.dumps(product.attributes, ensure_ascii=False) if product.attributes else ""
+                      for product in products)
+        else:
+            values = (getattr(product, column) for product in products)
+        arrays[f"{column}.offsets"], blobs[f"{column}.data"] = _encode_strings(values)
+
+    # Розкладка колонок відносно початку секції даних
+    layout: Dict[str, Dict[str, Any]] = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "offset": position, "length": len(array)}
+        position = _align(position + array.nbytes)
+    for name, blob in blobs.items():
+        layout[name] = {"dtype": "bytes", "offset": position, "length": len(blob)}
+        position = _align(position + len(blob))
+
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "count": count,
+        "columns": layout,
+        "result": {
+            "success": result.success,
+            "categories": [category.to_dict() for category in result.categories],
+            "errors": result.errors,
+            "total_products": result.total_products,
+            "total_categories": result.total_categories,
+            "parsing_time": result.parsing_time,
+            "metrics": result.metrics,
+            "price_stats": result.price_stats
+        }
+    }, ensure_ascii=False).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for name, item in list(arrays.items()) + list(blobs.items()):
+            f.seek(data_start + layout[name]["offset"])
+            f.write(item.tobytes() if isinstance(item, np.ndarray) else item)
+        f.truncate(data_start + position)
+    os.replace(tmp_path, path)
+    return path
+
+def is_snapshot(path: str) -> bool:
+    """Чи є файл колонковим знімком"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+class SnapshotReader:
+    """Читач знімка: колонки - масиви NumPy поверх mmap, Product - за запитом"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Порожній файл не відображається
+            self._file.close()
+            raise ValueError(f"Файл {path} не є знімком")
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Файл {path} не є знімком")
+
+        header_length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], 'little')
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_length].decode('utf-8'))
+        if self.header.get("version") != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Непідтримувана версія знімка: {self.header.get('version')}")
+
+        self._data_start = _align(header_start + header_length)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    def close(self):
+        """Закриває файл (масиви, отримані ззовні, тримають mmap до звільнення)"""
+        self._columns.clear()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def column(self, name: str) -> np.ndarray:
+        """Числова колонка без копіювання"""
+        array = self._columns.get(name)
+        if array is None:
+            spec = self.header["columns"][name]
+            array = np.frombuffer(
+                self._mmap, dtype=np.dtype(spec["dtype"]), count=spec["length"],
+                offset=self._data_start + spec["offset"]
+            )
+            self._columns[name] = array
+        return array
+
+    @property
+    def price_cents(self) -> np.ndarray:
+        return self.column("price_cents")
+
+    @property
+    def prices(self) -> np.ndarray:
+        """Ціни у float64 (копія)"""
+        return self.price_cents / 100
+
+    @property
+    def available(self) -> np.ndarray:
+        return (self.column("flags") & FLAG_AVAILABLE).astype(bool)
+
+    def filter_price(self, min_price: Optional[float] = None, max_price: Optional[float] = None) -> np.ndarray:
+        """Індекси товарів з ціною в діапазоні [min_price, max_price]"""
+        cents = self.price_cents
+        mask = np.ones(len(cents), dtype=bool)
+        if min_price is not None:
+            mask &= cents >= round(min_price * 100)
+        if max_price is not None:
+            mask &= cents <= round(max_price * 100)
+        return np.flatnonzero(mask)
+
+    def string(self, column: str, index: int) -> str:
+        """Значення рядкової колонки для одного товару"""
+        offsets = self.column(f"{column}.offsets")
+        start = self._data_start + self.header["columns"][f"{column}.data"]["offset"]
+        return self._mmap[start + int(offsets[index]):start + int(offsets[index + 1])].decode('utf-8')
+
+    def strings(self, column: str, indices: Optional[Iterable[int]] = None) -> List[str]:
+        """Значення рядкової колонки для вибраних товарів"""
+        if indices is None:
+            # Вся колонка: один зріз блоку замість звернення до mmap на кожен рядок
+            offsets = self.column(f"{column}.offsets").tolist()
+            start = self._data_start + self.header["columns"][f"{column}.data"]["offset"]
+            data = self._mmap[start:start + offsets[-1]]
+            return [data[offsets[index]:offsets[index + 1]].decode('utf-8') for index in range(len(self))]
+        return [self.string(column, index) for index in indices]
+
+    def product(self, index: int) -> Product:
+        """Відновлює Product для одного рядка"""
+        flags = int(self.column("flags")[index])
+        attributes = self.string("attributes", index)
+        return Product(
+            name=self.string("name", index),
+            price=Decimal(int(self.price_cents[index])).scaleb(-2),
+            product_url=self.string("product_url", index),
+            availability=bool(flags & FLAG_AVAILABLE),
+            sku=self.string("sku", index),
+            id=self.string("id", index),
+            currency=self.string("currency", index),
+            category=self.string("category", index),
+            subcategory=self.string("subcategory", index),
+            brand=self.string("brand", index),
+            description=self.string("description", index),
+            image_url=self.string("image_url", index),
+            rating=float(self.column("rating")[index]) if flags & FLAG_HAS_RATING else None,
+            review_count=int(self.column("review_count")[index]),
+            attributes=json.loads(attributes) if attributes else {},
+            duplicate_cluster=self.string("duplicate_cluster", index),
+            parsed_at=datetime.fromtimestamp(int(self.column("parsed_at")[index]) / 1_000_000)
+        )
+
+    def products(self, indices: Optional[Iterable[int]] = None) -> List[Product]:
+        """Відновлює Product для вибраних рядків (всіх, якщо не задано)"""
+        if indices is None:
+            indices = range(len(self))
+        return [self.product(int(index)) for index in indices]
+
+    def to_result(self, indices: Optional[Iterable[int]] = None) -> ParsingResult:
+        """Повний ParsingResult (або лише з вибраними товарами)"""
+        data = self.header["result"]
+        products = self.products(indices)
+        return ParsingResult(
+            success=data.get("success", True),
+            products=products,
+            categories=[Category.from_dict(item) for item in data.get("categories", [])],
+            errors=list(data.get("errors", [])),
+            total_products=data.get("total_products", len(products)) if indices is None else len(products),
+            total_categories=data.get("total_categories", 0),
+            parsing_time=data.get("parsing_time", 0.0),
+            metrics=dict(data.get("metrics") or {}),
+            price_stats=dict(data.get("price_stats") or {})
+        )
+
+def load_result(path: str) -> ParsingResult:
+    """Завантажує ParsingResult зі знімка або JSON файлу"""
+    if is_snapshot(path):
+        with SnapshotReader(path) as reader:
+            return reader.to_result()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return ParsingResult.from_dict(json.load(f))
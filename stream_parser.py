@@ -0,0 +1,120 @@
+"""
+Потоковий розбір сторінки видачі частинами під час завантаження
+
+Частини тіла відповіді подаються в інкрементальний парсер lxml
+(HTMLPullParser). Картка віддається, щойно закрився її елемент, тож
+витягування перекривається із завантаженням, а дерево вже оброблених карток
+звільняється. Коли сітку карток і пагінацію прочитано, решту сторінки
+(футер, скрипти) можна не завантажувати.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, Tag
+from lxml import etree
+
+# Атрибути, за якими впізнаються картки (див. OLX_LAYOUT_STRATEGIES)
+CARD_ATTRIBUTES = (('data-cy', 'l-card'), ('data-testid', 'l-card'))
+
+# Елементи без корисного вмісту, які звільняються одразу після закриття
+_DISPOSABLE_TAGS = {'script', 'style', 'noscript', 'svg', 'form'}
+
+def _is_card(element) -> bool:
+    return element.tag == 'div' and any(element.get(name) == value for name, value in CARD_ATTRIBUTES)
+
+def _release(element):
+    """Звільняє піддерево елемента та вже оброблених попередніх сусідів"""
+    element.clear(keep_tail=False)
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+@dataclass
+class StreamedListing:
+    """Результат потокового розбору сторінки видачі"""
+    cards: int = 0
+    next_page_url: Optional[str] = None  # href кнопки "вперед" (None - остання сторінка)
+    grid_closed: bool = False
+    pagination_seen: bool = False
+    bytes_read: int = 0
+    complete: bool = False               # Сторінку прочитано до кінця
+    encoding: str = 'utf-8'
+    raw: List[bytes] = field(default_factory=list)  # Прочитані частини (лише з keep_raw)
+
+    @property
+    def html(self) -> str:
+        return b''.join(self.raw).decode(self.encoding, errors='replace')
+
+class StreamingListingParser:
+    """Інкрементальний розбір видачі: feed() повертає картки, що вже закрились
+
+    Картки повертаються як елементи BeautifulSoup, тож до них застосовується
+    звичайне витягування. done стає True після сітки і пагінації - далі
+    читати відповідь не потрібно.
+    """
+
+    def __init__(self, encoding: str = 'utf-8', keep_raw: bool = False):
+        self.parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        self.keep_raw = keep_raw
+        self.result = StreamedListing(encoding=encoding)
+        self._card_depth = 0
+        self._grid_seen = False
+
+    @property
+    def done(self) -> bool:
+        listing_read = self.result.grid_closed or (self.result.cards and not self._grid_seen)
+        return bool(self.result.pagination_seen and listing_read)
+
+    def feed(self, chunk: bytes) -> List[Tag]:
+        """Подає наступну частину тіла, повертає нові закриті картки"""
+        self.result.bytes_read += len(chunk)
+        if self.keep_raw:
+            self.result.raw.append(chunk)
+        self.parser.feed(chunk)
+        return self._read_events()
+
+    def close(self) -> List[Tag]:
+        """Кінець відповіді: дочитує події, що залишились у парсері"""
+        self.result.complete = True
+        try:
+            self.parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        return self._read_events()
+
+    def _read_events(self) -> List[Tag]:
+        cards = []
+        for event, element in self.parser.read_events():
+            if not isinstance(element.tag, str):
+                # Коментарі та інструкції обробки
+                continue
+            if event == 'start':
+                if _is_card(element):
+                    self._card_depth += 1
+                elif element.get('data-testid') == 'listing-grid':
+                    self._grid_seen = True
+                elif element.get('data-testid') == 'pagination-forward' and self._card_depth == 0:
+                    self.result.next_page_url = element.get('href')
+                continue
+
+            testid = element.get('data-testid')
+            if _is_card(element):
+                self._card_depth -= 1
+                if self._card_depth == 0:
+                    cards.append(self._to_tag(element))
+                    self.result.cards += 1
+                    _release(element)
+            elif testid == 'listing-grid':
+                self.result.grid_closed = True
+            elif testid == 'pagination-wrapper' and self._card_depth == 0:
+                self.result.pagination_seen = True
+            elif element.tag in _DISPOSABLE_TAGS and self._card_depth == 0:
+                _release(element)
+        return cards
+
+    @staticmethod
+    def _to_tag(element) -> Tag:
+        """Картка lxml як елемент BeautifulSoup"""
+        html = etree.tostring(element, method='html', encoding='unicode', with_tail=False)
+        return BeautifulSoup(html, 'html.parser').find()
@@ -0,0 +1,30 @@
+"""
+Локальний HTTP сервер aiohttp для тестів з мережевими запитами
+"""
+import socket
+from typing import Awaitable, Callable, Tuple, Union
+
+from aiohttp import web
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+def free_port() -> int:
+    """Вільний локальний порт (на ньому нічого не слухає)"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+async def start_server(app: Union[web.Application, Handler]) -> Tuple[web.AppRunner, str]:
+    """Запускає сервер на 127.0.0.1, повертає runner (для cleanup) та базовий URL
+
+    Замість застосунку можна передати обробник - він отримає всі GET запити.
+    """
+    if not isinstance(app, web.Application):
+        handler = app
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner, f"http://127.0.0.1:{port}"
@@ -0,0 +1,143 @@
+"""
+Тестовий файл для перевірки обходу дерева категорій
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from category_tree import CategoryTreeDiscoverer, get_leaf_categories
+from models import Category
+
+SITE = "https://www.olx.ua/uk"
+
+# Дерево сайту: URL -> підкатегорії (третій рівень посилається на вже відому категорію)
+TREE = {
+    f"{SITE}/elektronika/": ["telefony", "noutbuki"],
+    f"{SITE}/dom-i-sad/": ["mebli"],
+    f"{SITE}/elektronika/telefony/": ["mobilnye", "aksessuary"],
+    f"{SITE}/elektronika/noutbuki/": [],
+    f"{SITE}/dom-i-sad/mebli/": ["divany"],
+    f"{SITE}/elektronika/telefony/mobilnye/": ["../aksessuary"],
+    f"{SITE}/elektronika/telefony/aksessuary/": [],
+    f"{SITE}/dom-i-sad/mebli/divany/": ["kutovi"],
+}
+
+class StubParser:
+    """Парсер-заглушка: категорії зі словника TREE, рахує запити"""
+
+    def __init__(self, roots_available: bool = True, broken_url: str = "", missing_url: str = ""):
+        self.roots_available = roots_available
+        self.broken_url = broken_url
+        self.missing_url = missing_url
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def get_categories(self):
+        self.requests.append(SITE)
+        if not self.roots_available:
+            # Так поводиться OlxPriceParser при помилці мережі
+            return []
+        return [Category(name="Електроніка", url=f"{SITE}/elektronika/"),
+                Category(name="Дім і сад", url=f"{SITE}/dom-i-sad/")]
+
+    async def get_subcategories(self, category):
+        self.requests.append(category.url)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if category.url == self.broken_url:
+                raise ConnectionError("з'єднання розірвано")
+            if category.url == self.missing_url:
+                # Так поводиться OlxPriceParser, коли сторінку категорії не отримано
+                return None
+            children = []
+            for slug in TREE.get(category.url, []):
+                url = os.path.normpath(f"{category.url}{slug}").replace("https:/", "https://") + "/"
+                children.append(Category(name=slug, url=url))
+            return children
+        finally:
+            self.active -= 1
+
+def discover(parser, cache_path, **kwargs):
+    discoverer = CategoryTreeDiscoverer(parser, cache_path=cache_path, max_concurrency=2, **kwargs)
+    return asyncio.run(discoverer.discover())
+
+def test_bfs_builds_tree_with_depth_limit(tmp_path):
+    """Тестує обхід в ширину: зв'язки, повтори, ліміт паралельності та глибини"""
+    parser = StubParser()
+    categories = discover(parser, str(tmp_path / "category_tree.json"), max_depth=3)
+    by_url = {category.url: category for category in categories}
+
+    assert len(categories) == 9
+    assert by_url[f"{SITE}/elektronika/telefony/"].parent_category == f"{SITE}/elektronika/"
+    assert by_url[f"{SITE}/elektronika/telefony/"].subcategories == [
+        f"{SITE}/elektronika/telefony/mobilnye/", f"{SITE}/elektronika/telefony/aksessuary/"
+    ]
+    # Повторне посилання на відому категорію не змінює її батька
+    assert by_url[f"{SITE}/elektronika/telefony/aksessuary/"].parent_category == f"{SITE}/elektronika/telefony/"
+    # Глибина 3: категорії четвертого рівня вже не запитуються
+    assert f"{SITE}/dom-i-sad/mebli/divany/" in parser.requests
+    assert f"{SITE}/dom-i-sad/mebli/divany/kutovi/" not in parser.requests
+    assert sorted(category.name for category in get_leaf_categories(categories)) == [
+        "aksessuary", "kutovi", "mobilnye", "noutbuki"
+    ]
+    assert parser.max_active == 2
+
+def test_cache_reused_until_ttl(tmp_path):
+    """Тестує, що дерево береться з кешу, поки він не застарів"""
+    cache_path = str(tmp_path / "category_tree.json")
+    discover(StubParser(), cache_path)
+
+    parser = StubParser()
+    assert len(discover(parser, cache_path)) == 9
+    assert parser.requests == []
+
+    # Застарілий кеш обходиться заново
+    with open(cache_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data["created_at"] = time.time() - 7200
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    parser = StubParser()
+    assert len(discover(parser, cache_path, ttl=3600)) == 9
+    assert parser.requests
+
+def test_failed_discovery_not_cached(tmp_path):
+    """Тестує, що порожнє або неповне дерево не потрапляє в кеш"""
+    cache_path = str(tmp_path / "category_tree.json")
+
+    assert discover(StubParser(roots_available=False), cache_path) == []
+    assert not os.path.exists(cache_path)
+
+    partial = discover(StubParser(broken_url=f"{SITE}/dom-i-sad/"), cache_path)
+    assert len(partial) == 6
+    assert not os.path.exists(cache_path)
+
+    # Сторінку підкатегорії не отримано - вона не вважається листовою
+    discoverer = CategoryTreeDiscoverer(StubParser(missing_url=f"{SITE}/elektronika/telefony/"),
+                                        cache_path=cache_path, max_concurrency=2)
+    partial = asyncio.run(discoverer.discover())
+    assert len(partial) == 7 and discoverer.failed_expansions == 1
+    assert not os.path.exists(cache_path)
+
+    # Порожній кеш з попередніх версій вважається промахом
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({"created_at": time.time(), "categories": []}, f)
+    parser = StubParser()
+    assert len(discover(parser, cache_path)) == 9
+    assert parser.requests
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    for test in (test_bfs_builds_tree_with_depth_limit, test_cache_reused_until_ttl, test_failed_discovery_not_cached):
+        with tempfile.TemporaryDirectory() as directory:
+            test(pathlib.Path(directory))
+    print("✅ Всі тести дерева категорій пройдено")
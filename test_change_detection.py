@@ -0,0 +1,145 @@
+"""
+Тестовий файл для перевірки дельти між запусками
+"""
+import json
+import os
+import sys
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from openpyxl import load_workbook
+
+from change_detection import ChangeSet, HashedRun, detect_changes
+from config import ParserConfig
+from main import PriceParserManager, export_parsing_result
+from models import Category, ParsingResult, Product
+from snapshot import write_snapshot
+
+def product(sku: str, name: str, price: str) -> Product:
+    return Product(name=name, price=Decimal(price), product_url=f"https://www.olx.ua/d/uk/obyavlenie/{sku}.html",
+                   sku=sku, category="Меблі")
+
+def previous_run():
+    return [
+        product("a1", "Диван кутовий", "9000"),
+        product("a2", "Крісло", "1200"),
+        product("a3", "Стіл дубовий", "4500"),
+        product("a4", "Шафа", "3000"),
+    ]
+
+def current_run():
+    return [
+        product("a1", "Диван кутовий", "8500"),           # Ціна знизилась
+        product("a2", "Крісло офісне", "1200"),           # Нова назва
+        product("a4", "Шафа", "3000"),                    # Без змін
+        product("a5", "Комод", "2100.50"),                # Нове оголошення
+        product("a5", "Комод", "2100.50"),                # Повтор на сусідній сторінці
+    ]
+
+def test_detect_changes_against_snapshot(tmp_path):
+    path = write_snapshot(ParsingResult(success=True, products=previous_run()), str(tmp_path / "previous.olxsnap"))
+
+    changes = detect_changes(current_run(), path)
+    assert [(change.change, change.key) for change in changes] == [
+        ("added", "a5"), ("removed", "a3"), ("price", "a1"), ("title", "a2")
+    ]
+    price_change = changes[2]
+    assert (price_change.old_price, price_change.new_price) == (Decimal("9000"), Decimal("8500"))
+    assert changes[3].old_name == "Крісло" and changes[3].name == "Крісло офісне"
+    assert changes[1].old_price == Decimal("4500") and changes[1].new_price is None
+
+    # Без попереднього знімка всі оголошення нові
+    assert [change.change for change in detect_changes(previous_run(), str(tmp_path / "missing.olxsnap"))] == [
+        "added"
+    ] * 4
+
+def test_export_writes_jsonl_and_changes_sheet(tmp_path):
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                          output_directory=str(tmp_path), export_changes=True)
+    manager = PriceParserManager(config)
+    category = Category(name="Меблі", url="")
+
+    first = export_parsing_result(manager, ParsingResult(success=True, products=previous_run()), category)
+    assert os.path.exists(first["snapshot"])
+    second = export_parsing_result(manager, ParsingResult(success=True, products=current_run()), category)
+
+    with open(second["changes"], 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record["change"] for record in records] == ["added", "removed", "price", "title"]
+    # Стара ціна береться зі знімка (в копійках)
+    assert Decimal(records[2]["old_price"]) == Decimal("9000") and records[2]["new_price"] == "8500"
+
+    workbook = load_workbook(second["excel"])
+    sheet = workbook["Changes"]
+    assert [sheet.cell(row=row, column=1).value for row in range(2, sheet.max_row + 1)] == [
+        "Нове", "Зняте", "Ціна", "Назва"
+    ]
+    assert sheet.cell(row=5, column=6).value == "Крісло"
+    workbook.close()
+
+def test_partial_result_keeps_previous_snapshot(tmp_path):
+    """Тестує, що частковий (бюджетний) результат не дає дельти і не перезаписує знімок"""
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                          output_directory=str(tmp_path), export_changes=True)
+    manager = PriceParserManager(config)
+    category = Category(name="Меблі", url="")
+
+    first = export_parsing_result(manager, ParsingResult(success=True, products=previous_run()), category)
+    partial = ParsingResult(success=True, products=previous_run()[:1],
+                            metrics={"coverage": {"complete": False, "stopped_by": "deadline"}})
+    second = export_parsing_result(manager, partial, category)
+
+    assert "changes" not in second
+    assert second["snapshot"] != first["snapshot"] and second["snapshot"].endswith("_partial.olxsnap")
+    # Наступний повний обхід порівнюється з попереднім повним знімком
+    third = export_parsing_result(manager, ParsingResult(success=True, products=current_run()), category)
+    with open(third["changes"], 'r', encoding='utf-8') as f:
+        assert [json.loads(line)["change"] for line in f] == ["added", "removed", "price", "title"]
+
+def test_availability_alone_is_not_a_change():
+    """Тестує, що зміна лише наявності не рахується зміною вмісту"""
+    current = previous_run()
+    current[3].availability = False
+
+    changes = ChangeSet(HashedRun.from_products(previous_run()), HashedRun.from_products(current))
+    assert changes.summary()["unchanged"] == 4 and len(changes) == 0
+
+def test_failed_excel_keeps_previous_snapshot(tmp_path):
+    """Тестує, що при помилці Excel знімок не оновлюється, а помилка містить записані файли"""
+    class FailingExcelManager(PriceParserManager):
+        def save_results_excel(self, result, category_name, changes=None):
+            return None
+
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                          output_directory=str(tmp_path), export_changes=True)
+    manager = PriceParserManager(config)
+    category = Category(name="Меблі", url="")
+
+    export_parsing_result(manager, ParsingResult(success=True, products=previous_run()), category)
+    try:
+        export_parsing_result(FailingExcelManager(config), ParsingResult(success=True, products=current_run()), category)
+    except RuntimeError as e:
+        assert "olx_меблі_full.json" in str(e) and "_changes_" in str(e)
+    else:
+        raise AssertionError("очікувалась помилка експорту в Excel")
+
+    # Повторний запуск порівнюється з тим самим попереднім знімком
+    retry = export_parsing_result(manager, ParsingResult(success=True, products=current_run()), category)
+    with open(retry["changes"], 'r', encoding='utf-8') as f:
+        assert [json.loads(line)["change"] for line in f] == ["added", "removed", "price", "title"]
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as directory:
+        test_detect_changes_against_snapshot(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_export_writes_jsonl_and_changes_sheet(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_partial_result_keeps_previous_snapshot(pathlib.Path(directory))
+    test_availability_alone_is_not_a_change()
+    with tempfile.TemporaryDirectory() as directory:
+        test_failed_excel_keeps_previous_snapshot(pathlib.Path(directory))
+    print("✅ Всі тести дельти між запусками пройдено")
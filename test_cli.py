@@ -0,0 +1,32 @@
+"""
+Тестовий файл для перевірки лінивого завантаження модулів CLI
+"""
+import os
+import subprocess
+import sys
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Модулі окремих можливостей - завантажуються лише тими підкомандами, яким потрібні
+FEATURE_MODULES = (
+    "numpy", "openpyxl", "near_duplicates", "price_stats", "page_archive", "page_memo",
+    "crawl_budget", "image_downloader", "pipeline", "stream_parser", "snapshot", "query_index"
+)
+
+def loaded_modules(statement: str):
+    code = f"import sys; {statement}; print(' '.join(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(output.stdout.split())
+
+def test_parser_import_skips_feature_modules():
+    """Тестує, що імпорт CLI та парсера не завантажує модулі окремих можливостей"""
+    modules = loaded_modules("import cli, olx_parser")
+
+    assert not modules & set(FEATURE_MODULES)
+
+if __name__ == "__main__":
+    test_parser_import_skips_feature_modules()
+    print("✅ Всі тести лінивого завантаження пройдено")
@@ -0,0 +1,132 @@
+"""
+Тестовий файл для перевірки обходу в межах бюджету (дедлайн, запити)
+"""
+import asyncio
+import os
+import sys
+import time
+from typing import Optional, Tuple
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from config import ParserConfig
+from models import Category
+from olx_parser import OlxPriceParser
+from stub_server import start_server
+
+PAGES = 5
+CARDS_PER_PAGE = 2
+
+def _page(category: int, page: int) -> str:
+    cards = ''.join(
+        f'<div data-cy="l-card"><a href="/d/uk/obyavlenie/c{category}-p{page}-{index}.html"><h6>Оголошення {index}</h6></a>'
+        f'<p data-testid="ad-price">{100 * page + index} грн.</p></div>'
+        for index in range(CARDS_PER_PAGE)
+    )
+    forward = f'<a data-testid="pagination-forward" href="?page={page + 1}"></a>' if page < PAGES else ''
+    return (f'<html><body><span data-testid="total-count">Ми знайшли {PAGES * CARDS_PER_PAGE} оголошень</span>'
+            f'<div data-testid="listing-grid">{cards}</div>'
+            f'<div data-testid="pagination-wrapper"><ul data-testid="pagination-list"></ul>{forward}</div></body></html>')
+
+def _show_all(category: int) -> str:
+    return f'<html><body><a data-testid="sub-cat-1-root-link" href="/uk/list{category}/">Показати всі</a></body></html>'
+
+async def _crawl(slow_from_page: int = 0, show_all: bool = False, failing_page: Optional[Tuple[int, int]] = None,
+                 **budget):
+    requested = []
+
+    async def handler(request: web.Request) -> web.Response:
+        category = int(request.match_info["category"])
+        page = int(request.query.get("page", 1))
+        if show_all and request.path.startswith("/uk/cat"):
+            # Сторінка категорії лише веде на "Показати всі" (сторінка 0 у журналі)
+            requested.append((category, 0))
+            return web.Response(text=_show_all(category), content_type="text/html")
+        requested.append((category, page))
+        if (category, page) == failing_page:
+            return web.Response(status=404)
+        if slow_from_page and page >= slow_from_page:
+            await asyncio.sleep(2.0)
+        return web.Response(text=_page(category, page), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_route("GET", "/uk/cat{category}/", handler)
+    app.router.add_route("GET", "/uk/list{category}/", handler)
+    runner, base_url = await start_server(app)
+
+    config = ParserConfig(base_url=base_url, log_level="WARNING", log_file="",
+                          delay_between_requests=0, max_requests_per_host=2, **budget)
+    categories = [Category(name=f"Категорія {index}", url=f"{base_url}/uk/cat{index}/") for index in range(3)]
+    try:
+        async with OlxPriceParser(config) as parser:
+            start = time.perf_counter()
+            results, report = await parser.parse_categories_within_budget(categories)
+            elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+    return results, report, requested, elapsed
+
+def test_request_budget_crawls_first_pages_first():
+    results, report, requested, _ = asyncio.run(_crawl(crawl_max_requests=5))
+
+    assert len(requested) == 5
+    assert sorted(requested[:3]) == [(0, 1), (1, 1), (2, 1)]
+    assert all(page == 2 for _, page in requested[3:])
+    assert report["stop_reason"] == "requests"
+    assert report["pages_crawled"] == 5 and report["pages_estimated"] == 3 * PAGES
+    assert report["categories_complete"] == 0
+    # Часткові результати кожної категорії
+    assert [result.total_products for result in results] == [
+        CARDS_PER_PAGE * report["categories"][f"Категорія {index}"]["pages"] for index in range(3)
+    ]
+    assert all(result.success and result.metrics["coverage"]["stopped_by"] == "requests" for result in results)
+    assert all(product.category == "Категорія 0" for product in results[0].products)
+
+def test_deadline_cancels_slow_pages():
+    results, report, requested, elapsed = asyncio.run(_crawl(slow_from_page=3, crawl_deadline_seconds=0.8))
+
+    assert elapsed < 1.8
+    assert report["stop_reason"] == "deadline"
+    assert all(coverage["pages"] == 2 for coverage in report["categories"].values())
+    assert sum(result.total_products for result in results) == 3 * 2 * CARDS_PER_PAGE
+
+def test_ample_budget_crawls_everything():
+    results, report, requested, _ = asyncio.run(_crawl(crawl_max_requests=100))
+
+    assert report["stop_reason"] is None
+    assert report["categories_complete"] == 3 and report["page_coverage"] == 1.0
+    assert len(requested) == 3 * PAGES
+    assert all(result.total_products == PAGES * CARDS_PER_PAGE for result in results)
+
+def test_failed_page_keeps_category_products():
+    results, report, requested, _ = asyncio.run(_crawl(failing_page=(1, 3), crawl_max_requests=100))
+
+    # Категорія зупиняється на невдалій сторінці, інші обходяться до кінця
+    assert [page for category, page in requested if category == 1] == [1, 2, 3]
+    coverage = report["categories"]["Категорія 1"]
+    assert coverage["pages"] == 2 and not coverage["complete"] and coverage["stopped_by"] == "error"
+    assert len(coverage["errors"]) == 1
+    assert results[1].success and results[1].total_products == 2 * CARDS_PER_PAGE
+    assert results[1].metrics["coverage"]["errors"] == results[1].errors
+    assert report["categories_complete"] == 2
+
+def test_request_budget_reserves_show_all_request():
+    results, report, requested, _ = asyncio.run(_crawl(show_all=True, crawl_max_requests=3))
+
+    # Перша сторінка коштує два запити, тож другої категорії вже не почато
+    assert requested == [(0, 0), (0, 1)]
+    assert report["spent"]["requests"] == 2
+    assert report["stop_reason"] == "requests"
+    assert report["categories"]["Категорія 0"]["pages"] == 1
+    assert results[0].total_products == CARDS_PER_PAGE and results[1].total_products == 0
+
+if __name__ == "__main__":
+    test_request_budget_crawls_first_pages_first()
+    test_deadline_cancels_slow_pages()
+    test_ample_budget_crawls_everything()
+    test_failed_page_keeps_category_products()
+    test_request_budget_reserves_show_all_request()
+    print("✅ Всі тести бюджету обходу пройдено")
@@ -0,0 +1,87 @@
+"""
+Тестовий файл для перевірки фонового запису результатів категорій
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import ParserConfig
+from export_writer import ExportWriter
+from main import PriceParserManager, make_export_writer
+from models import Category, ParsingResult, Product
+
+def make_result(name: str) -> ParsingResult:
+    products = [Product(name=f"{name} {index}", price=Decimal(100 + index),
+                        product_url=f"https://www.olx.ua/d/uk/obyavlenie/{name}-{index}.html", category=name)
+                for index in range(3)]
+    return ParsingResult(success=True, products=products, total_products=len(products))
+
+async def _write_while_crawling():
+    written = []
+    threads = set()
+
+    def slow_export(result, category):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.2)
+        if category.name == "Зламана":
+            raise OSError("диск заповнено")
+        written.append(category.name)
+        return {"full": f"{category.name}.json"}
+
+    ticks = 0
+
+    async def crawl():
+        # Цикл подій не блокується записом
+        nonlocal ticks
+        for _ in range(20):
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    writer = ExportWriter(slow_export, queue_size=1)
+    crawler = asyncio.ensure_future(crawl())
+    start = time.perf_counter()
+    for name in ("Меблі", "Зламана", "Телефони"):
+        await writer.submit(make_result(name), Category(name=name, url=""))
+    submit_time = time.perf_counter() - start
+    await crawler
+    errors = await writer.close()
+    return written, errors, threads, ticks, submit_time, writer.metrics
+
+def test_writes_in_background_and_reports_errors():
+    written, errors, threads, ticks, submit_time, metrics = asyncio.run(_write_while_crawling())
+
+    # Черга на 1 елемент: третій результат чекає, поки запишеться перший
+    assert 0.1 < submit_time < 0.4
+    assert ticks == 20
+    assert written == ["Меблі", "Телефони"]
+    assert errors == ["Помилка при збереженні категорії Зламана: диск заповнено"]
+    assert metrics["submitted"] == 3 and metrics["written"] == 2 and metrics["failed"] == 1
+    assert all(name.startswith("export") for name in threads)
+
+async def _export_files(output_directory: str):
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                        output_directory=output_directory)
+    writer = make_export_writer(PriceParserManager(config))
+    await writer.submit(make_result("Меблі"), Category(name="Меблі", url=""))
+    return await writer.close(), writer.written
+
+def test_manager_export_files(tmp_path):
+    errors, written = asyncio.run(_export_files(str(tmp_path)))
+
+    assert errors == []
+    assert sorted(written[0]) == ["essential", "excel", "full"]
+    assert all(os.path.exists(path) for path in written[0].values())
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_writes_in_background_and_reports_errors()
+    with tempfile.TemporaryDirectory() as directory:
+        test_manager_export_files(pathlib.Path(directory))
+    print("✅ Всі тести фонового запису пройдено")
@@ -0,0 +1,38 @@
+"""
+Тестовий файл для перевірки витягування на корпусі сторінок OLX.ua (еталони та швидкість)
+"""
+import os
+import sys
+
+# Додаємо поточну директорію та бенчмарк до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from extraction_benchmark import (
+    corpus_pages, extract_page, find_regressions, load_baseline, load_golden, load_page, make_parser,
+    run_benchmark
+)
+
+# Перевірка швидкості залежить від навантаження машини, тому вмикається явно
+TIMING_ENV = "OLX_BENCH_TIMING"
+
+def test_extraction_matches_golden():
+    """Тестує, що витягування кожної сторінки корпусу збігається з еталоном"""
+    parser = make_parser()
+    for name in corpus_pages():
+        assert extract_page(parser, load_page(name)) == load_golden(name), name
+
+def test_extraction_throughput_within_baseline():
+    """Тестує пропускну здатність витягування відносно базової лінії (лише з OLX_BENCH_TIMING=1)"""
+    if os.environ.get(TIMING_ENV) != "1":
+        return
+    baseline = load_baseline()
+    assert baseline is not None, "Немає benchmarks/baseline.json"
+
+    regressions = find_regressions(run_benchmark(rounds=5), baseline)
+    assert not regressions, "\n".join(regressions)
+
+if __name__ == "__main__":
+    test_extraction_matches_golden()
+    test_extraction_throughput_within_baseline()
+    print("✅ Всі тести бенчмарку витягування пройдено")
@@ -0,0 +1,107 @@
+"""
+Тестовий файл для перевірки таймаутів та дубльованих запитів з локальним сервером
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from http_client import FetchClient
+from stub_server import start_server
+
+async def _start_server(delays):
+    """Локальний сервер: затримка n-го запиту до шляху береться з delays(path, n)"""
+    counter = {"requests": 0}
+    
+    async def handler(request: web.Request) -> web.Response:
+        counter["requests"] += 1
+        counter[request.path] = counter.get(request.path, 0) + 1
+        await asyncio.sleep(delays(request.path, counter[request.path]))
+        return web.Response(text=f"<html>{counter['requests']}</html>", content_type="text/html")
+    
+    runner, base_url = await start_server(handler)
+    return runner, f"{base_url}/", counter
+
+async def _run_hedged():
+    # Перший запит до /slow "зависає", решта відповідає за 10 мс
+    runner, url, counter = await _start_server(lambda path, n: 1.5 if path == "/slow" and n == 1 else 0.01)
+    client = FetchClient(max_concurrency=4, hedge=True, hedge_min_samples=20)
+    try:
+        for _ in range(24):
+            await client.fetch(url)
+        hedged_before = dict(client.metrics)
+        start = time.perf_counter()
+        response = await client.fetch(url + "slow")
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.close()
+        await runner.cleanup()
+    return client, response, elapsed, hedged_before
+
+def test_slow_request_is_hedged():
+    """Запит довший за p95 дублюється, перемагає швидша відповідь"""
+    client, response, elapsed, before = asyncio.run(_run_hedged())
+    
+    assert response is not None and response.status == 200
+    assert elapsed < 1.0
+    assert client.metrics["hedged"] - before["hedged"] == 1
+    assert client.metrics["hedge_wins"] - before["hedge_wins"] == 1
+
+async def _run_saturated():
+    # Обидва слоти зайняті повільними запитами, третій запит чекає в черзі.
+    # Затримка дубля (~0.1 сек) з запасом більша за час, поки другий запит займає слот
+    runner, url, counter = await _start_server(
+        lambda path, n: 0.6 if path.startswith("/busy") else 0.01 if path == "/queued" else 0.1
+    )
+    client = FetchClient(max_concurrency=2, hedge=True, hedge_min_samples=4)
+    try:
+        for _ in range(4):
+            await client.fetch(url)
+        before = dict(client.metrics)
+        responses = await asyncio.gather(
+            client.fetch(url + "busy1"), client.fetch(url + "busy2"), client.fetch(url + "queued")
+        )
+    finally:
+        await client.close()
+        await runner.cleanup()
+    return client, responses, counter, before
+
+def test_no_hedge_without_free_slot():
+    """Запит у черзі до семафора не дублюється, і без вільного слота дубль не створюється"""
+    client, responses, counter, before = asyncio.run(_run_saturated())
+    
+    assert all(response is not None and response.status == 200 for response in responses)
+    assert client.metrics["hedged"] - before["hedged"] == 0
+    assert client.metrics["hedge_skipped"] - before["hedge_skipped"] == 2
+    assert (counter["/busy1"], counter["/busy2"], counter["/queued"]) == (1, 1, 1)
+
+async def _run_timeout():
+    runner, url, _ = await _start_server(lambda path, n: 1.5)
+    client = FetchClient(first_byte_timeout=0.2)
+    try:
+        start = time.perf_counter()
+        response = await client.fetch(url)
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.close()
+        await runner.cleanup()
+    return client, response, elapsed
+
+def test_first_byte_timeout():
+    """Сервер, що не відповідає, не тримає запит довше таймауту першого байта"""
+    client, response, elapsed = asyncio.run(_run_timeout())
+    
+    assert response is None
+    assert elapsed < 1.0
+    assert client.metrics["timeouts"] == 1
+
+if __name__ == "__main__":
+    test_slow_request_is_hedged()
+    test_no_hedge_without_free_slot()
+    test_first_byte_timeout()
+    print("✅ Всі тести клієнта запитів пройдено")
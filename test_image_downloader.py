@@ -0,0 +1,89 @@
+"""
+Тестовий файл для перевірки завантаження зображень оголошень
+"""
+import asyncio
+import os
+import sys
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from config import ParserConfig
+from olx_parser import OlxPriceParser
+from stub_server import start_server
+
+IMAGES = {
+    # Перевипущене оголошення - те саме зображення під іншим URL
+    "a": b"\x89PNG sofa",
+    "b": b"\x89PNG sofa",
+    "c": b"\x89PNG chair",
+}
+
+def _page() -> str:
+    cards = ''.join(
+        f'<div data-cy="l-card"><a href="/d/uk/obyavlenie/ad-{name}.html"><h6>Оголошення {name}</h6></a>'
+        f'<img src="data:image/gif;base64,R0lGOD" data-src="/img/{name}.png">'
+        f'<p data-testid="ad-price">100 грн.</p></div>'
+        for name in IMAGES
+    )
+    return (f'<html><body><div data-testid="listing-grid">{cards}'
+            f'<div data-cy="l-card"><a href="/d/uk/obyavlenie/ad-d.html"><h6>Без фото</h6></a>'
+            f'<img src="/app/static/media/no_thumbnail.svg"><p data-testid="ad-price">50 грн.</p></div></div>'
+            f'<div data-testid="pagination-wrapper"><ul data-testid="pagination-list"></ul></div></body></html>')
+
+async def _crawl_twice(output_directory: str):
+    image_requests = []
+
+    async def listing(request: web.Request) -> web.Response:
+        return web.Response(text=_page(), content_type="text/html")
+
+    async def image(request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        image_requests.append(name)
+        return web.Response(body=IMAGES[name], content_type="image/png")
+
+    app = web.Application()
+    app.router.add_route("GET", "/img/{name}.png", image)
+    app.router.add_route("GET", "/uk/list/", listing)
+    runner, base_url = await start_server(app)
+
+    config = ParserConfig(base_url=base_url, log_level="WARNING", log_file="",
+                          delay_between_requests=0, download_images=True, output_directory=output_directory)
+    runs = []
+    try:
+        for _ in range(2):
+            async with OlxPriceParser(config) as parser:
+                products = await parser.crawl_listing(f"{base_url}/uk/list/", "Меблі")
+                await parser.finish_images(products)
+                runs.append((products, parser.get_metrics()["images"]))
+    finally:
+        await runner.cleanup()
+    return runs, image_requests
+
+def test_images_stored_once_by_content(tmp_path):
+    runs, image_requests = asyncio.run(_crawl_twice(str(tmp_path)))
+    (products, metrics), (second_products, second_metrics) = runs
+
+    assert [product.image_url.rsplit('/', 1)[-1] for product in products] == ["a.png", "b.png", "c.png", ""]
+    assert metrics["downloaded"] == 3 and metrics["stored"] == 2 and metrics["deduplicated"] == 1
+    assert products[0].attributes["image_file"] == products[1].attributes["image_file"]
+    assert products[0].attributes["image_file"] != products[2].attributes["image_file"]
+    assert "image_file" not in products[3].attributes
+
+    files = [name for _, _, names in os.walk(tmp_path / "images") for name in names if name.endswith(".png")]
+    assert len(files) == 2
+    assert len((tmp_path / "images" / "index.tsv").read_text(encoding='utf-8').splitlines()) == 3
+
+    # Наступний запуск не запитує вже збережені URL
+    assert sorted(image_requests) == ["a", "b", "c"]
+    assert second_metrics["already_stored"] == 3 and second_metrics["downloaded"] == 0
+    assert second_products[2].attributes["image_file"] == products[2].attributes["image_file"]
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as directory:
+        test_images_stored_once_by_content(pathlib.Path(directory))
+    print("✅ Всі тести завантаження зображень пройдено")
@@ -0,0 +1,102 @@
+"""
+Тестовий файл для перевірки визначення макета сторінки
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+
+from layout_detector import LayoutDetector
+
+GRID_HTML = """
+<div data-testid="listing-grid">
+    <div data-cy="l-card"><h6>Диван</h6></div>
+    <div data-cy="l-card"><h6>Крісло</h6></div>
+</div>
+"""
+TESTID_HTML = """
+<div data-testid="l-card"><h6>Стіл</h6></div>
+"""
+UNKNOWN_HTML = """
+<div class="css-1sw7q4x"><h6>Шафа</h6></div>
+"""
+
+def soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, 'html.parser')
+
+def test_unknown_layout_returns_no_cards():
+    """Тестує, що невідомий макет не витягується і рахується в layout_unmatched"""
+    detector = LayoutDetector()
+
+    assert detector.select_cards(soup(UNKNOWN_HTML), "https://www.olx.ua/uk/elektronika/") == []
+    assert detector.select_cards(soup(UNKNOWN_HTML), "https://www.olx.ua/uk/dom-i-sad/") == []
+
+    assert detector.metrics["layout_unmatched"] == 2
+    assert detector.metrics["unmatched_urls"] == [
+        "https://www.olx.ua/uk/elektronika/", "https://www.olx.ua/uk/dom-i-sad/"
+    ]
+    assert detector.metrics["strategies"] == {}
+
+def test_cache_reused_per_url_pattern():
+    """Тестує, що сторінки з одним шаблоном URL класифікуються один раз"""
+    detector = LayoutDetector()
+
+    # Номер сторінки та параметри не змінюють шаблон
+    assert LayoutDetector.url_pattern("https://www.olx.ua/uk/elektronika/?page=2") == \
+        LayoutDetector.url_pattern("https://www.olx.ua/uk/dom-i-sad/?page=7")
+
+    for url in ("https://www.olx.ua/uk/elektronika/", "https://www.olx.ua/uk/elektronika/?page=2",
+                "https://www.olx.ua/uk/dom-i-sad/?page=3"):
+        assert len(detector.select_cards(soup(GRID_HTML), url)) == 2
+
+    assert detector.metrics["pages_classified"] == 1
+    assert detector.metrics["cache_hits"] == 2
+    assert detector.metrics["strategies"] == {"olx_listing_grid": 3}
+
+def test_cache_invalidated_when_layout_changes():
+    """Тестує, що зміна макета скидає кеш шаблону і класифікує сторінку заново"""
+    detector = LayoutDetector()
+    url = "https://www.olx.ua/uk/elektronika/"
+
+    assert len(detector.select_cards(soup(GRID_HTML), url)) == 2
+    cards = detector.select_cards(soup(TESTID_HTML), f"{url}?page=2")
+
+    assert [card.h6.get_text() for card in cards] == ["Стіл"]
+    assert detector.metrics["cache_invalidations"] == 1
+    assert detector.metrics["pages_classified"] == 2
+
+    # Новий макет закешовано для шаблону
+    assert len(detector.select_cards(soup(TESTID_HTML), f"{url}?page=3")) == 1
+    assert detector.metrics["cache_hits"] == 1
+
+def test_shared_detector_across_threads():
+    """Тестує детектор з кількох потоків (етапи розбору конвеєра) при частій зміні макета"""
+    detector = LayoutDetector()
+    pages = [(soup(GRID_HTML), 2), (soup(TESTID_HTML), 1)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def select(index):
+        page, expected = pages[index % 2]
+        return len(detector.select_cards(page, f"https://www.olx.ua/uk/elektronika/?page={index}")) == expected
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(select, range(2000)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert all(results)
+    assert sum(detector.metrics["strategies"].values()) == 2000
+    assert detector.metrics["pages_classified"] + detector.metrics["cache_hits"] == 2000
+
+if __name__ == "__main__":
+    test_unknown_layout_returns_no_cards()
+    test_cache_reused_per_url_pattern()
+    test_cache_invalidated_when_layout_changes()
+    test_shared_detector_across_threads()
+    print("✅ Всі тести визначення макета пройдено")
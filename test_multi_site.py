@@ -0,0 +1,96 @@
+"""
+Тестовий файл для перевірки паралельного парсингу кількох сайтів
+"""
+import asyncio
+import json
+import os
+import sys
+from dataclasses import replace
+from decimal import Decimal
+from typing import List, Optional
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from base_parser import BasePriceParser
+from config import ParserConfig
+from main import PriceParserManager
+from models import Category, Product
+from parser_registry import available_parsers, create_parser, register_parser
+
+class StubSiteParser(BasePriceParser):
+    """Сайт без мережі: одна категорія з підкатегорією і двома товарами"""
+
+    SITE = ""
+
+    async def get_categories(self) -> List[Category]:
+        return [Category(name=f"{self.SITE} каталог", url=f"{self.config.base_url}/catalog")]
+
+    async def get_subcategories(self, category: Category) -> List[Category]:
+        if category.url.endswith("/catalog"):
+            return [Category(name=f"{self.SITE} листова", url=f"{self.config.base_url}/catalog/leaf")]
+        return []
+
+    async def get_products_from_category(self, category: Category, max_pages: Optional[int] = None) -> List[Product]:
+        await asyncio.sleep(0.01)
+        return [
+            Product(name=f"{self.SITE} товар {index}", price=Decimal(100 * index), category=category.name,
+                    product_url=f"{category.url}/item-{index}", sku=f"{self.SITE}-{index}")
+            for index in (1, 2)
+        ]
+
+    def extract_listing_products(self, soup, page_url: str) -> List[Product]:
+        return []
+
+@register_parser("site_a")
+class SiteAParser(StubSiteParser):
+    SITE = "site_a"
+
+@register_parser("site_b")
+class SiteBParser(StubSiteParser):
+    SITE = "site_b"
+
+def test_registry_creates_parsers():
+    """Тестує реєстрацію власних парсерів поруч із вбудованими"""
+    config = ParserConfig(base_url="https://a.example", log_level="WARNING", log_file="")
+
+    assert {"olx", "example", "site_a", "site_b"} <= set(available_parsers())
+    assert isinstance(create_parser("site_a", config), SiteAParser)
+
+def run_sites(output_directory: str):
+    config = ParserConfig(base_url="", log_level="WARNING", log_file="", output_directory=output_directory,
+                          crawl_leaf_categories=True, detect_near_duplicates=True)
+    manager = PriceParserManager(config)
+    sites = {
+        "site_a": replace(config, base_url="https://a.example"),
+        "site_b": replace(config, base_url="https://b.example"),
+    }
+    return asyncio.run(manager.run_multi_site(sites))
+
+def test_sites_keep_separate_state(tmp_path):
+    """Тестує, що кожен сайт має власне дерево категорій та історію майже-дублікатів"""
+    run_sites(str(tmp_path))
+    # Другий запуск бере дерево категорій з кешу
+    result = run_sites(str(tmp_path))
+
+    by_site = {}
+    for product in result.products:
+        by_site.setdefault(product.attributes["site"], set()).add(product.category)
+    assert by_site == {"site_a": {"site_a листова"}, "site_b": {"site_b листова"}}
+    assert result.success and result.total_products == 4
+    assert sorted(result.metrics["sites"]) == ["site_a", "site_b"]
+
+    for site in ("site_a", "site_b"):
+        with open(tmp_path / site / "category_tree.json", 'r', encoding='utf-8') as f:
+            tree = json.load(f)
+        assert {category["url"].split("/")[2] for category in tree["categories"]} == {f"{site[-1]}.example"}
+        assert os.path.exists(tmp_path / site / "near_duplicates.json")
+    assert not os.path.exists(tmp_path / "category_tree.json")
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_registry_creates_parsers()
+    with tempfile.TemporaryDirectory() as directory:
+        test_sites_keep_separate_state(pathlib.Path(directory))
+    print("✅ Всі тести кількох сайтів пройдено")
@@ -0,0 +1,120 @@
+"""
+Тестовий файл для перевірки виявлення майже-дублікатів оголошень
+"""
+import asyncio
+import json
+import os
+import sys
+from decimal import Decimal
+from typing import List, Optional
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from base_parser import BasePriceParser
+from config import ParserConfig
+from models import Category, Product
+from near_duplicates import NearDuplicateIndex
+
+def product(sku: str, name: str, price: str) -> Product:
+    return Product(name=name, price=Decimal(price), product_url=f"https://www.olx.ua/d/uk/obyavlenie/{sku}.html",
+                   sku=sku)
+
+def listings():
+    return [
+        product("a1", "iPhone 13 128GB синій ідеальний стан", "18500"),
+        product("a2", "Диван кутовий розкладний", "9000"),
+        # Перевипущене оголошення: дрібна правка назви та ціни
+        product("a3", "iPhone 13 128GB синій, ідеальний стан!", "18000"),
+        product("a4", "Крісло офісне", "1200"),
+    ]
+
+def test_signature_similarity_estimates_jaccard():
+    """Тестує, що схожість підписів наближає схожість Жаккара множин слів"""
+    index = NearDuplicateIndex()
+    base = index.signature("iPhone 13 128GB синій ідеальний стан")
+
+    assert len(base) == index.bands * index.rows
+    assert index.signature("стан ідеальний синій 128GB iPhone 13") == base
+    # Жаккар 5/6 ≈ 0.83
+    assert abs(index.similarity(base, index.signature("iPhone 13 128GB синій ідеальний")) - 5 / 6) < 0.15
+    assert index.similarity(base, index.signature("Диван кутовий розкладний")) < 0.1
+
+def test_lsh_finds_candidates_by_band():
+    """Тестує пошук кандидатів за смугами з перевіркою схожості та ціни"""
+    index = NearDuplicateIndex()
+    index.add("iPhone 13 128GB синій ідеальний стан", Decimal("18500"), "a1")
+    index.add("Диван кутовий розкладний", Decimal("9000"), "a2")
+
+    assert index.find("iPhone 13 128GB синій, ідеальний стан!", Decimal("18000")) == "a1"
+    assert index.find("Диван кутовий розкладний", Decimal("0")) == "a2"        # Договірна
+    # Назва та сама, але ціна надто відрізняється
+    assert index.find("iPhone 13 128GB синій ідеальний стан", Decimal("9000")) is None
+    assert index.find("Велосипед гірський", Decimal("9000")) is None
+
+def test_assign_clusters_skips_known_keys(tmp_path):
+    """Тестує кластери майже-дублікатів і те, що відомі оголошення не дублюються в історії"""
+    index = NearDuplicateIndex()
+    products = listings()
+
+    assert index.assign_clusters(products) == 1
+    assert [item.duplicate_cluster for item in products] == ["a1", "a2", "a1", "a4"]
+    assert index.dirty
+
+    history_path = str(tmp_path / "near_duplicates.json")
+    index.save(history_path)
+    assert not index.dirty
+
+    # Наступний запуск бачить ті самі оголошення та одне нове
+    index = NearDuplicateIndex()
+    index.load(history_path)
+    products = listings() + [product("a5", "iPhone 13 128GB синій стан ідеальний", "18300")]
+    assert index.assign_clusters(products) == 2
+    assert [item.duplicate_cluster for item in products] == ["a1", "a2", "a1", "a4", "a1"]
+    assert len(index) == 5
+
+    index.assign_clusters(listings())
+    index.save(history_path)
+    with open(history_path, 'r', encoding='utf-8') as f:
+        keys = [entry[3] for entry in json.load(f)["entries"]]
+    assert keys == ["a1", "a2", "a3", "a4", "a5"]
+
+class StubParser(BasePriceParser):
+    async def get_categories(self) -> List[Category]:
+        return []
+
+    async def get_products_from_category(self, category: Category, max_pages: Optional[int] = None) -> List[Product]:
+        return []
+
+    def extract_listing_products(self, soup, page_url: str) -> List[Product]:
+        return []
+
+async def _mark_categories(config: ParserConfig, history_path: str):
+    async with StubParser(config) as parser:
+        for products in (listings()[:2], listings()[2:], listings()):
+            parser.mark_near_duplicates(products)
+        saved_during_run = os.path.exists(history_path)
+    return saved_during_run, parser.near_duplicates_found
+
+def test_parser_saves_history_once(tmp_path):
+    """Тестує, що парсер зберігає історію один раз наприкінці обходу"""
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                          output_directory=str(tmp_path), detect_near_duplicates=True)
+    history_path = str(tmp_path / "near_duplicates.json")
+
+    saved_during_run, found = asyncio.run(_mark_categories(config, history_path))
+
+    assert not saved_during_run and found == 2
+    with open(history_path, 'r', encoding='utf-8') as f:
+        assert len(json.load(f)["entries"]) == 4
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_signature_similarity_estimates_jaccard()
+    test_lsh_finds_candidates_by_band()
+    with tempfile.TemporaryDirectory() as directory:
+        test_assign_clusters_skips_known_keys(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_parser_saves_history_once(pathlib.Path(directory))
+    print("✅ Всі тести майже-дублікатів пройдено")
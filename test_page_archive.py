@@ -0,0 +1,143 @@
+"""
+Тестовий файл для перевірки архіву сторінок та повторного витягування
+"""
+import asyncio
+import gzip
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from config import ParserConfig
+from models import Category
+from olx_parser import OlxPriceParser
+from page_archive import PageArchive, replay_archive
+from stub_server import start_server
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "corpus")
+
+def _fill_archive(directory: str) -> PageArchive:
+    archive = PageArchive(directory, segment_max_bytes=8 * 1024)
+    pages = {}
+    for day, name in enumerate(sorted(os.listdir(CORPUS_DIR)), start=1):
+        with open(os.path.join(CORPUS_DIR, name), encoding='utf-8') as f:
+            pages[name] = f.read()
+        archive.append(f"https://www.olx.ua/uk/{name}", pages[name], fetched_at=datetime(2024, 5, day, 12, 0),
+                       category=name.rsplit('_', 1)[0])
+    # Повторне отримання тієї ж сторінки пізніше
+    archive.append("https://www.olx.ua/uk/telefony_page1.html", pages["telefony_page1.html"],
+                   fetched_at=datetime(2024, 5, 9, 12, 0), category="telefony")
+    return archive
+
+def test_archive_round_trip_and_index(tmp_path):
+    archive = _fill_archive(str(tmp_path))
+    
+    entries = archive.entries()
+    assert len(entries) == 5
+    # Малий розмір сегмента - кілька сегментів
+    assert len({entry.segment for entry in entries}) > 1
+    
+    with open(os.path.join(CORPUS_DIR, "dom_i_sad_page7.html"), encoding='utf-8') as f:
+        expected = f.read()
+    entry = archive.entries(url_prefix="https://www.olx.ua/uk/dom_i_sad")[0]
+    assert archive.read(entry) == expected
+    
+    assert len(archive.entries(since=datetime(2024, 5, 3))) == 3
+    assert len(archive.entries(latest_only=True)) == 4
+    # Фільтр з часовим поясом порівнюється з часом отримання в UTC
+    since = datetime(2024, 5, 3, 12, 0).astimezone(timezone(timedelta(hours=3)))
+    assert len(archive.entries(since=since)) == 3
+    assert all(datetime.fromisoformat(entry.fetched_at).utcoffset() == timedelta(0) for entry in entries)
+
+def _warc_date(archive: PageArchive, entry) -> str:
+    with open(archive.segment_path(entry.segment), 'rb') as f:
+        f.seek(entry.offset)
+        record = gzip.decompress(f.read(entry.length)).decode('utf-8')
+    return next(line.split(': ', 1)[1] for line in record.split("\r\n") if line.startswith("WARC-Date"))
+
+def test_warc_date_in_utc(tmp_path):
+    """WARC-Date з позначкою Z записується в UTC незалежно від часового поясу"""
+    archive = PageArchive(str(tmp_path))
+    kyiv = archive.append("https://www.olx.ua/uk/a/", "<html></html>",
+                          fetched_at=datetime(2024, 5, 1, 15, 0, tzinfo=timezone(timedelta(hours=3))))
+    local = archive.append("https://www.olx.ua/uk/b/", "<html></html>", fetched_at=datetime(2024, 5, 1, 15, 0))
+    now = archive.append("https://www.olx.ua/uk/c/", "<html></html>")
+    
+    assert _warc_date(archive, kyiv) == "2024-05-01T12:00:00Z"
+    assert _warc_date(archive, local) == \
+        datetime(2024, 5, 1, 15, 0).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    written = datetime.strptime(_warc_date(archive, now), '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    assert abs((datetime.now(timezone.utc) - written).total_seconds()) < 60
+
+def test_replay_keeps_products_from_readable_records(tmp_path):
+    """Пошкоджений запис потрапляє в помилки, а товари з решти сторінок зберігаються"""
+    archive = _fill_archive(str(tmp_path))
+    broken = archive.entries(url_prefix="https://www.olx.ua/uk/dom_i_sad")[0]
+    with open(archive.segment_path(broken.segment), 'r+b') as f:
+        f.seek(broken.offset)
+        f.write(b"\0" * 16)
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="")
+    
+    result = replay_archive(config, str(tmp_path), processes=2)
+    assert result.success
+    assert result.total_products == 52 + 40 + 44
+    assert len(result.errors) == 1 and "dom_i_sad" in result.errors[0]
+    assert result.metrics["replay"]["failed_pages"] == 1
+
+def test_replay_extracts_without_network(tmp_path):
+    _fill_archive(str(tmp_path))
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="")
+    
+    result = replay_archive(config, str(tmp_path), processes=2)
+    assert result.success
+    assert result.total_products == 52 + 48 + 40 + 44
+    assert result.metrics["replay"]["pages"] == 4
+    assert {product.category for product in result.products} == {"dom_i_sad", "nedvizhimost", "telefony", "zapchasti"}
+    assert sum(product.category == "telefony" for product in result.products) == 52
+    
+    all_versions = replay_archive(config, str(tmp_path), processes=2, latest_only=False)
+    assert all_versions.total_products == result.total_products + 52
+
+async def _crawl_archived(output_directory: str):
+    with open(os.path.join(CORPUS_DIR, "telefony_page1.html"), encoding='utf-8') as f:
+        html = f.read()
+    
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(text=html, content_type="text/html")
+    
+    runner, base_url = await start_server(handler)
+    config = ParserConfig(base_url=base_url, log_level="WARNING", log_file="", delay_between_requests=0,
+                          max_pages=2, archive_pages=True, output_directory=output_directory)
+    try:
+        async with OlxPriceParser(config) as parser:
+            products = await parser.get_products_from_category(Category(name="Телефони", url=f"{base_url}/uk/telefony/"))
+    finally:
+        await runner.cleanup()
+    return config, products
+
+def test_replay_restores_category(tmp_path):
+    """Сторінки видачі архівуються з категорією, і повторне витягування її відновлює"""
+    config, products = asyncio.run(_crawl_archived(str(tmp_path)))
+    archive = PageArchive(str(tmp_path / config.archive_directory))
+    
+    assert [entry.category for entry in archive.entries()] == ["Телефони", "Телефони"]
+    result = replay_archive(config, archive.directory, processes=2)
+    assert result.total_products == len(products) == 2 * 52
+    assert all(product.category == "Телефони" for product in result.products)
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as directory:
+        test_archive_round_trip_and_index(os.path.join(directory, "a"))
+        test_replay_extracts_without_network(os.path.join(directory, "b"))
+        test_replay_keeps_products_from_readable_records(os.path.join(directory, "c"))
+    with tempfile.TemporaryDirectory() as directory:
+        test_warc_date_in_utc(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_replay_restores_category(pathlib.Path(directory))
+    print("✅ Всі тести архіву сторінок пройдено")
@@ -0,0 +1,112 @@
+"""
+Тестовий файл для перевірки мемоізації витягування сторінок за хешем вмісту
+"""
+import asyncio
+import os
+import sys
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from config import ParserConfig
+from models import Product
+from olx_parser import OlxPriceParser
+from page_memo import PageMemo, listing_hash
+from stub_server import start_server
+
+def _card(ad_id: str, title: str, price: str) -> str:
+    return (f'<div data-cy="l-card"><a href="/d/uk/obyavlenie/{ad_id}.html"><h6>{title}</h6></a>'
+            f'<p data-testid="ad-price">{price}</p></div>')
+
+def _page(page: int, run: int, price: str = "9 000 грн.") -> str:
+    forward = f'<a data-testid="pagination-forward" href="/uk/list/?page={page + 1}"></a>' if page < 3 else ''
+    return (f'<html><head><script>track({run})</script></head><body>'
+            f'<div data-testid="listing-grid">{_card(f"a-{page}-1", "Диван", price)}'
+            f'<script>impression({run})</script>{_card(f"a-{page}-2", "Крісло", "1 200 грн.")}</div>'
+            f'<div data-testid="pagination-wrapper"><ul data-testid="pagination-list"></ul>{forward}</div>'
+            f'<footer>Згенеровано {run}</footer></body></html>')
+
+def test_listing_hash_ignores_scripts_and_footer():
+    assert listing_hash(_page(2, run=1)) == listing_hash(_page(2, run=2))
+    assert listing_hash(_page(2, run=1)) != listing_hash(_page(2, run=1, price="8 500 грн."))
+    assert listing_hash(_page(2, run=1)) != listing_hash(_page(3, run=1))
+    assert listing_hash(_page(2, run=1), "https://a") != listing_hash(_page(2, run=1), "https://b")
+    assert listing_hash("<html><body>Сторінку не знайдено</body></html>") is None
+
+def test_memo_evicts_least_recently_used(tmp_path):
+    memo = PageMemo(str(tmp_path / "memo.sqlite"), max_entries=2)
+    for key in ("a", "b"):
+        memo.put(key, [Product(name=key, price=Decimal("100"), product_url="", availability=True)], None)
+    assert memo.get("a") is not None     # "a" використано пізніше за "b"
+    memo.put("c", [], "/uk/list/?page=2")
+
+    assert memo.get("b") is None
+    assert memo.get("a")[0][0].name == "a"
+    assert memo.get("c") == ([], "/uk/list/?page=2")
+    assert memo.summary()["evicted"] == 1
+
+def test_memo_key_depends_on_normalizer_settings(tmp_path):
+    """Тестує, що зміна валюти конвертації або курсів дає інший ключ кешу"""
+    def key(**settings):
+        config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                              memoize_pages=True, output_directory=str(tmp_path), **settings)
+        return OlxPriceParser(config).listing_memo_key(_page(2, run=1))
+
+    plain = key()
+    converted = key(base_currency="UAH", currency_rates={"USD": 41.0, "EUR": 44.5})
+
+    assert plain != converted
+    assert converted == key(base_currency="UAH", currency_rates={"eur": 44.5, "USD": 41})
+    assert converted != key(base_currency="UAH", currency_rates={"USD": 42.0, "EUR": 44.5})
+    assert converted != key(base_currency="USD", currency_rates={"USD": 41.0, "EUR": 44.5})
+
+async def _crawl(base_url: str, memo_path: str):
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                          delay_between_requests=0, memoize_pages=True, output_directory=os.path.dirname(memo_path),
+                          page_memo_file=os.path.basename(memo_path))
+    async with OlxPriceParser(config) as parser:
+        products = await parser.crawl_listing(f"{base_url}/uk/list/", "Меблі")
+        return products, parser.get_metrics()["page_memo"]
+
+async def _run_twice(memo_path: str):
+    run = {"number": 1}
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(text=_page(int(request.query.get("page", 1)), run["number"]), content_type="text/html")
+
+    runner, base_url = await start_server(handler)
+    try:
+        first = await _crawl(base_url, memo_path)
+        # Наступний запуск: змінились лише скрипти аналітики та футер
+        run["number"] = 2
+        second = await _crawl(base_url, memo_path)
+    finally:
+        await runner.cleanup()
+    return first, second
+
+def test_unchanged_pages_skip_parsing_across_runs(tmp_path):
+    (first_products, first_memo), (second_products, second_memo) = asyncio.run(
+        _run_twice(str(tmp_path / "page_memo.sqlite"))
+    )
+
+    assert first_memo["hits"] == 0 and first_memo["stored"] == 3
+    assert second_memo["hits"] == 3 and second_memo["hit_rate"] == 1.0
+    assert [(product.name, product.price, product.sku, product.category) for product in second_products] == [
+        (product.name, product.price, product.sku, product.category) for product in first_products
+    ]
+    assert len(second_products) == 6
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_listing_hash_ignores_scripts_and_footer()
+    with tempfile.TemporaryDirectory() as directory:
+        test_memo_key_depends_on_normalizer_settings(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_memo_evicts_least_recently_used(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_unchanged_pages_skip_parsing_across_runs(pathlib.Path(directory))
+    print("✅ Всі тести кешу сторінок пройдено")
@@ -0,0 +1,129 @@
+"""
+Тестовий файл для перевірки конвеєра етапів та обходу видачі конвеєром
+"""
+import asyncio
+import copy
+import os
+import sys
+import time
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from config import ParserConfig
+from models import Category
+from olx_parser import OlxPriceParser
+from pipeline import Pipeline, Stage
+from stub_server import start_server
+
+CORPUS_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "corpus", "telefony_page1.html")
+
+def test_pipeline_backpressure_and_metrics():
+    """Повільний експорт обмежує глибину черг, а всі елементи доходять до кінця"""
+    exported = []
+    
+    async def fetch(item):
+        await asyncio.sleep(0.001)
+        return item
+    
+    def export(item):
+        time.sleep(0.002)
+        exported.append(item)
+    
+    pipeline = Pipeline([
+        Stage("fetch", fetch, workers=8),
+        Stage("parse", lambda item: [item, -item], workers=2, executor="thread", fan_out=True),
+        Stage("export", export, executor="thread"),
+    ], queue_size=3)
+    metrics = asyncio.run(pipeline.run(range(1, 51)))
+    
+    assert sorted(exported) == sorted(list(range(1, 51)) + [-item for item in range(1, 51)])
+    assert metrics["export"]["processed"] == 100
+    assert all(stage["max_queue_depth"] <= 3 for stage in metrics.values())
+    assert metrics["export"]["max_queue_depth"] == 3
+
+async def _crawl(executor: str, runs: int = 1, **options):
+    with open(CORPUS_PAGE, encoding='utf-8') as f:
+        html = f.read()
+    requested = []
+    
+    async def handler(request: web.Request) -> web.Response:
+        requested.append(request.query.get("page", "1"))
+        return web.Response(text=html, content_type="text/html")
+    
+    runner, base_url = await start_server(handler)
+    
+    config = ParserConfig(base_url=base_url, use_pipeline=True, pipeline_cpu_executor=executor,
+                          delay_between_requests=0, max_pages=4, log_level="WARNING", log_file="", **options)
+    try:
+        for _ in range(runs):
+            async with OlxPriceParser(config) as parser:
+                products = await parser.get_products_from_category(Category(name="Телефони", url=f"{base_url}/uk/telefony/"))
+                metrics = parser.get_metrics()["pipeline"]["Телефони"]
+    finally:
+        await runner.cleanup()
+    return products, metrics, requested
+
+def test_listing_pipeline_crawls_all_pages():
+    for executor in ("thread", "process"):
+        products, metrics, requested = asyncio.run(_crawl(executor))
+        
+        assert len(products) == 4 * 52
+        assert all(product.category == "Телефони" for product in products)
+        assert sorted(requested) == ["1", "2", "3", "4"]
+        assert metrics["export"]["processed"] == 4 - (executor == "process")
+
+def test_memo_hits_written_by_export_stage(tmp_path):
+    """Сторінки з кешу проходять конвеєр до експорту, а не записуються з етапу fetch"""
+    for executor in ("thread", "process"):
+        directory = tmp_path / executor
+        products, metrics, requested = asyncio.run(_crawl(
+            executor, runs=2, memoize_pages=True, output_directory=str(directory), pipeline_stream_file="stream.jsonl"
+        ))
+        
+        assert len(products) == 4 * 52
+        assert all(product.category == "Телефони" for product in products)
+        assert metrics["export"]["processed"] == 4 - (executor == "process")
+        with open(directory / "stream.jsonl", encoding='utf-8') as f:
+            assert sum(1 for _ in f) == 2 * 4 * 52
+
+def test_result_metrics_are_copies_for_own_category():
+    """Метрики результату - копії лише для своєї категорії, парсер їх далі не змінює"""
+    async def run():
+        with open(CORPUS_PAGE, encoding='utf-8') as f:
+            html = f.read()
+        
+        async def handler(request: web.Request) -> web.Response:
+            return web.Response(text=html, content_type="text/html")
+        
+        runner, base_url = await start_server(handler)
+        config = ParserConfig(base_url=base_url, use_pipeline=True, delay_between_requests=0, max_pages=2,
+                              log_level="WARNING", log_file="")
+        try:
+            async with OlxPriceParser(config) as parser:
+                first = await parser.parse_specific_category(Category(name="Телефони", url=f"{base_url}/uk/telefony/"))
+                layout = copy.deepcopy(first.metrics["layout"])
+                second = await parser.parse_specific_category(Category(name="Ноутбуки", url=f"{base_url}/uk/noutbuky/"))
+        finally:
+            await runner.cleanup()
+        return first, layout, second
+    
+    first, layout, second = asyncio.run(run())
+    
+    assert list(first.metrics["pipeline"]) == ["Телефони"]
+    assert list(second.metrics["pipeline"]) == ["Ноутбуки"]
+    # Обхід другої категорії не змінює метрик першого результату
+    assert first.metrics["layout"] == layout
+    assert second.metrics["layout"]["cache_hits"] > layout["cache_hits"]
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_pipeline_backpressure_and_metrics()
+    test_listing_pipeline_crawls_all_pages()
+    with tempfile.TemporaryDirectory() as directory:
+        test_memo_hits_written_by_export_stage(pathlib.Path(directory))
+    test_result_metrics_are_copies_for_own_category()
+    print("✅ Всі тести конвеєра пройдено")
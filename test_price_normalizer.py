@@ -0,0 +1,107 @@
+"""
+Тестовий файл для перевірки нормалізації цін
+"""
+import os
+import sys
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+
+from config import ParserConfig
+from models import Product
+from olx_parser import OlxPriceParser
+from price_normalizer import PriceNormalizer
+
+def test_currencies_and_markers():
+    """Тестує визначення валют, договірної ціни та безкоштовних оголошень"""
+    normalizer = PriceNormalizer()
+    
+    usd, uah, eur, negotiable, free, decimal = normalizer.normalize_batch([
+        "$1 200",
+        "45 999 грн.",
+        "1.250,50 €",
+        "Договірна",
+        "Безкоштовно",
+        "12,5 грн"
+    ])
+    
+    assert (usd.amount, usd.currency) == (Decimal("1200"), "USD")
+    assert (uah.amount, uah.currency) == (Decimal("45999"), "UAH")
+    assert (eur.amount, eur.currency) == (Decimal("1250.50"), "EUR")
+    assert negotiable.negotiable and negotiable.amount is None
+    assert free.free and free.amount == Decimal("0")
+    assert decimal.amount == Decimal("12.5")
+
+def test_batch_uses_cache_for_repeated_strings():
+    """Тестує, що повторювані рядки розбираються один раз"""
+    normalizer = PriceNormalizer()
+    results = normalizer.normalize_batch(["100 грн"] * 50 + ["200 грн"])
+    
+    assert len(results) == 51
+    assert normalizer.cache_info().misses == 2
+
+def test_conversion_to_base_currency():
+    """Тестує конвертацію в базову валюту за локальною таблицею курсів"""
+    normalizer = PriceNormalizer(base_currency="UAH", rates={"USD": "41.5"})
+    product = Product(name="Ноутбук", price=Decimal("0"), product_url="https://www.olx.ua/test")
+    
+    normalizer.apply(product, normalizer.normalize("$100 Договірна"))
+    
+    assert product.price == Decimal("4150.00")
+    assert product.currency == "UAH"
+    assert product.attributes["original_currency"] == "USD"
+    assert product.attributes["negotiable"] is True
+
+def test_olx_card_price_extraction():
+    """Тестує витягування ціни з картки OLX"""
+    html = """
+    <div data-cy="l-card">
+        <a href="/uk/obyavlenie/iphone-14-IDabc.html"><h6>iPhone 14</h6></a>
+        <p data-testid="ad-price">$650<span>Договірна</span></p>
+    </div>
+    """
+    parser = OlxPriceParser(ParserConfig(base_url="https://www.olx.ua", log_file=""))
+    element = BeautifulSoup(html, 'html.parser').find('div')
+    product = parser.extract_product_data_from_element(element, "https://www.olx.ua")
+    
+    assert product.price == Decimal("650")
+    assert product.currency == "USD"
+    assert product.attributes["negotiable"] is True
+    assert product.sku == "iphone-14-IDabc.html"
+
+def test_card_without_price_ignores_digits_in_title():
+    """Тестує, що без вузла ціни цифри з назви не стають ціною"""
+    parser = OlxPriceParser(ParserConfig(base_url="https://www.olx.ua", log_file=""))
+    
+    def extract(html):
+        element = BeautifulSoup(html, 'html.parser').find('div')
+        return parser.extract_product_data_from_element(element, "https://www.olx.ua")
+    
+    no_price = extract("""
+    <div data-cy="l-card">
+        <a href="/uk/obyavlenie/iphone-13-IDdef.html"><h6>iPhone 13 128 ГБ 2022 року, 87% батарея</h6></a>
+        <p>Київ, Оболонський - 12 травня</p>
+    </div>
+    """)
+    assert no_price.price == Decimal("0")
+    
+    # Ціна поза вузлом ad-price, але з позначкою валюти, знаходиться як і раніше
+    marked = extract("""
+    <div data-cy="l-card">
+        <a href="/uk/obyavlenie/iphone-13-IDdef.html"><h6>iPhone 13 128 ГБ за 500 $</h6></a>
+        <span>15 500 грн.</span>
+    </div>
+    """)
+    assert marked.price == Decimal("15500")
+    assert marked.currency == "UAH"
+
+if __name__ == "__main__":
+    test_currencies_and_markers()
+    test_batch_uses_cache_for_repeated_strings()
+    test_conversion_to_base_currency()
+    test_olx_card_price_extraction()
+    test_card_without_price_ignores_digits_in_title()
+    print("✅ Всі тести нормалізації цін пройдено")
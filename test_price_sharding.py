@@ -0,0 +1,130 @@
+"""
+Тестовий файл для перевірки розбиття категорій на цінові діапазони
+"""
+import asyncio
+import os
+import sys
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import ParserConfig
+from crawl_budget import ListingPage
+from models import Product
+from olx_parser import OlxPriceParser
+from price_sharding import (
+    PRICE_FROM_PARAM, PRICE_TO_PARAM, PriceShardPlanner, build_price_filter_url, merge_unique_products
+)
+
+LISTING_URL = "https://www.olx.ua/uk/elektronika/?page=3&search%5Border%5D=created_at:desc"
+
+def price_range(url: str):
+    query = parse_qs(urlsplit(url).query)
+    price_to = query.get(PRICE_TO_PARAM)
+    return Decimal(query[PRICE_FROM_PARAM][0]), Decimal(price_to[0]) if price_to else None
+
+def make_counter(prices, requested):
+    """Фальшива кількість оголошень: фільтр ціни включає обидві межі, як на OLX"""
+    async def count_listings(url: str):
+        requested.append(url)
+        price_from, price_to = price_range(url)
+        return sum(1 for price in prices if price >= price_from and (price_to is None or price <= price_to))
+    return count_listings
+
+def plan(prices, capacity, **kwargs):
+    requested = []
+    planner = PriceShardPlanner(make_counter(prices, requested), capacity=capacity, **kwargs)
+    return asyncio.run(planner.plan(LISTING_URL)), requested
+
+def covered(shards, price):
+    return any(shard.price_from <= price and (shard.price_to is None or price <= shard.price_to) for shard in shards)
+
+def test_filter_url_replaces_page_and_price():
+    """Тестує, що фільтр ціни замінює попередній і скидає номер сторінки"""
+    url = build_price_filter_url(build_price_filter_url(LISTING_URL, 10, 20), 100, None)
+
+    assert price_range(url) == (Decimal("100"), None)
+    query = parse_qs(urlsplit(url).query)
+    assert "page" not in query
+    assert query["search[order]"] == ["created_at:desc"]
+
+def test_plan_fits_capacity_and_covers_fractional_prices():
+    """Тестує, що діапазони вміщуються в ліміт і не гублять дробові ціни на межах"""
+    prices = [Decimal(value) for value in range(1, 2000, 7)]
+    # Дробові ціни між цілими числами, зокрема поруч з межами ділення
+    prices += [Decimal(value) + Decimal("0.5") for value in range(1, 2000, 13)]
+    prices += [Decimal("25000000")]                           # Дорожче за max_price
+    shards, requested = plan(prices, capacity=40, max_price=5000)
+
+    assert all(shard.listing_count <= 40 for shard in shards)
+    assert all(covered(shards, price) for price in prices)
+    assert shards[-1].price_to is None and shards[-1].listing_count == 1
+    # Сусідні діапазони мають спільну межу
+    for left, right in zip(shards, shards[1:-1]):
+        assert left.price_to == right.price_from
+    assert len(requested) > len(shards)
+
+def test_boundary_listings_merged_once():
+    """Тестує, що оголошення на спільній межі після обходу залишається одне"""
+    product = Product(name="Навушники", price=Decimal("500"), product_url="https://www.olx.ua/d/uk/obyavlenie/a.html",
+                      sku="a")
+    other = Product(name="Колонка", price=Decimal("700"), product_url="https://www.olx.ua/d/uk/obyavlenie/b.html")
+
+    assert merge_unique_products([[product], [product, other], [other]]) == [product, other]
+
+def test_empty_ranges_dropped_and_dense_range_kept():
+    """Тестує, що порожні діапазони пропускаються, а щільний діапазон лишається цілим"""
+    prices = [Decimal("100.25")] * 30 + [Decimal("100.75")] * 30 + [Decimal("3000")]
+    shards, _ = plan(prices, capacity=20, max_price=5000)
+
+    assert all(shard.listing_count for shard in shards)
+    assert all(covered(shards, price) for price in prices)
+    # Діапазон від 100 до 101 не ділиться на менші цілі діапазони
+    dense = [shard for shard in shards if shard.listing_count > 20]
+    assert [(shard.price_from, shard.price_to) for shard in dense] == [(100, 101)]
+
+def test_max_depth_stops_splitting():
+    """Тестує, що глибина ділення обмежена max_depth"""
+    prices = [Decimal(value) for value in range(0, 1000)]
+    shards, _ = plan(prices, capacity=5, max_price=1000, max_depth=3)
+
+    assert max(shard.depth for shard in shards) == 3
+    assert all(covered(shards, price) for price in prices)
+
+class ShardedParser(OlxPriceParser):
+    """Видача без мережі: кожен ціновий діапазон - одна сторінка з оголошеннями в ньому"""
+
+    # 423 та 651 - спільні межі сусідніх діапазонів
+    PRICES = [100, 200, 300, 400, 423, 500, 651, 800]
+
+    async def count_listings(self, url: str):
+        return await make_counter(self.PRICES, [])(url)
+
+    async def fetch_listing_page(self, listing_url: str, page: int):
+        price_from, price_to = price_range(listing_url)
+        return ListingPage(products=[
+            Product(name=f"Товар {price}", price=Decimal(price), sku=str(price),
+                    product_url=f"https://www.olx.ua/d/uk/obyavlenie/{price}.html")
+            for price in self.PRICES if price >= price_from and (price_to is None or price <= price_to)
+        ])
+
+def test_boundary_listings_counted_once_in_price_stats():
+    """Тестує, що статистика цін рахується після об'єднання діапазонів"""
+    parser = ShardedParser(ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                                        delay_between_requests=0, shard_max_price=1000))
+    products = asyncio.run(parser.crawl_price_shards(LISTING_URL, "Електроніка", capacity=3))
+
+    assert sorted(product.price for product in products) == [Decimal(price) for price in ShardedParser.PRICES]
+    summary = parser.price_stats.to_dict()["summary"]["Електроніка"]["UAH"]
+    assert summary["count"] == len(ShardedParser.PRICES)
+
+if __name__ == "__main__":
+    test_filter_url_replaces_page_and_price()
+    test_plan_fits_capacity_and_covers_fractional_prices()
+    test_boundary_listings_merged_once()
+    test_empty_ranges_dropped_and_dense_range_kept()
+    test_max_depth_stops_splitting()
+    test_boundary_listings_counted_once_in_price_stats()
+    print("✅ Всі тести розбиття за ціною пройдено")
@@ -0,0 +1,52 @@
+"""
+Тестовий файл для перевірки потокової статистики цін
+"""
+import os
+import sys
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from models import ParsingResult, Product
+from price_stats import PriceStatsCollector, TDigest
+
+def products(prices):
+    return [Product(name=f"Товар {i}", price=Decimal(str(p)), product_url=f"u{i}") for i, p in enumerate(prices)]
+
+def test_tdigest_quantiles_close_to_exact():
+    """Тестує, що квантилі t-digest, зібраного посторінково, близькі до точних"""
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(8, 1.2, 200_000)
+    digest = TDigest()
+    for page in np.array_split(values, 4000):
+        digest.update(page)
+
+    assert digest.count == values.size
+    assert len(digest.means) < 200
+    for estimate, exact in zip(digest.quantiles([0.05, 0.5, 0.95]), np.quantile(values, [0.05, 0.5, 0.95])):
+        assert abs(estimate - exact) / exact < 0.03
+
+def test_merged_collectors_match_single_collector():
+    """Тестує об'єднання статистики кількох сайтів (ціна 0 не враховується)"""
+    first = PriceStatsCollector()
+    first.consume("Телефони", products([100, 200, 0, 300]))
+    second = PriceStatsCollector()
+    second.consume("Телефони", products([400, 500]))
+
+    merged = ParsingResult.merge({
+        "a": ParsingResult(success=True, price_stats=first.to_dict()),
+        "b": ParsingResult(success=True, price_stats=second.to_dict()),
+    })
+    summary = merged.price_stats["summary"]["Телефони"]["UAH"]
+    assert summary["count"] == 5
+    assert summary["min"] == 100 and summary["max"] == 500
+    assert summary["mean"] == 300
+    assert abs(summary["p50"] - 300) < 1e-6
+
+if __name__ == "__main__":
+    test_tdigest_quantiles_close_to_exact()
+    test_merged_collectors_match_single_collector()
+    print("✅ Всі тести статистики цін пройдено")
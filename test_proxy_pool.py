@@ -0,0 +1,82 @@
+"""
+Тестовий файл для перевірки пулу проксі з локальними проксі-заглушками
+"""
+import asyncio
+import os
+import random
+import sys
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from http_client import FetchClient
+from proxy_pool import IdentityPool
+from stub_server import free_port, start_server
+
+async def _start_stub_proxy(name: str, hits: dict, status: int = 200):
+    """Запускає локальну заглушку проксі, що відповідає замість цільового сайту"""
+    async def handler(request: web.Request) -> web.Response:
+        hits[name] = hits.get(name, 0) + 1
+        hits.setdefault("user_agents", set()).add(request.headers.get("User-Agent"))
+        return web.Response(text=f"<html>{name}</html>", status=status, content_type="text/html")
+    
+    return await start_server(handler)
+
+async def _run_rotation():
+    hits = {}
+    runners = []
+    proxy_urls = []
+    for name, status in (("fast", 200), ("blocked", 429)):
+        runner, proxy_url = await _start_stub_proxy(name, hits, status)
+        runners.append(runner)
+        proxy_urls.append(proxy_url)
+    # Проксі, на якому нічого не слухає
+    proxy_urls.append(f"http://127.0.0.1:{free_port()}")
+    
+    pool = IdentityPool(
+        proxies=proxy_urls,
+        user_agents=["UA-1", "UA-2"],
+        quarantine_seconds=300,
+        failure_threshold=2,
+        rng=random.Random(7)
+    )
+    client = FetchClient(max_concurrency=4, identity_pool=pool)
+    try:
+        for _ in range(40):
+            await client.fetch("http://olx.test/uk/elektronika/")
+    finally:
+        await client.close()
+        for runner in runners:
+            await runner.cleanup()
+    return pool, hits
+
+def test_rotation_quarantines_bad_proxies():
+    """Заблокований проксі йде на карантин, навантаження переходить на робочий"""
+    pool, hits = asyncio.run(_run_rotation())
+    states = {state["url"]: state for state in pool.metrics()}
+    fast_url, blocked_url, dead_url = (proxy.url for proxy in pool.proxies)
+    
+    assert states[blocked_url]["quarantined"]
+    assert states[dead_url]["successes"] == 0
+    assert not states[fast_url]["quarantined"]
+    assert states[fast_url]["score"] > states[dead_url]["score"]
+    assert hits["fast"] > 30
+    assert hits["user_agents"] == {"UA-1", "UA-2"}
+
+def test_session_rotation_keeps_user_agent_per_proxy():
+    """При ротації на сесію проксі зберігає свій User-Agent"""
+    pool = IdentityPool(proxies=["http://p1", "http://p2"], user_agents=["A", "B", "C"],
+                        rotation="session", rng=random.Random(1))
+    seen = {}
+    for _ in range(50):
+        identity = pool.acquire()
+        seen.setdefault(identity.proxy_url, set()).add(identity.user_agent)
+    
+    assert all(len(agents) == 1 for agents in seen.values())
+
+if __name__ == "__main__":
+    test_rotation_quarantines_bad_proxies()
+    test_session_rotation_keeps_user_agent_per_proxy()
+    print("✅ Всі тести пулу проксі пройдено")
@@ -0,0 +1,103 @@
+"""
+Тестовий файл для перевірки індексу запитів до зібраних товарів
+"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import ParsingResult, Product
+from query_index import ProductIndex, Query
+from snapshot import write_snapshot
+import cli
+
+START = datetime(2024, 5, 1, 12, 0)
+
+def make_products():
+    items = [
+        ("iPhone 13 128GB", "14500", "Телефони", "UAH", True),
+        ("iPhone 12 mini", "9999", "Телефони", "UAH", True),
+        ("Чохол для iPhone 13", "350", "Аксесуари для телефонів", "UAH", True),
+        ("iPhone 14 Pro", "32000", "Телефони", "UAH", True),
+        ("Samsung Galaxy S21", "12000", "Телефони", "UAH", False),
+        ("iPhone 11", "300", "Телефони", "USD", True),
+        ("Диван кутовий", "9000", "Меблі", "UAH", True),
+    ]
+    return [
+        Product(name=name, price=Decimal(price), product_url=f"https://www.olx.ua/d/uk/obyavlenie/{position}.html",
+                category=category, currency=currency, availability=available,
+                parsed_at=START + timedelta(minutes=position))
+        for position, (name, price, category, currency, available) in enumerate(items)
+    ]
+
+def names(index, result):
+    return [index.name(row) for row in result.rows]
+
+def test_keyword_and_price_range_newest_first():
+    index = ProductIndex.from_products(make_products())
+
+    result = index.search(Query(text="iphone", max_price=15000, currency="UAH", sort="newest"))
+    assert names(index, result) == ["Чохол для iPhone 13", "iPhone 12 mini", "iPhone 13 128GB"]
+    assert result.total == 3
+
+    result = index.search(Query(text="iPhone 13", limit=1))
+    assert names(index, result) == ["Чохол для iPhone 13"] and result.total == 2
+    assert names(index, index.search(Query(text="iPhone 13", category="телефони"))) == ["iPhone 13 128GB"]
+    assert index.search(Query(category="Телефони", sort="-price", limit=2)).rows.tolist() == [3, 0]
+    assert names(index, index.search(Query(min_price=9000, max_price=12000, available_only=True))) == [
+        "Диван кутовий", "iPhone 12 mini"
+    ]
+    assert index.search(Query(text="nokia")).total == 0
+    assert index.product(int(index.search(Query(text="диван")).rows[0])).price == Decimal("9000")
+
+def test_top_k_matches_full_sort():
+    products = make_products()
+    index = ProductIndex.from_products(products)
+    for sort, key in (("price", lambda p: p.price), ("oldest", lambda p: p.parsed_at)):
+        expected = sorted(products, key=key)[:4]
+        assert [product.name for product in index.products(index.search(Query(sort=sort, limit=4)).rows)] == [
+            product.name for product in expected
+        ]
+
+def test_stored_runs_keep_newest_version(tmp_path):
+    products = make_products()
+    older = ParsingResult(success=True, products=products, total_products=len(products))
+    with open(tmp_path / "olx_old_full.json", 'w', encoding='utf-8') as f:
+        json.dump(older.to_dict(), f, ensure_ascii=False)
+
+    # Пізніший запуск: ціна першого оголошення знизилась
+    newer_product = Product(name="iPhone 13 128GB", price=Decimal("13900"), product_url=products[0].product_url,
+                            category="Телефони", parsed_at=START + timedelta(days=1))
+    write_snapshot(ParsingResult(success=True, products=[newer_product], total_products=1),
+                   str(tmp_path / "olx_new.olxsnap"))
+
+    index = ProductIndex.from_files([str(tmp_path / "olx_old_full.json"), str(tmp_path / "olx_new.olxsnap")])
+    assert len(index) == len(products)
+    result = index.search(Query(text="iphone 13 128gb"))
+    assert [product.price for product in index.products(result.rows)] == [Decimal("13900")]
+
+def test_cli_query(tmp_path, capsys):
+    products = make_products()
+    with open(tmp_path / "olx_телефони_full.json", 'w', encoding='utf-8') as f:
+        json.dump(ParsingResult(success=True, products=products, total_products=len(products)).to_dict(), f,
+                  ensure_ascii=False)
+
+    exit_code = cli.run(["--log-level", "WARNING", "query", str(tmp_path / "olx_телефони_full.json"),
+                         "--text", "iphone", "--max-price", "15000", "--currency", "UAH", "--json"])
+    output = json.loads(capsys.readouterr().out)
+    assert exit_code == 0
+    assert output["total"] == 3
+    assert [item["name"] for item in output["products"]] == ["Чохол для iPhone 13", "iPhone 12 mini", "iPhone 13 128GB"]
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_keyword_and_price_range_newest_first()
+    test_top_k_matches_full_sort()
+    with tempfile.TemporaryDirectory() as directory:
+        test_stored_runs_keep_newest_version(pathlib.Path(directory))
+    print("✅ Всі тести індексу запитів пройдено")
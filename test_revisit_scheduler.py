@@ -0,0 +1,122 @@
+"""
+Тестовий файл для перевірки адаптивного планувальника повторних обходів
+"""
+import asyncio
+import os
+import sys
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import Category, Product
+from revisit_scheduler import RevisitScheduler
+
+NOW = 1_700_000_000.0
+HOUR = 3600.0
+
+def categories(*names):
+    return [Category(name=name, url=f"https://www.olx.ua/uk/{name}/") for name in names]
+
+def products(*skus):
+    return [Product(name=f"Оголошення {sku}", price=Decimal("100"), product_url=f"https://www.olx.ua/d/uk/{sku}.html",
+                    sku=sku) for sku in skus]
+
+def make_scheduler(*names, **kwargs):
+    return RevisitScheduler(None, categories(*names), **kwargs)
+
+def visited(scheduler, name, rate, hours_ago):
+    state = scheduler.states[f"https://www.olx.ua/uk/{name}/"]
+    state.new_ads_per_hour = rate
+    state.visits = 1
+    state.last_visit = NOW - hours_ago * HOUR
+    return state
+
+def test_page_depth_follows_expected_new_ads():
+    """Тестує глибину обходу за очікуваною кількістю нових оголошень"""
+    scheduler = make_scheduler("a", "b", "c", "d")
+
+    assert scheduler.page_depth(scheduler.states["https://www.olx.ua/uk/a/"], NOW) == 1
+    assert scheduler.page_depth(visited(scheduler, "b", rate=100, hours_ago=3), NOW) == 6
+    assert scheduler.page_depth(visited(scheduler, "c", rate=10000, hours_ago=10), NOW) == 25
+    assert scheduler.page_depth(visited(scheduler, "d", rate=1, hours_ago=1), NOW) == 1
+
+def test_plan_prefers_new_and_busy_categories_within_budget():
+    """Тестує вибір категорій: спершу нові, далі за очікуваними змінами, в межах бюджету"""
+    scheduler = make_scheduler("new", "busy", "recent", "quiet")
+    busy = visited(scheduler, "busy", rate=100, hours_ago=1)
+    visited(scheduler, "recent", rate=100, hours_ago=60 / HOUR)    # Інтервал 720 сек ще не минув
+    visited(scheduler, "quiet", rate=1, hours_ago=5)              # Інтервал 20 год ще не минув
+    new = scheduler.states["https://www.olx.ua/uk/new/"]
+
+    assert scheduler.plan(NOW, budget=10) == [(new, 1), (busy, 2)]
+    # Глибина зменшується до залишку бюджету
+    assert scheduler.plan(NOW, budget=4) == [(new, 1), (busy, 1)]
+    assert scheduler.plan(NOW, budget=3) == [(new, 1)]
+
+def test_record_visit_updates_rate_and_seen_set():
+    """Тестує оцінку швидкості (EWMA) та ковзну множину побачених оголошень"""
+    scheduler = make_scheduler("a", smoothing=0.3, seen_limit=4)
+    state = scheduler.states["https://www.olx.ua/uk/a/"]
+
+    # Перший обхід лише запам'ятовує оголошення
+    assert len(scheduler.record_visit(state, products("1", "2", "3"), depth=1, now=NOW)) == 3
+    assert state.new_ads_per_hour is None and state.visits == 1
+
+    new = scheduler.record_visit(state, products("2", "3", "4", "5"), depth=1, now=NOW + 2 * HOUR)
+    assert [product.sku for product in new] == ["4", "5"]
+    assert state.new_ads_per_hour == 1.0
+    assert list(state.seen_skus) == ["2", "3", "4", "5"]
+
+    # Всі оголошення нові - швидкість недооцінена, спостереження подвоюється
+    scheduler.record_visit(state, products("6", "7", "8", "9"), depth=1, now=NOW + 3 * HOUR)
+    assert abs(state.new_ads_per_hour - (0.3 * 8 + 0.7 * 1.0)) < 1e-9
+    assert state.visits == 3 and state.last_visit == NOW + 3 * HOUR
+
+def test_visit_reports_new_products():
+    """Тестує обхід категорії парсером та передачу нових оголошень"""
+    class StubParser:
+        def __init__(self):
+            self.calls = []
+
+        async def get_products_from_category(self, category, max_pages=None):
+            self.calls.append((category.name, max_pages))
+            return products("1", "2")
+
+    reported = []
+
+    async def on_new_products(category, new_products):
+        reported.append((category.name, [product.sku for product in new_products]))
+
+    parser = StubParser()
+    scheduler = RevisitScheduler(parser, categories("a"), on_new_products=on_new_products)
+    state = scheduler.states["https://www.olx.ua/uk/a/"]
+    asyncio.run(scheduler.visit(state, 3))
+    asyncio.run(scheduler.visit(state, 1))
+
+    assert parser.calls == [("a", 3), ("a", 1)]
+    assert reported == [("a", ["1", "2"])]
+
+def test_state_limited_to_requested_categories(tmp_path):
+    """Тестує, що з диска завантажуються лише запитані категорії"""
+    state_path = str(tmp_path / "revisit_state.json")
+    scheduler = make_scheduler("old", "kept", state_path=state_path)
+    visited(scheduler, "old", rate=50, hours_ago=1)
+    visited(scheduler, "kept", rate=5, hours_ago=2)
+    scheduler.save_state()
+
+    scheduler = make_scheduler("kept", "added", state_path=state_path)
+    assert sorted(state.name for state in scheduler.states.values()) == ["added", "kept"]
+    assert scheduler.states["https://www.olx.ua/uk/kept/"].new_ads_per_hour == 5
+    assert all(state.name != "old" for state, _ in scheduler.plan(NOW, budget=100))
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_page_depth_follows_expected_new_ads()
+    test_plan_prefers_new_and_busy_categories_within_budget()
+    test_record_visit_updates_rate_and_seen_set()
+    test_visit_reports_new_products()
+    with tempfile.TemporaryDirectory() as directory:
+        test_state_limited_to_requested_categories(pathlib.Path(directory))
+    print("✅ Всі тести планувальника повторних обходів пройдено")
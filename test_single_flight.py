@@ -0,0 +1,121 @@
+"""
+Тестовий файл для перевірки об'єднання одночасних запитів сторінок
+"""
+import asyncio
+import os
+import sys
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from config import ParserConfig
+from olx_parser import OlxPriceParser
+from single_flight import SingleFlight, normalize_url
+from stub_server import start_server
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://WWW.OLX.UA:443/uk/elektronika/?b=2&a=1#top") == \
+        "https://www.olx.ua/uk/elektronika/?a=1&b=2"
+    assert normalize_url("http://127.0.0.1:8080") == "http://127.0.0.1:8080/"
+    assert normalize_url("https://www.olx.ua/uk/?page=2") != normalize_url("https://www.olx.ua/uk/?page=3")
+
+async def _fetch_concurrently(ttl: float):
+    hits = []
+
+    async def handler(request: web.Request) -> web.Response:
+        hits.append(request.path_qs)
+        await asyncio.sleep(0.1)
+        return web.Response(text=f"<html><body><h1>{request.path}</h1></body></html>", content_type="text/html")
+
+    runner, base = await start_server(handler)
+
+    config = ParserConfig(base_url=base, log_level="WARNING", log_file="", delay_between_requests=0,
+                          page_cache_ttl=ttl)
+    try:
+        async with OlxPriceParser(config) as parser:
+            soups = await asyncio.gather(
+                parser.fetch_page(f"{base}/uk/"),
+                parser.fetch_page(f"{base}/uk/#categories"),
+                parser.fetch_page(f"{base}/uk/"),
+                parser.fetch_page(f"{base}/uk/elektronika/")
+            )
+            # Майже одночасний повтор
+            repeat = await parser.fetch_page(f"{base}/uk/")
+            metrics = parser.get_metrics()["single_flight"]
+    finally:
+        await runner.cleanup()
+    return soups, repeat, hits, metrics
+
+def test_concurrent_requests_share_one_fetch():
+    soups, repeat, hits, metrics = asyncio.run(_fetch_concurrently(ttl=5.0))
+
+    assert sorted(hits) == ["/uk/", "/uk/elektronika/"]
+    assert soups[0] is soups[1] is soups[2] is repeat
+    assert soups[3].h1.get_text() == "/uk/elektronika/"
+    assert metrics["fetches"] == 2 and metrics["coalesced"] == 2 and metrics["cache_hits"] == 1
+
+def test_without_cache_repeat_fetches_again():
+    soups, repeat, hits, metrics = asyncio.run(_fetch_concurrently(ttl=0))
+
+    assert sorted(hits) == ["/uk/", "/uk/", "/uk/elektronika/"]
+    assert soups[0] is soups[2] and repeat is not soups[0]
+    assert metrics["cache_hits"] == 0
+
+async def _cancel_leader():
+    flight = SingleFlight(ttl=5.0)
+    calls = []
+
+    async def fetch():
+        calls.append(len(calls))
+        await asyncio.sleep(0.05)
+        return f"результат {len(calls)}"
+
+    leader = asyncio.ensure_future(flight.run("https://www.olx.ua/uk/", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.run("https://www.olx.ua/uk/", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    return await follower, calls
+
+def test_follower_retries_after_leader_cancelled():
+    result, calls = asyncio.run(_cancel_leader())
+
+    assert result == "результат 2"
+    assert len(calls) == 2
+
+async def _cancel_leader_and_follower():
+    flight = SingleFlight(ttl=5.0)
+    calls = []
+
+    async def fetch():
+        calls.append(len(calls))
+        await asyncio.sleep(0.05)
+        return "результат"
+
+    leader = asyncio.ensure_future(flight.run("https://www.olx.ua/uk/", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.run("https://www.olx.ua/uk/", fetch))
+    await asyncio.sleep(0.01)
+    # Дедлайн обходу скасовує всі задачі одночасно
+    leader.cancel()
+    follower.cancel()
+    results = await asyncio.gather(leader, follower, return_exceptions=True)
+    await asyncio.sleep(0.1)
+    return results, calls, flight
+
+def test_cancelled_follower_does_not_refetch():
+    results, calls, flight = asyncio.run(_cancel_leader_and_follower())
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert len(calls) == 1
+    assert flight.metrics["fetches"] == 1 and not flight._in_flight
+
+if __name__ == "__main__":
+    test_normalize_url()
+    test_concurrent_requests_share_one_fetch()
+    test_without_cache_repeat_fetches_again()
+    test_follower_retries_after_leader_cancelled()
+    test_cancelled_follower_does_not_refetch()
+    print("✅ Всі тести об'єднання запитів пройдено")
@@ -0,0 +1,62 @@
+"""
+Тестовий файл для перевірки колонкового знімка результатів
+"""
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import Category, ParsingResult, Product
+from snapshot import SnapshotReader, load_result, write_snapshot
+
+def make_result():
+    products = [
+        Product(name="iPhone 13 128GB", price=Decimal("25000.50"), product_url="https://www.olx.ua/d/uk/obyavlenie/1",
+                sku="1", category="Телефони", rating=4.5, attributes={"стан": "вживаний"},
+                parsed_at=datetime(2024, 5, 1, 12, 30)),
+        Product(name="Samsung Galaxy S21", price=Decimal("0"), product_url="https://www.olx.ua/d/uk/obyavlenie/2",
+                availability=False, sku="2", category="Телефони", currency="USD"),
+        Product(name="Xiaomi Redmi Note 12", price=Decimal("7999"), product_url="https://www.olx.ua/d/uk/obyavlenie/3",
+                sku="3", category="Телефони"),
+    ]
+    return ParsingResult(
+        success=True, products=products, total_products=len(products),
+        categories=[Category(name="Телефони", url="https://www.olx.ua/uk/elektronika/telefony/")],
+        metrics={"fetch": {"requests": 3}}
+    )
+
+def test_snapshot_round_trip(tmp_path):
+    """Тестує, що знімок відновлює товари, категорії та метрики"""
+    result = make_result()
+    path = write_snapshot(result, str(tmp_path / "run.olxsnap"))
+
+    loaded = load_result(path)
+    # Ціна зберігається в копійках, тож порівнюємо значення, а не запис Decimal
+    assert [product.price for product in loaded.products] == [product.price for product in result.products]
+    assert ([dict(product.to_dict(), price=None) for product in loaded.products]
+            == [dict(product.to_dict(), price=None) for product in result.products])
+    assert loaded.categories[0].url == result.categories[0].url
+    assert loaded.metrics == result.metrics
+
+def test_snapshot_filter_by_price(tmp_path):
+    """Тестує фільтр ціни та читання окремих рядків без відновлення всіх товарів"""
+    path = write_snapshot(make_result(), str(tmp_path / "run.olxsnap"))
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 3
+        indices = reader.filter_price(min_price=1, max_price=10000)
+        assert reader.strings("name", indices) == ["Xiaomi Redmi Note 12"]
+        assert reader.available.tolist() == [True, False, True]
+        assert reader.product(0).price == Decimal("25000.50")
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as directory:
+        test_snapshot_round_trip(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_snapshot_filter_by_price(pathlib.Path(directory))
+    print("✅ Всі тести колонкового знімка пройдено")
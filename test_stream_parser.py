@@ -0,0 +1,97 @@
+"""
+Тестовий файл для перевірки потокового розбору сторінок видачі
+"""
+import asyncio
+import json
+import os
+import sys
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from bs4 import BeautifulSoup
+
+from config import ParserConfig
+from olx_parser import OlxPriceParser
+from stream_parser import StreamingListingParser
+from stub_server import start_server
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+
+def _stream_page(parser: OlxPriceParser, data: bytes, chunk_size: int = 1024):
+    stream = StreamingListingParser()
+    elements = []
+    fed = 0
+    while fed < len(data) and not stream.done:
+        elements.extend(stream.feed(data[fed:fed + chunk_size]))
+        fed += chunk_size
+    if not stream.done:
+        elements.extend(stream.close())
+    return parser.extract_products_from_elements(elements, parser.config.base_url), stream.result
+
+def test_streamed_cards_match_golden():
+    parser = OlxPriceParser(ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file=""))
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        with open(os.path.join(CORPUS_DIR, name), 'rb') as f:
+            data = f.read()
+        with open(os.path.join(GOLDEN_DIR, name.replace('.html', '.json')), encoding='utf-8') as f:
+            golden = json.load(f)
+
+        products, listing = _stream_page(parser, data)
+
+        assert listing.cards == golden["cards"], name
+        assert [(product.name, str(product.price), product.sku) for product in products] == [
+            (item["name"], item["price"], item["sku"]) for item in golden["products"] if item is not None
+        ], name
+        assert listing.next_page_url == golden["next_page"], name
+        # Після пагінації решта сторінки вже не читається
+        assert listing.pagination_seen and not listing.complete, name
+
+async def _run_crawl(stream: bool):
+    with open(os.path.join(CORPUS_DIR, "dom_i_sad_page7.html"), encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    cards = ''.join(str(card) for card in soup.select('div[data-cy="l-card"]')[:5])
+    padding = '<div class="css-footer">' + 'x' * 200_000 + '</div>'
+
+    async def handler(request: web.Request) -> web.Response:
+        page = int(request.query.get("page", 1))
+        forward = f'<a data-testid="pagination-forward" href="/uk/list/?page={page + 1}"></a>' if page < 3 else ''
+        html = (f'<html><body><div data-testid="listing-grid">{cards}</div>'
+                f'<div data-testid="pagination-wrapper"><ul data-testid="pagination-list"></ul>{forward}</div>'
+                f'{padding}</body></html>')
+        return web.Response(text=html, content_type="text/html")
+
+    runner, base_url = await start_server(handler)
+
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="",
+                          delay_between_requests=0, stream_listing_pages=stream)
+    try:
+        async with OlxPriceParser(config) as parser:
+            products = await parser.crawl_listing(f"{base_url}/uk/list/", "Дім і сад")
+            metrics = dict(parser.get_fetch_client().metrics)
+    finally:
+        await runner.cleanup()
+    return products, metrics
+
+def _fields(product):
+    data = product.to_dict()
+    data.pop("parsed_at")
+    return data
+
+def test_streamed_crawl_matches_buffered_and_stops_early():
+    buffered, buffered_metrics = asyncio.run(_run_crawl(stream=False))
+    streamed, streamed_metrics = asyncio.run(_run_crawl(stream=True))
+
+    assert len(streamed) == 15
+    assert [_fields(product) for product in streamed] == [_fields(product) for product in buffered]
+    assert streamed_metrics["streamed"] == 3
+    assert streamed_metrics["stream_early_stops"] == 3
+    assert streamed_metrics["bytes"] < buffered_metrics["bytes"] / 2
+
+if __name__ == "__main__":
+    test_streamed_cards_match_golden()
+    test_streamed_crawl_matches_buffered_and_stops_early()
+    print("✅ Всі тести потокового розбору пройдено")
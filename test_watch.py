@@ -0,0 +1,120 @@
+"""
+Тестовий файл для перевірки стеження за першою сторінкою видачі
+"""
+import asyncio
+import json
+import os
+import sys
+
+# Додаємо поточну директорію до шляху
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+
+from config import ParserConfig
+from olx_parser import OlxPriceParser
+from stub_server import start_server
+from watch import JsonlSink, ListingWatcher, UnixSocketSink
+
+def _card(ad_id: str, title: str, price: str) -> str:
+    return (f'<div data-cy="l-card"><a href="/d/uk/obyavlenie/{ad_id}.html"><h6>{title}</h6></a>'
+            f'<p data-testid="ad-price">{price}</p></div>')
+
+async def _run_watch(tmp_path):
+    page = {"cards": [_card("a-1", "iPhone 12", "9 000 грн."), _card("a-2", "iPhone 13", "12 000 грн.")], "version": 1}
+    statuses = []
+    
+    async def handler(request: web.Request) -> web.Response:
+        etag = f'"v{page["version"]}"'
+        if request.headers.get("If-None-Match") == etag:
+            statuses.append(304)
+            return web.Response(status=304)
+        statuses.append(200)
+        html = f'<div data-testid="listing-grid">{"".join(page["cards"])}</div>'
+        return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+    
+    runner, base_url = await start_server(handler)
+    
+    received = []
+    async def on_client(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            received.append(json.loads(line))
+    socket_path = str(tmp_path / "watch.sock")
+    socket_server = await asyncio.start_unix_server(on_client, path=socket_path)
+    
+    url = f"{base_url}/uk/list/q-iphone/"
+    jsonl_path = str(tmp_path / "new.jsonl")
+    config = ParserConfig(base_url="https://www.olx.ua", log_level="WARNING", log_file="")
+    try:
+        async with OlxPriceParser(config) as parser:
+            watcher = ListingWatcher(parser, [url], [JsonlSink(jsonl_path), UnixSocketSink(socket_path)])
+            target = watcher.targets[url]
+            
+            first = await watcher.poll(target)           # заповнює множину побачених
+            unchanged = await watcher.poll(target)       # 304 Not Modified
+            page["cards"].insert(0, _card("a-3", "iPhone 14", "20 000 грн."))
+            page["version"] = 2
+            new = await watcher.poll(target)
+            await watcher.dispatch(target, new)
+            for sink in watcher.sinks:
+                await sink.close()
+            await asyncio.sleep(0.1)
+    finally:
+        socket_server.close()
+        await runner.cleanup()
+    
+    with open(jsonl_path, encoding='utf-8') as f:
+        written = [json.loads(line) for line in f]
+    return first, unchanged, new, statuses, written, received, watcher
+
+def test_watch_emits_only_new_listings(tmp_path):
+    first, unchanged, new, statuses, written, received, watcher = asyncio.run(_run_watch(tmp_path))
+    
+    assert first == [] and unchanged == []
+    assert statuses == [200, 304, 200]
+    assert [product.sku for product in new] == ["a-3.html"]
+    assert [record["name"] for record in written] == ["iPhone 14"]
+    assert [record["name"] for record in received] == ["iPhone 14"]
+    assert watcher.metrics["not_modified"] == 1
+    assert watcher.metrics["new_listings"] == 1
+
+class RoundWatcher(ListingWatcher):
+    """Опитування без мережі: кожен URL щоразу бачить нове оголошення"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stop_event = asyncio.Event()
+        self.saved_before_stop = []
+
+    async def poll(self, target):
+        target.polls += 1
+        target.remember(f"{target.url}#{target.polls}", self.seen_limit)
+        if target.polls == 2:
+            self.saved_before_stop.append(os.path.exists(self.state_path))
+            if len(self.saved_before_stop) == len(self.targets):
+                self.stop_event.set()
+        return []
+
+def test_watch_saves_state_after_each_round(tmp_path):
+    """Тестує збереження стану після раунду опитувань, а не лише при зупинці"""
+    state_path = str(tmp_path / "watch_state.json")
+    urls = ["https://www.olx.ua/uk/a/", "https://www.olx.ua/uk/b/"]
+    watcher = RoundWatcher(None, urls, [], interval=0.05, state_path=state_path)
+    
+    asyncio.run(watcher.run_forever(watcher.stop_event))
+    
+    assert watcher.saved_before_stop == [True, True]
+    restored = ListingWatcher(None, urls, [], state_path=state_path)
+    assert all(restored.targets[url].polls == 2 for url in urls)
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as directory:
+        test_watch_emits_only_new_listings(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_watch_saves_state_after_each_round(pathlib.Path(directory))
+    print("✅ Всі тести стеження пройдено")
@@ -0,0 +1,308 @@
+"""
+Стеження за новими оголошеннями: опитування першої сторінки видачі
+
+Кожен URL (категорія або пошук) опитується окремою задачею з умовними
+запитами (If-None-Match / If-Modified-Since). SKU з першої сторінки
+порівнюються з ковзною множиною вже побачених, нові оголошення одразу
+відправляються в приймачі: JSONL файл, Unix сокет або локальний вебхук.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from models import Product
+
+@dataclass
+class WatchTarget:
+    """Стан одного URL під наглядом"""
+    url: str
+    etag: str = ""
+    last_modified: str = ""
+    polls: int = 0
+    seen_order: Deque[str] = field(default_factory=deque)
+    seen: Set[str] = field(default_factory=set)
+
+    def remember(self, key: str, limit: int):
+        self.seen.add(key)
+        self.seen_order.append(key)
+        while len(self.seen_order) > limit:
+            self.seen.discard(self.seen_order.popleft())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "polls": self.polls,
+            "seen": list(self.seen_order)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WatchTarget":
+        target = cls(
+            url=data["url"],
+            etag=data.get("etag", ""),
+            last_modified=data.get("last_modified", ""),
+            polls=data.get("polls", 0)
+        )
+        for key in data.get("seen", []):
+            target.seen.add(key)
+            target.seen_order.append(key)
+        return target
+
+def _header(headers: Dict[str, str], name: str) -> str:
+    """Заголовок відповіді без урахування регістру"""
+    name = name.lower()
+    return next((value for key, value in headers.items() if key.lower() == name), "")
+
+def listing_record(product: Product, target: WatchTarget) -> Dict[str, Any]:
+    """Запис про нове оголошення для приймачів"""
+    record = product.to_dict()
+    record["watch_url"] = target.url
+    record["detected_at"] = datetime.now().isoformat()
+    return record
+
+class JsonlSink:
+    """Дописує нові оголошення в JSONL файл"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    async def emit(self, records: List[Dict[str, Any]]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def close(self):
+        pass
+
+class UnixSocketSink:
+    """Пише JSON рядки в Unix сокет (з перепідключенням)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def emit(self, records: List[Dict[str, Any]]):
+        data = ''.join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+        for attempt in range(2):
+            try:
+                if self._writer is None or self._writer.is_closing():
+                    _, self._writer = await asyncio.open_unix_connection(self.path)
+                self._writer.write(data)
+                await self._writer.drain()
+                return
+            except OSError:
+                self._writer = None
+                if attempt:
+                    raise
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+class WebhookSink:
+    """Відправляє нові оголошення POST запитом з JSON списком"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._session = None
+
+    async def emit(self, records: List[Dict[str, Any]]):
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        async with self._session.post(self.url, json=records) as response:
+            if response.status >= 400:
+                raise OSError(f"Вебхук відповів HTTP {response.status}")
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+def make_sink(spec: str, output_directory: str = "."):
+    """Створює приймач з опису: jsonl:шлях, unix:шлях або http(s)://..."""
+    if spec.startswith(("http://", "https://")):
+        return WebhookSink(spec)
+    kind, _, path = spec.partition(':')
+    if kind == "unix" and path:
+        return UnixSocketSink(path)
+    if kind == "jsonl" and path:
+        return JsonlSink(path if os.path.isabs(path) else os.path.join(output_directory, path))
+    raise ValueError(f"Невідомий приймач: {spec} (jsonl:шлях, unix:шлях, http://...)")
+
+class ListingWatcher:
+    """Опитує першу сторінку кожного URL та відправляє нові оголошення в приймачі"""
+
+    def __init__(self, parser, urls: List[str], sinks: List[Any], interval: float = 30.0,
+                 seen_limit: int = 2000, emit_initial: bool = False, state_path: Optional[str] = None):
+        self.parser = parser
+        self.sinks = sinks
+        self.interval = interval
+        self.seen_limit = seen_limit
+        self.emit_initial = emit_initial
+        self.state_path = state_path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.metrics: Dict[str, int] = {"polls": 0, "not_modified": 0, "new_listings": 0, "errors": 0, "sink_errors": 0}
+
+        self.targets: Dict[str, WatchTarget] = {}
+        self.load_state()
+        self.targets = {url: self.targets.get(url) or WatchTarget(url=url) for url in urls}
+        # URL, опитані з моменту останнього збереження стану
+        self._round: Set[str] = set()
+
+        # Розбір HTML в окремому потоці, щоб не блокувати опитування інших URL
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _request_headers(self, target: WatchTarget) -> Dict[str, str]:
+        headers = {}
+        if target.etag:
+            headers['If-None-Match'] = target.etag
+        if target.last_modified:
+            headers['If-Modified-Since'] = target.last_modified
+        return headers
+
+    def _extract(self, html: str, url: str) -> List[Product]:
+        # Незмінена перша сторінка (сервер без умовних запитів) береться з кешу парсера
+        products, _ = self.parser.parse_listing_html(html, url)
+        return products
+
+    async def poll(self, target: WatchTarget) -> List[Product]:
+        """Одне опитування URL, повертає нові оголошення"""
+        self.metrics["polls"] += 1
+        response = await self.parser.get_fetch_client().fetch(target.url, headers=self._request_headers(target))
+        if response is None:
+            self.metrics["errors"] += 1
+            return []
+        if response.status == 304:
+            self.metrics["not_modified"] += 1
+            return []
+        if response.status != 200:
+            self.metrics["errors"] += 1
+            self.logger.warning("HTTP %s для %s", response.status, target.url)
+            return []
+
+        target.etag = _header(response.headers, 'ETag')
+        target.last_modified = _header(response.headers, 'Last-Modified')
+
+        loop = asyncio.get_event_loop()
+        products = await loop.run_in_executor(self._executor, self._extract, response.text, target.url)
+
+        first_poll = target.polls == 0
+        target.polls += 1
+        new_products = []
+        for product in products:
+            key = product.sku or product.product_url
+            if key in target.seen:
+                continue
+            target.remember(key, self.seen_limit)
+            new_products.append(product)
+
+        if first_poll and not self.emit_initial:
+            # Перше опитування лише заповнює множину побачених
+            return []
+        return new_products
+
+    async def dispatch(self, target: WatchTarget, products: List[Product]):
+        """Відправляє нові оголошення в усі приймачі"""
+        self.metrics["new_listings"] += len(products)
+        records = [listing_record(product, target) for product in products]
+        for sink in self.sinks:
+            try:
+                await sink.emit(records)
+            except Exception as e:
+                self.metrics["sink_errors"] += 1
+                self.logger.error("Помилка приймача %s: %s", sink.__class__.__name__, e)
+
+    async def _watch(self, target: WatchTarget, offset: float, stop_event: asyncio.Event):
+        # Рознесені в часі старти, щоб сотні URL не опитувались одночасно
+        if await self._sleep(offset, stop_event):
+            return
+        while not stop_event.is_set():
+            try:
+                new_products = await self.poll(target)
+                if new_products:
+                    self.logger.info("%s: %s нових оголошень", target.url, len(new_products))
+                    await self.dispatch(target, new_products)
+            except Exception as e:
+                self.metrics["errors"] += 1
+                self.logger.error("Помилка при опитуванні %s: %s", target.url, e)
+            self._finish_poll(target)
+            # Невеликий розкид інтервалу проти синхронізації опитувань
+            if await self._sleep(self.interval * random.uniform(0.9, 1.1), stop_event):
+                return
+
+    def _finish_poll(self, target: WatchTarget):
+        """Зберігає стан, коли кожен URL опитано хоча б раз з минулого збереження"""
+        self._round.add(target.url)
+        if len(self._round) < len(self.targets):
+            return
+        self._round.clear()
+        try:
+            self.save_state()
+        except OSError as e:
+            self.logger.error("Не вдалося зберегти стан стеження: %s", e)
+
+    @staticmethod
+    async def _sleep(seconds: float, stop_event: asyncio.Event) -> bool:
+        """Чекає seconds або зупинки; повертає True, якщо треба зупинитись"""
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def run_forever(self, stop_event: Optional[asyncio.Event] = None):
+        """Опитує всі URL паралельно до зупинки"""
+        stop_event = stop_event or asyncio.Event()
+        targets = list(self.targets.values())
+        self.logger.info("Стеження за %s URL з інтервалом %.0f сек", len(targets), self.interval)
+        try:
+            await asyncio.gather(*(
+                self._watch(target, self.interval * index / max(len(targets), 1), stop_event)
+                for index, target in enumerate(targets)
+            ))
+        finally:
+            self.save_state()
+            for sink in self.sinks:
+                await sink.close()
+            self._executor.shutdown(wait=False)
+
+    def load_state(self):
+        """Завантажує множини побачених оголошень з диска"""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in data.get("targets", []):
+                target = WatchTarget.from_dict(item)
+                self.targets[target.url] = target
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Не вдалося прочитати стан стеження: %s", e)
+
+    def save_state(self):
+        """Зберігає множини побачених оголошень на диск"""
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"targets": [target.to_dict() for target in self.targets.values()]}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)